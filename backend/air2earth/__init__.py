@@ -0,0 +1,5 @@
+"""
+Air2Earth - shared LSTM serving package
+Model definitions, predictors, the model registry and the unified inference server
+behind the aqi-model, water-model and solar-model services.
+"""
@@ -0,0 +1,451 @@
+"""
+Air2Earth - AQI Impact Prediction using LSTM Models
+Model definitions and predictors for the environmental impact of trees, vertical gardens,
+and air purifiers.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import torch.nn as nn
+
+from .cache import cached
+from .common import (
+    DEFAULT_QUANTILES,
+    SEQ_LEN,
+    LazyModel,
+    expand_samples,
+    observed_sequences,
+    run_batch,
+    service_model_dir,
+    standard_normal,
+    summarize_samples,
+)
+from .fast import check_engine, fast_outputs, label_results
+
+# =====================================================================
+#                        MODEL DEFINITIONS
+# =====================================================================
+
+class TreeLSTM(nn.Module):
+    """LSTM model for predicting tree plantation impact on air quality."""
+    def __init__(self, input_dim=5, hidden_dim=64, output_dim=4, num_layers=2):
+        super().__init__()
+        self.hidden_dim = hidden_dim
+        self.num_layers = num_layers
+        self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers, batch_first=True, dropout=0.2)
+        self.fc = nn.Sequential(
+            nn.Linear(hidden_dim, 32),
+            nn.ReLU(),
+            nn.Linear(32, output_dim)
+        )
+
+    def forward(self, x):
+        out, _ = self.lstm(x)
+        return self.fc(out[:, -1, :])
+
+
+class GardenLSTM(nn.Module):
+    """LSTM model for predicting vertical garden impact on air quality."""
+    def __init__(self, input_dim=5, hidden_dim=64, output_dim=5, num_layers=2):
+        super().__init__()
+        self.hidden_dim = hidden_dim
+        self.num_layers = num_layers
+        self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers, batch_first=True, dropout=0.2)
+        self.fc = nn.Sequential(
+            nn.Linear(hidden_dim, 32),
+            nn.ReLU(),
+            nn.Linear(32, output_dim)
+        )
+
+    def forward(self, x):
+        out, _ = self.lstm(x)
+        return self.fc(out[:, -1, :])
+
+
+class PurifierLSTM(nn.Module):
+    """LSTM model for predicting air purifier impact on air quality."""
+    def __init__(self, input_dim=4, hidden_dim=64, output_dim=3, num_layers=2):
+        super().__init__()
+        self.hidden_dim = hidden_dim
+        self.num_layers = num_layers
+        self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers, batch_first=True, dropout=0.2)
+        self.fc = nn.Sequential(
+            nn.Linear(hidden_dim, 32),
+            nn.ReLU(),
+            nn.Linear(32, output_dim)
+        )
+
+    def forward(self, x):
+        out, _ = self.lstm(x)
+        return self.fc(out[:, -1, :])
+
+
+# =====================================================================
+#                     LOAD MODELS & SCALERS
+# =====================================================================
+
+MODEL_DIR = service_model_dir("aqi-model", "AQI_MODEL_DIR")
+
+TREE_INPUTS = ("current_aqi", "current_pm25", "temperature", "humidity", "wind_speed")
+GARDEN_INPUTS = ("current_aqi", "current_pm25", "area_m2", "temperature", "humidity")
+PURIFIER_INPUTS = ("current_aqi", "current_pm25", "room_size_sqft", "ventilation_rate")
+
+# Each model loads on first use (or via prefetch/preload) so a cold start only pays for
+# the tabs that are actually used. ``aqi.tree_model`` etc. still resolve, loading on access.
+TREE = LazyModel(TreeLSTM, "tree_lstm.pth", "tree_scaler.json", MODEL_DIR)
+GARDEN = LazyModel(GardenLSTM, "garden_lstm.pth", "garden_scaler.json", MODEL_DIR)
+PURIFIER = LazyModel(PurifierLSTM, "purifier_lstm.pth", "purifier_scaler.json", MODEL_DIR)
+LAZY_MODELS = {"tree": TREE, "garden": GARDEN, "purifier": PURIFIER}
+
+
+def preload():
+    """Load all three models now (the pre-lazy startup behavior)."""
+    for lazy in LAZY_MODELS.values():
+        lazy.load()
+
+
+def prefetch():
+    """Load all three models on a background thread, tree first; returns the thread."""
+    thread = threading.Thread(target=preload, name="aqi-prefetch", daemon=True)
+    thread.start()
+    return thread
+
+
+def __getattr__(name):
+    prefix, _, kind = name.partition("_")
+    if prefix in LAZY_MODELS and kind in ("model", "scaler"):
+        model, scaler = LAZY_MODELS[prefix].load()
+        return model if kind == "model" else scaler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if os.environ.get("AIR2EARTH_PRELOAD") == "1":
+    preload()
+
+
+# =====================================================================
+#                      PREDICTION FUNCTIONS
+# =====================================================================
+
+def build_sequences(base_rows, rng=None, seq_len=SEQ_LEN, noise_scales=None):
+    """Build a (N, seq_len, F) batch of input sequences with slight temporal variation.
+
+    Noise comes from ``rng`` (see ``common.standard_normal``): a seeded generator makes the
+    whole batch reproducible, a list of per-row generators makes each row reproducible.
+    """
+    base = np.asarray(base_rows, dtype=np.float64)
+    n, f = base.shape
+    if noise_scales is None:
+        noise_scales = [0.02] * f
+    noise = standard_normal(rng, (n, seq_len, f)) * np.asarray(noise_scales)
+    return (base[:, None, :] * (1.0 + noise)).astype(np.float32)
+
+
+def build_sequence(base_values, seq_len=SEQ_LEN, noise_scales=None, rng=None):
+    """Build a time-series input sequence with slight temporal variation."""
+    return build_sequences([base_values], rng=rng, seq_len=seq_len, noise_scales=noise_scales)[0]
+
+
+def clip_outputs(preds, outputs):
+    """Clip denormalized predictions (..., F) to each output field's bounds."""
+    lower = [-np.inf if lo is None else lo for _, lo, _, _ in outputs]
+    upper = [np.inf if hi is None else hi for _, _, hi, _ in outputs]
+    return np.clip(preds, lower, upper)
+
+
+def format_outputs(pred, outputs):
+    """The "predictions" block of a payload for one prediction row."""
+    values = clip_outputs(pred, outputs)
+    return {name: round(float(v), decimals) for (name, _, _, decimals), v in zip(outputs, values)}
+
+
+# ----- Tree Impact Prediction -----
+
+TREE_NOISE_SCALES = [0.03, 0.03, 0.02, 0.02, 0.05]
+# (field, lower bound, upper bound, decimals) for each model output, in output order
+TREE_OUTPUTS = (
+    ("pm25_reduction_ugm3", 0, None, 4),
+    ("pm10_reduction_ugm3", 0, None, 4),
+    ("aqi_improvement_points", 0, 8, 2),
+    ("co2_absorbed_kg_per_year", 0, None, 2),
+)
+
+
+def format_tree_result(pred, row):
+    """Build the tree JSON payload for one denormalized prediction row."""
+    current_aqi, current_pm25, temperature, humidity, wind_speed = row
+    return {
+        "type": "tree",
+        "predictions": format_outputs(pred, TREE_OUTPUTS),
+        "input_conditions": {
+            "current_aqi": float(current_aqi),
+            "current_pm25_ugm3": float(current_pm25),
+            "temperature_c": float(temperature),
+            "humidity_percent": float(humidity),
+            "wind_speed_kmh": float(wind_speed),
+        },
+        "environment": "outdoor",
+        "model": "LSTM",
+        "sequence_length": SEQ_LEN,
+    }
+
+
+@cached("tree", os.path.join(MODEL_DIR, "tree_lstm.pth"))
+def predict_tree_impact_batch(
+    rows, rng=None, samples=1, quantiles=DEFAULT_QUANTILES, mc_dropout=False, sequences=None, engine="lstm"
+):
+    """Predict tree impact for N rows of
+    (current_aqi, current_pm25, temperature, humidity, wind_speed) in one forward pass.
+
+    Pass a seeded ``numpy.random.Generator`` as ``rng`` for reproducible noise. With
+    ``samples=K`` each row is scored K times in the same pass and collapsed to the mean
+    plus std/quantiles under ``uncertainty``; ``mc_dropout`` keeps LSTM dropout active.
+    ``sequences`` ((N, 24, F) observed readings) replaces the synthetic sequences; the rows
+    are then each sequence's last reading. ``engine`` "fast" or "lut" skips the LSTM (see fast.py).
+    Returns a list of result dicts with the same shape as predict_tree_impact.
+    """
+    check_engine(engine)
+    if sequences is not None:
+        rows, sequences = observed_sequences(sequences, 5)
+    rows = [tuple(row) for row in rows]
+    if not rows:
+        return []
+    sample_rows, rng = expand_samples(rows, rng, samples)
+    if engine != "lstm":
+        preds = fast_outputs("tree", sample_rows, engine=engine)
+    else:
+        if sequences is None:
+            raw_seqs = build_sequences(sample_rows, rng=rng, noise_scales=TREE_NOISE_SCALES)
+        else:
+            raw_seqs = np.repeat(sequences, samples, axis=0)
+        model, scaler = TREE.load()
+        preds = run_batch(model, raw_seqs, scaler, 5, 4, mc_dropout=mc_dropout)
+    results = [format_tree_result(pred, row) for pred, row in zip(preds, sample_rows)]
+    if engine != "lstm":
+        label_results(results, engine)
+    return summarize_samples(results, samples, quantiles)
+
+
+def predict_tree_impact(
+    current_aqi, current_pm25, temperature, humidity, wind_speed, samples=1, mc_dropout=False, sequence=None, as_dict=False
+):
+    """Predict the impact of planting a tree on air quality using LSTM.
+
+    Returns a pretty-printed JSON string, or the payload dict itself with ``as_dict``.
+    """
+    try:
+        result = predict_tree_impact_batch(
+            [(current_aqi, current_pm25, temperature, humidity, wind_speed)],
+            samples=samples,
+            mc_dropout=mc_dropout,
+            sequences=None if sequence is None else [sequence],
+        )[0]
+        return result if as_dict else json.dumps(result, indent=2)
+
+    except Exception as e:
+        error = {"error": str(e)}
+        return error if as_dict else json.dumps(error, indent=2)
+
+
+# ----- Vertical Garden Impact Prediction -----
+
+GARDEN_NOISE_SCALES = [0.03, 0.03, 0.0, 0.02, 0.02]
+GARDEN_OUTPUTS = (
+    ("pm25_reduction_ugm3", 0, None, 4),
+    ("pm10_reduction_ugm3", 0, None, 4),
+    ("aqi_improvement_points", 0, 20, 2),
+    ("temperature_reduction_c", 0, 5, 2),
+    ("noise_reduction_db", 0, 10, 2),
+)
+
+
+def format_garden_result(pred, row):
+    """Build the vertical garden JSON payload for one denormalized prediction row."""
+    current_aqi, current_pm25, area_m2, temperature, humidity = row
+    return {
+        "type": "vertical_garden",
+        "predictions": format_outputs(pred, GARDEN_OUTPUTS),
+        "input_conditions": {
+            "current_aqi": float(current_aqi),
+            "current_pm25_ugm3": float(current_pm25),
+            "garden_area_m2": float(area_m2),
+            "temperature_c": float(temperature),
+            "humidity_percent": float(humidity),
+        },
+        "environment": "outdoor",
+        "model": "LSTM",
+        "sequence_length": SEQ_LEN,
+    }
+
+
+@cached("garden", os.path.join(MODEL_DIR, "garden_lstm.pth"))
+def predict_garden_impact_batch(
+    rows, rng=None, samples=1, quantiles=DEFAULT_QUANTILES, mc_dropout=False, sequences=None, engine="lstm"
+):
+    """Predict vertical garden impact for N rows of
+    (current_aqi, current_pm25, area_m2, temperature, humidity) in one forward pass.
+
+    Pass a seeded ``numpy.random.Generator`` as ``rng`` for reproducible noise. With
+    ``samples=K`` each row is scored K times in the same pass and collapsed to the mean
+    plus std/quantiles under ``uncertainty``; ``mc_dropout`` keeps LSTM dropout active.
+    ``sequences`` ((N, 24, F) observed readings) replaces the synthetic sequences; the rows
+    are then each sequence's last reading. ``engine`` "fast" or "lut" skips the LSTM (see fast.py).
+    Returns a list of result dicts with the same shape as predict_garden_impact.
+    """
+    check_engine(engine)
+    if sequences is not None:
+        rows, sequences = observed_sequences(sequences, 5)
+    rows = [tuple(row) for row in rows]
+    if not rows:
+        return []
+    sample_rows, rng = expand_samples(rows, rng, samples)
+    if engine != "lstm":
+        preds = fast_outputs("garden", sample_rows, engine=engine)
+    else:
+        if sequences is None:
+            raw_seqs = build_sequences(sample_rows, rng=rng, noise_scales=GARDEN_NOISE_SCALES)
+        else:
+            raw_seqs = np.repeat(sequences, samples, axis=0)
+        model, scaler = GARDEN.load()
+        preds = run_batch(model, raw_seqs, scaler, 5, 5, mc_dropout=mc_dropout)
+    results = [format_garden_result(pred, row) for pred, row in zip(preds, sample_rows)]
+    if engine != "lstm":
+        label_results(results, engine)
+    return summarize_samples(results, samples, quantiles)
+
+
+def predict_garden_impact(
+    current_aqi, current_pm25, area_m2, temperature, humidity, samples=1, mc_dropout=False, sequence=None, as_dict=False
+):
+    """Predict the impact of a vertical garden installation using LSTM.
+
+    Returns a pretty-printed JSON string, or the payload dict itself with ``as_dict``.
+    """
+    try:
+        result = predict_garden_impact_batch(
+            [(current_aqi, current_pm25, area_m2, temperature, humidity)],
+            samples=samples,
+            mc_dropout=mc_dropout,
+            sequences=None if sequence is None else [sequence],
+        )[0]
+        return result if as_dict else json.dumps(result, indent=2)
+
+    except Exception as e:
+        error = {"error": str(e)}
+        return error if as_dict else json.dumps(error, indent=2)
+
+
+# ----- Air Purifier Impact Prediction -----
+
+PURIFIER_NOISE_SCALES = [0.03, 0.03, 0.0, 0.02]
+PURIFIER_OUTPUTS = (
+    ("pm25_reduction_percent", 0, 99, 2),
+    ("cadr_m3_per_hr", 0, None, 2),
+    ("effective_coverage_sqft", 0, None, 2),
+)
+
+
+def format_purifier_result(pred, row):
+    """Build the air purifier JSON payload for one denormalized prediction row."""
+    current_aqi, current_pm25, room_size_sqft, ventilation_rate = row
+    return {
+        "type": "air_purifier",
+        "predictions": format_outputs(pred, PURIFIER_OUTPUTS),
+        "input_conditions": {
+            "current_aqi": float(current_aqi),
+            "current_pm25_ugm3": float(current_pm25),
+            "room_size_sqft": float(room_size_sqft),
+            "ventilation_rate_ach": float(ventilation_rate),
+        },
+        "environment": "indoor",
+        "model": "LSTM",
+        "sequence_length": SEQ_LEN,
+    }
+
+
+@cached("purifier", os.path.join(MODEL_DIR, "purifier_lstm.pth"))
+def predict_purifier_impact_batch(
+    rows, rng=None, samples=1, quantiles=DEFAULT_QUANTILES, mc_dropout=False, sequences=None, engine="lstm"
+):
+    """Predict air purifier impact for N rows of
+    (current_aqi, current_pm25, room_size_sqft, ventilation_rate) in one forward pass.
+
+    Pass a seeded ``numpy.random.Generator`` as ``rng`` for reproducible noise. With
+    ``samples=K`` each row is scored K times in the same pass and collapsed to the mean
+    plus std/quantiles under ``uncertainty``; ``mc_dropout`` keeps LSTM dropout active.
+    ``sequences`` ((N, 24, F) observed readings) replaces the synthetic sequences; the rows
+    are then each sequence's last reading. ``engine`` "fast" or "lut" skips the LSTM (see fast.py).
+    Returns a list of result dicts with the same shape as predict_purifier_impact.
+    """
+    check_engine(engine)
+    if sequences is not None:
+        rows, sequences = observed_sequences(sequences, 4)
+    rows = [tuple(row) for row in rows]
+    if not rows:
+        return []
+    sample_rows, rng = expand_samples(rows, rng, samples)
+    if engine != "lstm":
+        preds = fast_outputs("purifier", sample_rows, engine=engine)
+    else:
+        if sequences is None:
+            raw_seqs = build_sequences(sample_rows, rng=rng, noise_scales=PURIFIER_NOISE_SCALES)
+        else:
+            raw_seqs = np.repeat(sequences, samples, axis=0)
+        model, scaler = PURIFIER.load()
+        preds = run_batch(model, raw_seqs, scaler, 4, 3, mc_dropout=mc_dropout)
+    results = [format_purifier_result(pred, row) for pred, row in zip(preds, sample_rows)]
+    if engine != "lstm":
+        label_results(results, engine)
+    return summarize_samples(results, samples, quantiles)
+
+
+def predict_purifier_impact(
+    current_aqi, current_pm25, room_size_sqft, ventilation_rate, samples=1, mc_dropout=False, sequence=None, as_dict=False
+):
+    """Predict the impact of an air purifier using LSTM.
+
+    Returns a pretty-printed JSON string, or the payload dict itself with ``as_dict``.
+    """
+    try:
+        result = predict_purifier_impact_batch(
+            [(current_aqi, current_pm25, room_size_sqft, ventilation_rate)],
+            samples=samples,
+            mc_dropout=mc_dropout,
+            sequences=None if sequence is None else [sequence],
+        )[0]
+        return result if as_dict else json.dumps(result, indent=2)
+
+    except Exception as e:
+        error = {"error": str(e)}
+        return error if as_dict else json.dumps(error, indent=2)
+
+
+# ----- Array predictions (rasters, sweeps) -----
+
+PLACEMENTS = {
+    "tree": (TREE, TREE_INPUTS, TREE_NOISE_SCALES, TREE_OUTPUTS),
+    "garden": (GARDEN, GARDEN_INPUTS, GARDEN_NOISE_SCALES, GARDEN_OUTPUTS),
+    "purifier": (PURIFIER, PURIFIER_INPUTS, PURIFIER_NOISE_SCALES, PURIFIER_OUTPUTS),
+}
+
+
+def predict_outputs(placement, rows, rng=None, chunk_size=16384, engine="lstm"):
+    """Clipped (N, F) prediction array for ``placement``, skipping per-row JSON payloads.
+
+    Columns follow the placement's *_OUTPUTS order; rows are scored ``chunk_size`` at a time.
+    ``engine="fast"`` / ``"lut"`` use the distilled MLP or lookup table on all rows at once.
+    """
+    lazy, inputs, noise_scales, outputs = PLACEMENTS[placement]
+    rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(inputs))
+    if check_engine(engine) != "lstm":
+        return clip_outputs(fast_outputs(placement, rows, engine=engine), outputs).astype(np.float32)
+    model, scaler = lazy.load()
+    preds = np.empty((len(rows), len(outputs)), dtype=np.float32)
+    for start in range(0, len(rows), chunk_size):
+        raw_seqs = build_sequences(rows[start:start + chunk_size], rng=rng, noise_scales=noise_scales)
+        chunk = run_batch(model, raw_seqs, scaler, len(inputs), len(outputs))
+        preds[start:start + chunk_size] = clip_outputs(chunk, outputs)
+    return preds
@@ -0,0 +1,126 @@
+"""
+Air2Earth - dynamic micro-batching
+Coalesces concurrent requests for the same model into one batched forward pass. A batch
+is flushed once it holds max_batch_size rows or max_wait_ms has passed since its first
+request, whichever comes first; results are then scattered back to each caller.
+"""
+
+import asyncio
+
+from starlette.concurrency import run_in_threadpool
+
+DEFAULT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class Histogram:
+    """Bucketed histogram; a value lands in the first bucket whose bound it does not exceed."""
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self):
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class MicroBatcher:
+    """Per-model request coalescer in front of a ``predict_batch(rows)`` callable."""
+
+    def __init__(self, name, predict_batch, max_batch_size=64, max_wait_ms=5.0):
+        self.name = name
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue_depth = Histogram()
+        self.batch_size = Histogram()
+        self.requests_per_batch = Histogram()
+        self._queue = None
+        self._worker = None
+
+    async def submit(self, rows):
+        """Queue ``rows`` and wait for their results from a shared forward pass."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    async def _collect(self):
+        """Wait for one request, then keep gathering until the batch is full or times out."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        self.queue_depth.observe(self._queue.qsize())
+        size = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Drop callers that went away while waiting.
+            batch = [(rows, future) for rows, future in batch if not future.done()]
+            if not batch:
+                continue
+            size = sum(len(rows) for rows, _ in batch)
+            self.batch_size.observe(size)
+            self.requests_per_batch.observe(len(batch))
+
+            all_rows = [row for rows, _ in batch for row in rows]
+            try:
+                results = await run_in_threadpool(self.predict_batch, all_rows)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for rows, future in batch:
+                if not future.done():
+                    future.set_result(results[offset:offset + len(rows)])
+                offset += len(rows)
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self.queue_depth.snapshot(),
+            "batch_size": self.batch_size.snapshot(),
+            "requests_per_batch": self.requests_per_batch.snapshot(),
+        }
+
+
+def build_batchers(registry, max_batch_size=64, max_wait_ms=5.0):
+    """Create one MicroBatcher per registered model."""
+    return {
+        entry.name: MicroBatcher(entry.name, entry.predict_batch, max_batch_size, max_wait_ms)
+        for entry in registry
+    }
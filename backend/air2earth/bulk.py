@@ -0,0 +1,250 @@
+"""
+Air2Earth - offline bulk scoring
+Streams a CSV or Parquet file in chunks through a model's batched predictor on a process
+pool and writes one flattened row per input row (the JSON payload's fields, nested keys
+joined with "."). Each finished chunk is written as a part file and recorded in a
+checkpoint, so an interrupted run resumes where it stopped.
+
+Usage:
+    cd backend
+    python -m air2earth.bulk solar rooftops.csv rooftops_solar.parquet --workers 4
+    python -m air2earth.bulk tree stations.parquet stations_tree.csv --keep station_id
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from .encoding import project, to_columns
+
+FORMATS = (".csv", ".parquet")
+
+_worker = {}
+
+
+def import_pandas():
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("Bulk scoring needs pandas; pip install pandas") from None
+    return pd
+
+
+def import_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet files need pyarrow; pip install pyarrow") from None
+    return pq
+
+
+def file_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported file type '{ext}' for {path}. Use one of: {', '.join(FORMATS)}")
+    return ext
+
+
+def read_chunks(path, chunk_size):
+    """Yield DataFrames of at most ``chunk_size`` rows without loading the whole file."""
+    if file_format(path) == ".csv":
+        yield from import_pandas().read_csv(path, chunksize=chunk_size)
+        return
+    for batch in import_parquet().ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas()
+
+
+# =====================================================================
+#                           WORKERS
+# =====================================================================
+
+def init_worker(model, threads):
+    """Load the model being run once per worker process."""
+    import torch
+
+    from .registry import build_entry
+
+    if threads:
+        torch.set_num_threads(threads)
+    _worker["entry"] = build_entry(model)
+
+
+def score_chunk(index, rows, seed, options, fields=None):
+    """Score one chunk; noise is seeded by (seed, chunk index) so reruns are reproducible."""
+    rng = np.random.default_rng([seed, index])
+    results = _worker["entry"].predict_batch(rows, rng=rng, **options)
+    if fields:
+        results = [project(r, fields) for r in results]
+    return index, import_pandas().DataFrame(to_columns(results))
+
+
+# =====================================================================
+#                      CHECKPOINTED RUNNER
+# =====================================================================
+
+class Checkpoint:
+    """Completed chunk indices for one (model, input, chunk size) run, kept next to the parts."""
+
+    def __init__(self, parts_dir, config):
+        self.path = os.path.join(parts_dir, "checkpoint.json")
+        self.config = config
+        self.done = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                state = json.load(f)
+            if state["config"] != config:
+                raise ValueError(f"{self.path} was written for a different run: {state['config']}. "
+                                 f"Delete it or pass --restart.")
+            self.done = {int(k): v for k, v in state["done"].items()}
+
+    def mark(self, index, rows):
+        self.done[index] = rows
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"config": self.config, "done": self.done}, f)
+        os.replace(tmp, self.path)
+
+
+def part_path(parts_dir, index, ext):
+    return os.path.join(parts_dir, f"part-{index:06d}{ext}")
+
+
+def write_frame(frame, path):
+    if path.endswith(".csv"):
+        frame.to_csv(path, index=False)
+    else:
+        frame.to_parquet(path, index=False)
+
+
+def merge_parts(parts, output):
+    """Concatenate the part files, in chunk order, into ``output``."""
+    if output.endswith(".csv"):
+        with open(output, "w", newline="") as out:
+            for i, part in enumerate(parts):
+                with open(part, "r", newline="") as f:
+                    if i:
+                        f.readline()
+                    shutil.copyfileobj(f, out)
+        return
+    pq = import_parquet()
+    writer = None
+    for part in parts:
+        table = pq.read_table(part)
+        if writer is None:
+            writer = pq.ParquetWriter(output, table.schema)
+        writer.write_table(table)
+    if writer is not None:
+        writer.close()
+
+
+def run(model, input_path, output_path, chunk_size=4096, workers=None, seed=0, keep=(), options=None,
+        restart=False, log=print, fields=None):
+    """Score ``input_path`` into ``output_path``; returns (rows, seconds)."""
+    from .registry import build_entry
+
+    options = options or {}
+    ext = file_format(output_path)
+    pd = import_pandas()
+    if ".parquet" in (ext, file_format(input_path)):
+        import_parquet()
+    inputs = list(build_entry(model).inputs)
+    workers = workers or os.cpu_count() or 1
+
+    parts_dir = output_path + ".parts"
+    if restart:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    os.makedirs(parts_dir, exist_ok=True)
+    checkpoint = Checkpoint(parts_dir, {
+        "model": model,
+        "input": os.path.abspath(input_path),
+        "input_size": os.path.getsize(input_path),
+        "input_mtime_ns": os.stat(input_path).st_mtime_ns,
+        "chunk_size": chunk_size,
+        "seed": seed,
+        "keep": list(keep),
+        "options": options,
+        "fields": list(fields or []),
+    })
+    if checkpoint.done:
+        log(f"Resuming: {len(checkpoint.done)} chunks ({sum(checkpoint.done.values())} rows) already scored")
+
+    start = time.perf_counter()
+    scored = 0
+    total = sum(checkpoint.done.values())
+    pending = {}
+    kept = {}
+
+    def collect(futures):
+        nonlocal scored, total
+        for future in futures:
+            index, frame = future.result()
+            pending.pop(future)
+            frame = pd.concat([kept.pop(index), frame], axis=1)
+            write_frame(frame, part_path(parts_dir, index, ext))
+            checkpoint.mark(index, len(frame))
+            scored += len(frame)
+            total += len(frame)
+            elapsed = time.perf_counter() - start
+            log(f"chunk {index}: {total} rows done, {scored / elapsed:,.0f} rows/s")
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(model, threads)) as pool:
+        n_chunks = 0
+        for index, chunk in enumerate(read_chunks(input_path, chunk_size)):
+            n_chunks = index + 1
+            if index in checkpoint.done:
+                continue
+            missing = [c for c in inputs + list(keep) if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"{input_path} is missing columns: {', '.join(missing)}")
+            kept[index] = chunk[list(keep)].reset_index(drop=True)
+            rows = chunk[inputs].to_numpy(dtype=np.float64)
+            bad = np.flatnonzero(~np.isfinite(rows).all(axis=1))
+            if len(bad):
+                lines = ", ".join(str(index * chunk_size + i + 1) for i in bad[:5])
+                raise ValueError(f"{input_path} has NaN, empty or infinite inputs in data row(s) {lines}")
+            pending[pool.submit(score_chunk, index, rows, seed, options, fields)] = index
+            if len(pending) >= 2 * workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(list(pending))
+
+    merge_parts([part_path(parts_dir, i, ext) for i in range(n_chunks)], output_path)
+    shutil.rmtree(parts_dir)
+    return total, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-score a CSV/Parquet file with one of the LSTMs")
+    parser.add_argument("model", help="Registry name: tree, garden, purifier, water or solar")
+    parser.add_argument("input", help="Input .csv or .parquet with one column per model input")
+    parser.add_argument("output", help="Output .csv or .parquet")
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for the input noise")
+    parser.add_argument("--keep", nargs="+", default=[], help="Input columns copied to the output (e.g. ids)")
+    parser.add_argument("--samples", type=int, default=1, help="Monte Carlo samples per row")
+    parser.add_argument("--mc-dropout", action="store_true")
+    parser.add_argument("--restart", action="store_true", help="Discard any checkpoint and start over")
+    parser.add_argument("--fields", nargs="+", default=None,
+                        help="Keep only these sections or section.field paths (e.g. predictions)")
+    args = parser.parse_args(argv)
+
+    options = {}
+    if args.samples != 1:
+        options["samples"] = args.samples
+    if args.mc_dropout:
+        options["mc_dropout"] = True
+    rows, seconds = run(args.model, args.input, args.output, args.chunk_size, args.workers, args.seed,
+                        args.keep, options, args.restart, fields=args.fields)
+    print(f"Scored {rows} rows in {seconds:.1f} s ({rows / max(seconds, 1e-9):,.0f} rows/s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Air2Earth - deterministic prediction cache
+Bounded LRU/TTL cache in front of the predict_*_batch functions. Keys are the model id
+plus the inputs rounded to ``decimals``; misses are computed on those rounded inputs with
+noise seeded from the key, so a hit returns exactly what a fresh call would. Entries can
+optionally be persisted to a sqlite file so they survive restarts.
+
+Every key is namespaced by a fingerprint of the serving model: a hash of its .pth
+weights plus the AIR2EARTH_PRECISION and AIR2EARTH_RUNTIME in effect and, for the fast
+and lut engines, hashes of their offline artifacts, so retraining, re-distilling, rebuilding
+a table or switching precision/runtime never serves results computed by a different model.
+
+Configured from the environment (or ``configure_cache``):
+    AIR2EARTH_CACHE_SIZE       max in-memory entries, 0 disables (default 4096)
+    AIR2EARTH_CACHE_TTL        seconds before an entry expires (default: never)
+    AIR2EARTH_CACHE_DECIMALS   input rounding precision (default 3)
+    AIR2EARTH_CACHE_PATH       sqlite file for persistence (default: memory only)
+    AIR2EARTH_CACHE_SEED       base seed mixed into every key's noise seed (default 0)
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """Thread-safe LRU/TTL cache of prediction payloads with an optional sqlite tier."""
+
+    def __init__(self, maxsize=4096, ttl=None, decimals=3, path=None, seed=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.decimals = decimals
+        self.path = path
+        self.seed = seed
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, value TEXT, created REAL)"
+            )
+            if ttl is not None:
+                self._db.execute("DELETE FROM predictions WHERE created < ?", (time.time() - ttl,))
+            self._db.commit()
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def quantize(self, row):
+        return tuple(round(float(v), self.decimals) for v in row)
+
+    def key(self, model, row, options=None, fingerprint=None):
+        """Cache key for an already-quantized row and any non-default predictor options."""
+        namespace = f"{model}@{fingerprint}" if fingerprint else model
+        key = f"{namespace}:{','.join(repr(v) for v in row)}"
+        if options:
+            key += "|" + json.dumps(options, sort_keys=True, default=list)
+        return key
+
+    def seed_for(self, key):
+        """Deterministic 64-bit noise seed for a key."""
+        digest = hashlib.blake2b(f"{self.seed}|{key}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def _expired(self, created):
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, key):
+        """Return the cached payload for ``key`` or None, counting a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM predictions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    entry = (row[0], row[1])
+                    self._store(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return json.loads(entry[0])
+
+    def put(self, key, payload):
+        entry = (json.dumps(payload, separators=(",", ":")), time.time())
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions (key, value, created) VALUES (?, ?, ?)",
+                    (key, entry[0], entry[1]),
+                )
+                self._db.commit()
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "decimals": self.decimals,
+                "persistent": self._db is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    @staticmethod
+    def env_settings():
+        """Constructor keyword arguments read from the AIR2EARTH_CACHE_* variables."""
+        ttl = os.environ.get("AIR2EARTH_CACHE_TTL")
+        return {
+            "maxsize": int(os.environ.get("AIR2EARTH_CACHE_SIZE", 4096)),
+            "ttl": float(ttl) if ttl else None,
+            "decimals": int(os.environ.get("AIR2EARTH_CACHE_DECIMALS", 3)),
+            "path": os.environ.get("AIR2EARTH_CACHE_PATH") or None,
+            "seed": int(os.environ.get("AIR2EARTH_CACHE_SEED", 0)),
+        }
+
+    @classmethod
+    def from_env(cls):
+        return cls(**cls.env_settings())
+
+
+_cache = None
+
+
+def get_cache():
+    """Return the process-wide prediction cache, creating it from the environment."""
+    global _cache
+    if _cache is None:
+        _cache = PredictionCache.from_env()
+    return _cache
+
+
+def configure_cache(**kwargs):
+    """Replace the process-wide prediction cache (see PredictionCache for options)."""
+    global _cache
+    _cache = PredictionCache(**kwargs)
+    return _cache
+
+
+@functools.lru_cache(maxsize=None)
+def weights_hash(path):
+    """Short content hash of a weights file, taken once per process like the model load itself."""
+    if not os.path.exists(path):
+        return "untrained"
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+
+
+def model_fingerprint(weights, artifacts=()):
+    """Key namespace for the model served from ``weights``: weights hash, precision and runtime.
+
+    ``artifacts`` are the offline files a non-LSTM engine serves from; their hashes are appended.
+    """
+    precision = os.environ.get("AIR2EARTH_PRECISION", "fp32")
+    runtime = os.environ.get("AIR2EARTH_RUNTIME", "eager")
+    return "/".join([weights_hash(weights), precision, runtime] + [weights_hash(path) for path in artifacts])
+
+
+def cached(model, weights=None):
+    """Put the process-wide cache in front of a ``predict_batch(rows, rng=None)`` function.
+
+    Calls that pass their own ``rng`` or observed ``sequences`` bypass the cache; other
+    keyword options that differ from their defaults (e.g. ``samples``) become part of the key.
+    ``weights`` is the model's .pth path, fingerprinted into every key together with the
+    artifact of a non-LSTM ``engine`` (see ``model_fingerprint``).
+    """
+    def decorator(predict_batch):
+        defaults = {
+            name: param.default
+            for name, param in inspect.signature(predict_batch).parameters.items()
+            if param.default is not inspect.Parameter.empty
+        }
+
+        @functools.wraps(predict_batch)
+        def wrapper(rows, rng=None, **kwargs):
+            cache = get_cache()
+            if rng is not None or kwargs.get("sequences") is not None or not cache.enabled:
+                return predict_batch(rows, rng=rng, **kwargs)
+
+            options = {k: v for k, v in kwargs.items() if k not in defaults or defaults[k] != v}
+            rows = [cache.quantize(row) for row in rows]
+            fingerprint = None
+            if weights:
+                from .fast import engine_artifacts
+
+                artifacts = engine_artifacts(model, kwargs.get("engine", "lstm"))
+                fingerprint = model_fingerprint(weights, artifacts)
+            keys = [cache.key(model, row, options, fingerprint) for row in rows]
+            results = [cache.get(key) for key in keys]
+
+            missing = {}
+            for i, (key, result) in enumerate(zip(keys, results)):
+                if result is None:
+                    missing.setdefault(key, []).append(i)
+            if missing:
+                miss_keys = list(missing)
+                miss_rows = [rows[missing[key][0]] for key in miss_keys]
+                rngs = [np.random.default_rng(cache.seed_for(key)) for key in miss_keys]
+                for key, result in zip(miss_keys, predict_batch(miss_rows, rng=rngs, **kwargs)):
+                    cache.put(key, result)
+                    for i in missing[key]:
+                        results[i] = result
+            return results
+
+        wrapper.uncached = predict_batch
+        return wrapper
+    return decorator
@@ -0,0 +1,228 @@
+"""
+Air2Earth - shared helpers for the LSTM services
+Model/scaler loading and the normalization + batched forward pass used by every predictor.
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import torch
+
+from .precision import apply_precision
+from .runtime import eager_model, load_runtime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEQ_LEN = 24
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+MAX_SAMPLES = 1024
+
+
+def service_model_dir(service, env_var):
+    """Return the models/ directory of a service, overridable through ``env_var``."""
+    return os.environ.get(env_var, os.path.join(BACKEND_DIR, service, "models"))
+
+
+def load_model_and_scaler(model_class, model_file, scaler_file, model_dir, runtime=None, precision=None,
+                          **kwargs):
+    """Load a trained model and its normalization scaler.
+
+    ``precision`` (default: AIR2EARTH_PRECISION) converts the weights, see precision.py;
+    ``runtime`` (default: AIR2EARTH_RUNTIME) picks the backend, see runtime.py.
+    """
+    model = model_class(**kwargs)
+    model_path = os.path.join(model_dir, model_file)
+    scaler_path = os.path.join(model_dir, scaler_file)
+
+    if os.path.exists(model_path):
+        model.load_state_dict(torch.load(model_path, map_location="cpu", weights_only=True))
+        print(f"Loaded model: {model_file}")
+    else:
+        print(f"WARNING: {model_path} not found. Using untrained model.")
+    model.eval()
+
+    scaler = {}
+    if os.path.exists(scaler_path):
+        with open(scaler_path, "r") as f:
+            scaler = json.load(f)
+        print(f"Loaded scaler: {scaler_file}")
+    else:
+        print(f"WARNING: {scaler_path} not found. Using default scaler.")
+
+    model = apply_precision(model, precision)
+    return load_runtime(model, model_path, runtime), scaler
+
+
+class LazyModel:
+    """A model + scaler pair loaded by ``load_model_and_scaler`` on first use.
+
+    ``load()`` is thread-safe, so a background prefetch and a request can race for it,
+    and returns the cached pair after the first call.
+    """
+
+    def __init__(self, model_class, model_file, scaler_file, model_dir, **kwargs):
+        self.name = os.path.splitext(model_file)[0]
+        self.model_class = model_class
+        self._args = (model_class, model_file, scaler_file, model_dir)
+        self._kwargs = kwargs
+        self._lock = threading.Lock()
+        self._pair = None
+        self.load_seconds = None
+
+    @property
+    def loaded(self):
+        return self._pair is not None
+
+    def load(self):
+        if self._pair is None:
+            with self._lock:
+                if self._pair is None:
+                    start = time.perf_counter()
+                    self._pair = load_model_and_scaler(*self._args, **self._kwargs)
+                    self.load_seconds = time.perf_counter() - start
+        return self._pair
+
+
+def standard_normal(rng, shape):
+    """Draw standard-normal noise of ``shape`` (N, ...) from ``rng``.
+
+    ``rng`` may be None (fresh entropy), one ``numpy.random.Generator`` for the whole batch,
+    or a sequence of N generators so that each row's noise depends only on its own generator.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    if isinstance(rng, np.random.Generator):
+        return rng.standard_normal(shape)
+    if len(rng) != shape[0]:
+        raise ValueError(f"Expected {shape[0]} generators, got {len(rng)}")
+    return np.stack([g.standard_normal(shape[1:]) for g in rng])
+
+
+def observed_sequences(sequences, input_dim, seq_len=SEQ_LEN, label="sequences"):
+    """Validate caller-supplied raw readings of shape (seq_len, F) or (N, seq_len, F).
+
+    Returns (rows, raw_seqs): each sequence's last reading, used for the payload's input
+    conditions, and the float32 (N, seq_len, F) batch that replaces the synthetic one.
+    ``seq_len=None`` accepts any non-empty length.
+    """
+    try:
+        seqs = np.asarray(sequences, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} must be a numeric array") from None
+    if seqs.ndim == 2:
+        seqs = seqs[None]
+    steps = "T" if seq_len is None else seq_len
+    if (seqs.ndim != 3 or seqs.shape[2] != input_dim or seqs.shape[1] < 1
+            or seq_len is not None and seqs.shape[1] != seq_len):
+        raise ValueError(f"{label} must have shape ({steps}, {input_dim}) or (N, {steps}, {input_dim}), "
+                         f"got {seqs.shape}")
+    if not np.isfinite(seqs).all():
+        raise ValueError(f"{label} contain NaN or infinite values")
+    return [tuple(row) for row in seqs[:, -1, :]], seqs.astype(np.float32)
+
+
+def normalize_sequence(seq, x_min, x_max):
+    """Min-max normalize an input sequence."""
+    x_min = np.array(x_min)
+    x_max = np.array(x_max)
+    return (seq - x_min) / (x_max - x_min + 1e-8)
+
+
+def denormalize_output(pred, y_min, y_max):
+    """Reverse min-max normalization on predictions."""
+    y_min = np.array(y_min)
+    y_max = np.array(y_max)
+    return pred * (y_max - y_min) + y_min
+
+
+_dropout_twins = {}
+
+
+def dropout_twin(model):
+    """Return a train-mode copy of ``model`` so MC-dropout never flips the shared model's mode."""
+    model = eager_model(model)
+    twin = _dropout_twins.get(id(model))
+    if twin is None or twin[0] is not model:
+        twin = _dropout_twins[id(model)] = (model, copy.deepcopy(model).train())
+    return twin[1]
+
+
+def run_batch(model, raw_seqs, scaler, input_dim, output_dim, mc_dropout=False):
+    """Normalize a (N, SEQ_LEN, F) batch, run one forward pass and denormalize.
+
+    With ``mc_dropout`` the LSTM's inter-layer dropout stays active (Monte Carlo dropout).
+    """
+    if mc_dropout:
+        model = dropout_twin(model)
+    x_min = scaler.get("x_min", [0] * input_dim)
+    x_max = scaler.get("x_max", [1] * input_dim)
+    y_min = scaler.get("y_min", [0] * output_dim)
+    y_max = scaler.get("y_max", [1] * output_dim)
+
+    seq_norm = normalize_sequence(raw_seqs, x_min, x_max)
+    input_tensor = torch.FloatTensor(seq_norm)
+
+    with torch.no_grad():
+        pred_norm = model(input_tensor).numpy()
+
+    return denormalize_output(pred_norm, y_min, y_max)
+
+
+# =====================================================================
+#                   MONTE CARLO UNCERTAINTY
+# =====================================================================
+
+def expand_samples(rows, rng, samples):
+    """Repeat every row ``samples`` times for a single (N * samples, SEQ_LEN, F) pass.
+
+    A per-row list of generators is repeated alongside, so each row's K samples still
+    come only from its own generator.
+    """
+    if not 1 <= samples <= MAX_SAMPLES:
+        raise ValueError(f"samples must be between 1 and {MAX_SAMPLES}")
+    if samples == 1:
+        return rows, rng
+    rows = [row for row in rows for _ in range(samples)]
+    if rng is not None and not isinstance(rng, np.random.Generator):
+        rng = [g for g in rng for _ in range(samples)]
+    return rows, rng
+
+
+def quantile_label(q):
+    return f"q{q * 100:g}"
+
+
+def summarize_samples(results, samples, quantiles=DEFAULT_QUANTILES):
+    """Collapse each run of ``samples`` payloads into one payload with uncertainty stats.
+
+    Numeric ``predictions``/``derived`` fields become the sample mean; the mean, std and
+    requested quantiles of every field are reported under ``uncertainty``.
+    """
+    if samples == 1:
+        return results
+    quantiles = [float(q) for q in quantiles]
+    if any(not 0.0 <= q <= 1.0 for q in quantiles):
+        raise ValueError("quantiles must be between 0 and 1")
+
+    summarized = []
+    for start in range(0, len(results), samples):
+        group = results[start:start + samples]
+        result = copy.deepcopy(group[0])
+        uncertainty = {}
+        for section in ("predictions", "derived"):
+            if section not in result:
+                continue
+            for field in result[section]:
+                values = np.array([r[section][field] for r in group], dtype=np.float64)
+                stats = {"mean": round(float(values.mean()), 4), "std": round(float(values.std()), 4)}
+                for q, v in zip(quantiles, np.quantile(values, quantiles)):
+                    stats[quantile_label(q)] = round(float(v), 4)
+                result[section][field] = stats["mean"]
+                uncertainty[field] = stats
+        result["uncertainty"] = uncertainty
+        result["samples"] = samples
+        summarized.append(result)
+    return summarized
@@ -0,0 +1,179 @@
+"""
+Air2Earth - on-disk training datasets
+Generated datasets are written once as .npy shards under a directory named by a hash of
+the generator config (model, samples, seed, shard size), then memory-mapped for every
+later run. Sweeps over HIDDEN_DIM / NUM_LAYERS reuse the same shards instead of
+regenerating the data, and a dataset larger than RAM is built and read shard by shard.
+
+    <cache>/<name>-<hash>/manifest.json     config, shard lengths, min-max scaler
+    <cache>/<name>-<hash>/X_00000.npy        (shard_size, 24, F) float32
+    <cache>/<name>-<hash>/y_00000.npy        (shard_size, O) float32
+
+The cache directory defaults to AIR2EARTH_DATA_CACHE or backend/.data-cache. Shards are
+.npy rather than .npz because zip members cannot be memory-mapped.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset
+
+from .training import GENERATORS, fit_scaler, run_epochs, scale
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "AIR2EARTH_DATA_CACHE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".data-cache"),
+)
+DEFAULT_SHARD_SIZE = 100_000
+FORMAT_VERSION = 1
+
+
+# =====================================================================
+#                           SHARD CACHE
+# =====================================================================
+
+def config_key(name, num_samples, seed, shard_size):
+    """Short hash of everything that determines the generated data."""
+    config = {"name": name, "samples": num_samples, "seed": seed, "shard_size": shard_size,
+              "version": FORMAT_VERSION}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def merge_scaler(scaler, shard):
+    if scaler is None:
+        return shard
+    return {
+        "x_min": np.minimum(scaler["x_min"], shard["x_min"]).tolist(),
+        "x_max": np.maximum(scaler["x_max"], shard["x_max"]).tolist(),
+        "y_min": np.minimum(scaler["y_min"], shard["y_min"]).tolist(),
+        "y_max": np.maximum(scaler["y_max"], shard["y_max"]).tolist(),
+    }
+
+
+def build_shards(name, num_samples, seed=42, shard_size=DEFAULT_SHARD_SIZE, cache_dir=None, log=print):
+    """Return the dataset directory for this config, generating the shards if missing.
+
+    Shard ``i`` is drawn with seed ``[seed, i]``, so only one shard is in memory at a time.
+    The manifest is written last; a directory without one is an interrupted build and is
+    regenerated.
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    path = os.path.join(cache_dir, f"{name}-{config_key(name, num_samples, seed, shard_size)}")
+    if os.path.exists(os.path.join(path, "manifest.json")):
+        return path
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    lengths, scaler = [], None
+    for i, start in enumerate(range(0, num_samples, shard_size)):
+        X, y = GENERATORS[name](min(shard_size, num_samples - start), [seed, i])
+        np.save(os.path.join(path, f"X_{i:05d}.npy"), X)
+        np.save(os.path.join(path, f"y_{i:05d}.npy"), y)
+        lengths.append(len(X))
+        scaler = merge_scaler(scaler, fit_scaler(X, y))
+    manifest = {"name": name, "samples": num_samples, "seed": seed, "shard_size": shard_size,
+                "version": FORMAT_VERSION, "lengths": lengths, "scaler": scaler}
+    with open(os.path.join(path, "manifest.json.tmp"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(os.path.join(path, "manifest.json.tmp"), os.path.join(path, "manifest.json"))
+    log(f"Cached {num_samples} {name} samples in {len(lengths)} shard(s) at {path}")
+    return path
+
+
+def load_manifest(path):
+    with open(os.path.join(path, "manifest.json")) as f:
+        return json.load(f)
+
+
+# =====================================================================
+#                       DATASET / DATALOADER
+# =====================================================================
+
+class ShardedDataset(Dataset):
+    """Min-max scaled (x, y) batches read from memory-mapped shards.
+
+    Indexed with a list of sample indices (one batch) rather than a single sample, so a
+    DataLoader worker does one fancy-indexed read per shard instead of one per row. The
+    shards are opened lazily, so each worker process maps its own copy.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.manifest = load_manifest(path)
+        self.offsets = np.cumsum([0] + self.manifest["lengths"])
+        self.scaler = self.manifest["scaler"]
+        self._shards = None
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def shards(self):
+        if self._shards is None:
+            self._shards = [
+                (np.load(os.path.join(self.path, f"X_{i:05d}.npy"), mmap_mode="r"),
+                 np.load(os.path.join(self.path, f"y_{i:05d}.npy"), mmap_mode="r"))
+                for i in range(len(self.manifest["lengths"]))
+            ]
+        return self._shards
+
+    def __getitem__(self, indices):
+        indices = np.asarray(indices)
+        shards = self.shards()
+        shard_ids = np.searchsorted(self.offsets, indices, side="right") - 1
+        X = np.empty((len(indices),) + shards[0][0].shape[1:], dtype=np.float32)
+        y = np.empty((len(indices),) + shards[0][1].shape[1:], dtype=np.float32)
+        for shard_id in np.unique(shard_ids):
+            rows = np.flatnonzero(shard_ids == shard_id)
+            local = indices[rows] - self.offsets[shard_id]
+            order = np.argsort(local)  # mmap reads in file order
+            X_mm, y_mm = shards[shard_id]
+            X[rows[order]] = X_mm[local[order]]
+            y[rows[order]] = y_mm[local[order]]
+        return (torch.from_numpy(scale(X, self.scaler["x_min"], self.scaler["x_max"])),
+                torch.from_numpy(scale(y, self.scaler["y_min"], self.scaler["y_max"])))
+
+
+class RangeBatches:
+    """Batches of sample indices in [start, stop), reshuffled every epoch with ``shuffle``."""
+
+    def __init__(self, start, stop, batch_size=32, shuffle=False):
+        self.start, self.stop, self.batch_size, self.shuffle = start, stop, batch_size, shuffle
+
+    def __iter__(self):
+        n = self.stop - self.start
+        order = torch.randperm(n).numpy() if self.shuffle else np.arange(n)
+        for i in range(0, n, self.batch_size):
+            yield order[i:i + self.batch_size] + self.start
+
+    def __len__(self):
+        return -(-(self.stop - self.start) // self.batch_size)
+
+
+def make_loader(dataset, start, stop, batch_size=32, shuffle=False, workers=0, pin_memory=None):
+    """DataLoader over samples [start, stop) of a ShardedDataset.
+
+    ``pin_memory`` defaults to on when CUDA is available; pinning only speeds up host to
+    device copies.
+    """
+    return DataLoader(
+        dataset,
+        sampler=RangeBatches(start, stop, batch_size, shuffle),
+        batch_size=None,
+        num_workers=workers,
+        pin_memory=torch.cuda.is_available() if pin_memory is None else pin_memory,
+        persistent_workers=workers > 0,
+    )
+
+
+def fit_cached(model, path, epochs=100, batch_size=32, lr=0.001, val_fraction=0.2, workers=0, early_stop=None,
+               log=print):
+    """``training.fit`` over a shard directory; returns (scaler, per-epoch validation losses)."""
+    dataset = ShardedDataset(path)
+    split = int((1 - val_fraction) * len(dataset))
+    train_loader = make_loader(dataset, 0, split, batch_size, shuffle=True, workers=workers)
+    val_loader = make_loader(dataset, split, len(dataset), max(batch_size, 4096), workers=workers)
+    return dataset.scaler, run_epochs(model, train_loader, val_loader, epochs, lr, early_stop, log)
@@ -0,0 +1,143 @@
+"""
+Air2Earth - response encodings
+Content negotiation for /v1/<model> results. The Accept header (or ?format=) picks compact
+JSON (the default), MessagePack or Arrow IPC:
+
+    Accept: application/json | application/msgpack | application/vnd.apache.arrow.stream
+
+"fields" (body option or ?fields=) keeps only the listed sections or "section.field" paths,
+e.g. "predictions,derived.energy_year_kwh", dropping the echoed input_conditions and
+constants. "layout": "columns" sends a batch as {column: [values]} with nested keys
+joined by "." (Arrow is always columnar).
+
+msgpack and pyarrow are optional; asking for an encoding whose package is missing gives
+HTTP 406.
+"""
+
+import json
+
+from starlette.responses import Response
+
+from .rest import RequestError
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+ACCEPT_ALIASES = {
+    "application/json": "json",
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.apache.arrow.stream": "arrow",
+}
+LAYOUTS = ("rows", "columns")
+
+
+class NotAcceptable(RequestError):
+    """An encoding that is unknown or whose optional package is not installed (HTTP 406)."""
+
+    status_code = 406
+
+
+def negotiate(request):
+    """'json', 'msgpack' or 'arrow' from ?format= or the Accept header (JSON by default)."""
+    fmt = request.query_params.get("format")
+    if fmt is not None:
+        if fmt not in MEDIA_TYPES:
+            raise NotAcceptable(f"format must be one of: {', '.join(MEDIA_TYPES)}")
+        return fmt
+    for item in request.headers.get("accept", "").split(","):
+        media_type = item.split(";")[0].strip().lower()
+        if media_type in ACCEPT_ALIASES:
+            return ACCEPT_ALIASES[media_type]
+    return "json"
+
+
+def parse_projection(request, body):
+    """(fields or None, layout) from the query string, falling back to the body options."""
+    options = body if isinstance(body, dict) else {}
+    fields = request.query_params.get("fields", options.get("fields"))
+    layout = request.query_params.get("layout", options.get("layout", "rows"))
+    if isinstance(fields, str):
+        fields = [name.strip() for name in fields.split(",") if name.strip()]
+    if fields is not None and (not isinstance(fields, list) or not all(isinstance(f, str) for f in fields)):
+        raise RequestError("fields must be a list or a comma-separated string of names")
+    if layout not in LAYOUTS:
+        raise RequestError(f"layout must be one of: {', '.join(LAYOUTS)}")
+    return fields or None, layout
+
+
+def project(payload, fields):
+    """Copy of ``payload`` keeping only the listed keys or "section.field" paths."""
+    out = {}
+    for name in fields:
+        key, _, sub = name.partition(".")
+        if key not in payload or sub and (not isinstance(payload[key], dict) or sub not in payload[key]):
+            raise RequestError(f"Unknown field '{name}'. Available: {', '.join(flatten(payload))}")
+        if sub:
+            out.setdefault(key, {})[sub] = payload[key][sub]
+        else:
+            out[key] = payload[key]
+    return out
+
+
+def project_events(events, fields):
+    """Apply ``project`` to the "results" of streamed (event, data) pairs."""
+    for event, data in events:
+        if "results" in data:
+            data = {**data, "results": [project(r, fields) for r in data["results"]]}
+        yield event, data
+
+
+def flatten(payload, prefix=""):
+    """Flatten nested result dicts into {"predictions.pm25_reduction_ugm3": ..., ...}."""
+    flat = {}
+    for key, value in payload.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def to_columns(results):
+    """{column: [values]} over the flattened results; missing values are None."""
+    flat = [flatten(r) for r in results]
+    names = list(dict.fromkeys(name for row in flat for name in row))
+    return {name: [row.get(name) for row in flat] for name in names}
+
+
+def encode_msgpack(payload):
+    try:
+        import msgpack
+    except ImportError:
+        raise NotAcceptable("msgpack is not installed on the server; pip install msgpack") from None
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def encode_arrow(columns):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise NotAcceptable("pyarrow is not installed on the server; pip install pyarrow") from None
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_results(results, batched, fmt="json", fields=None, layout="rows"):
+    """Serialize predictor results as a Response in the negotiated encoding."""
+    if fields:
+        results = [project(r, fields) for r in results]
+    if fmt == "arrow":
+        return Response(encode_arrow(to_columns(results)), media_type=MEDIA_TYPES[fmt])
+    if layout == "columns":
+        payload = {"rows": len(results), "columns": to_columns(results)}
+    else:
+        payload = {"results": results} if batched else results[0]
+    if fmt == "msgpack":
+        return Response(encode_msgpack(payload), media_type=MEDIA_TYPES[fmt])
+    return Response(json.dumps(payload, separators=(",", ":")), media_type=MEDIA_TYPES[fmt])
@@ -0,0 +1,103 @@
+"""
+Air2Earth - TorchScript / ONNX export
+Writes a frozen TorchScript module (.pt) and an ONNX graph (.onnx) next to each model's
+.pth in its models/ folder, then checks every exported backend against the eager model.
+
+Usage:
+    cd backend
+    python -m air2earth.export                      # all five models, both formats
+    python -m air2earth.export --models tree solar --formats onnx
+"""
+
+import argparse
+import inspect
+import sys
+import warnings
+
+import numpy as np
+import torch
+
+from .common import SEQ_LEN
+from .runtime import OnnxRuntime, TorchScriptRuntime, artifact_paths, eager_model
+
+FORMATS = ("torchscript", "onnx")
+
+
+def export_torchscript(model, path):
+    """Script, freeze and save ``model``."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)  # torch>=2.9 flags torch.jit as deprecated
+        scripted = torch.jit.freeze(torch.jit.script(model.eval()))
+        torch.jit.save(scripted, path)
+
+
+def export_onnx(model, path):
+    """Export ``model`` to ONNX with a dynamic batch axis."""
+    dummy = torch.zeros(1, SEQ_LEN, model.lstm.input_size)
+    kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        kwargs["dynamo"] = False
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        torch.onnx.export(
+            model.eval(),
+            (dummy,),
+            path,
+            input_names=["x"],
+            output_names=["y"],
+            dynamic_axes={"x": {0: "batch"}, "y": {0: "batch"}},
+            opset_version=17,
+            **kwargs,
+        )
+
+
+def check_parity(model, model_path, formats, batch_size=64, seed=0):
+    """Return {format: max abs difference vs eager} on a random normalized batch."""
+    rng = np.random.default_rng(seed)
+    x = torch.from_numpy(rng.random((batch_size, SEQ_LEN, model.lstm.input_size), dtype=np.float32))
+    with torch.no_grad():
+        expected = model(x).numpy()
+
+    paths = artifact_paths(model_path)
+    runtimes = {"torchscript": TorchScriptRuntime, "onnx": OnnxRuntime}
+    diffs = {}
+    for fmt in formats:
+        runtime = runtimes[fmt](paths[fmt], model)
+        with torch.no_grad():
+            diffs[fmt] = float(np.abs(runtime(x).numpy() - expected).max())
+    return diffs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the LSTMs to TorchScript and ONNX")
+    parser.add_argument("--models", nargs="+", default=None, help="Registry names (default: all)")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--atol", type=float, default=1e-4, help="Max abs difference allowed vs eager")
+    parser.add_argument("--no-check", action="store_true", help="Skip the parity check")
+    args = parser.parse_args(argv)
+
+    from .registry import build_registry
+
+    registry = build_registry()
+    names = args.models or registry.names()
+    failed = False
+    for name in names:
+        entry = registry.get(name)
+        model = eager_model(entry.model)
+        paths = artifact_paths(entry.model_path)
+        for fmt in args.formats:
+            (export_torchscript if fmt == "torchscript" else export_onnx)(model, paths[fmt])
+            print(f"Exported {name} -> {paths[fmt]}")
+
+        if args.no_check:
+            continue
+        for fmt, diff in check_parity(model, entry.model_path, args.formats).items():
+            ok = diff <= args.atol
+            failed |= not ok
+            print(f"  parity {name}/{fmt}: max |diff| = {diff:.2e} {'OK' if ok else 'FAIL'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""
+Air2Earth - fast engine
+A serving tier that skips the LSTM. Water and solar targets are deterministic functions
+of the input sequence (the calculations.ts formulas the notebooks train on), so the fast
+engine evaluates those formulas directly on the same sequences the LSTM would see. The
+tree, garden and purifier targets include random draws (species, CADR, ...) the inputs
+cannot explain, so the LSTM learns their expectation; those three are distilled into a
+small NumPy MLP over the base inputs, trained on the LSTM's own predictions.
+
+Select it per request with "engine": "fast" on /v1/<model> or /v1/grid/<placement>;
+"engine": "lut" selects the interpolation lookup tables of lut.py the same way.
+
+    cd backend
+    python -m air2earth.fast distill all      # writes aqi-model/models/<name>_fast.npz
+    python -m air2earth.fast report           # error and speed against the LSTM
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from .cache import weights_hash
+
+ENGINES = ("lstm", "fast", "lut")
+BUILD_COMMANDS = {
+    "fast": "python -m air2earth.fast distill {name}",
+    "lut": "python -m air2earth.lut build {name}",
+}
+MLP_MODELS = ("tree", "garden", "purifier")
+FORMULA_MODELS = ("water", "solar")
+MLP_HIDDEN = 64
+
+_surrogates = {}
+_lock = threading.Lock()
+
+
+# =====================================================================
+#                         CLOSED FORM
+# =====================================================================
+
+def formula_outputs(name, sequences):
+    """calculations.ts targets (N, O) for (N, 24, F) water or solar sequences."""
+    from .training import solar_targets, water_targets
+
+    return water_targets(sequences) if name == "water" else solar_targets(sequences)
+
+
+# =====================================================================
+#                         DISTILLED MLP
+# =====================================================================
+
+def surrogate_path(name):
+    from .aqi import MODEL_DIR
+
+    return os.path.join(MODEL_DIR, f"{name}_fast.npz")
+
+
+def load_surrogate(name):
+    """The distilled MLP's arrays for ``name``, read once per process."""
+    if name not in _surrogates:
+        with _lock:
+            if name not in _surrogates:
+                path = surrogate_path(name)
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"{path} not found; run python -m air2earth.fast distill {name}")
+                with np.load(path) as f:
+                    _surrogates[name] = {key: f[key] for key in f.files}
+    return _surrogates[name]
+
+
+def mlp_outputs(name, rows):
+    """Denormalized (N, O) predictions of the distilled MLP for base-input rows."""
+    p = load_surrogate(name)
+    x = (np.asarray(rows, dtype=np.float32) - p["x_min"]) / (p["x_max"] - p["x_min"] + 1e-8)
+    h = np.maximum(x @ p["w0"] + p["b0"], 0)
+    h = np.maximum(h @ p["w1"] + p["b1"], 0)
+    y = h @ p["w2"] + p["b2"]
+    return y * (p["y_max"] - p["y_min"] + 1e-8) + p["y_min"]
+
+
+def check_engine(engine):
+    """Raise ValueError unless ``engine`` is one of ENGINES."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose from: {', '.join(ENGINES)}")
+    return engine
+
+
+def fast_outputs(name, rows, sequences=None, engine="fast"):
+    """(N, O) predictions of the non-LSTM ``engine`` ("fast" or "lut") in the LSTM's output order.
+
+    The MLPs and lookup tables read the base-input ``rows``; the formulas read
+    ``sequences``, the (N, 24, F) inputs the LSTM would have seen. A missing artifact
+    raises FileNotFoundError rather than falling back to another engine.
+    """
+    if engine == "lut":
+        from .lut import lut_outputs
+
+        return lut_outputs(name, rows)
+    if engine != "fast":
+        raise ValueError(f"fast_outputs serves the 'fast' and 'lut' engines, not '{engine}'")
+    if name in MLP_MODELS:
+        return mlp_outputs(name, rows)
+    return formula_outputs(name, sequences)
+
+
+def engine_available(name, engine):
+    """Whether ``engine``'s offline artifact exists for ``name``."""
+    if engine == "lut":
+        from .lut import available
+
+        return available(name)
+    if engine == "fast" and name in MLP_MODELS:
+        return os.path.exists(surrogate_path(name))
+    return engine in ("lstm", "fast")
+
+
+def engine_artifacts(name, engine):
+    """Offline files ``engine`` serves ``name`` from (none for the LSTM or the formulas)."""
+    if engine == "lut":
+        from .lut import table_paths
+
+        return table_paths(name)
+    if engine == "fast" and name in MLP_MODELS:
+        return (surrogate_path(name),)
+    return ()
+
+
+def engine_label(name, engine="fast"):
+    if engine == "lut":
+        return "lookup table"
+    return "distilled MLP" if name in MLP_MODELS else "closed-form"
+
+
+def label_results(results, engine="fast"):
+    """Mark non-LSTM payloads with an "engine" field next to the model's own "model" field."""
+    for result in results:
+        result["engine"] = engine
+    return results
+
+
+def distill(name, num_samples=50000, epochs=200, batch_size=256, lr=0.003, seed=0, log=print):
+    """Fit the MLP for ``name`` to its LSTM's predictions and save it as <name>_fast.npz.
+
+    Rows are the last readings of the training generator's sequences; the LSTM sees them
+    through the serving path's synthetic sequences, so the MLP learns what /v1/<name>
+    returns.
+    """
+    import torch
+    import torch.nn as nn
+
+    from .aqi import PLACEMENTS, predict_outputs
+    from .training import GENERATORS, TensorBatches, fit_scaler, run_epochs, scale
+
+    rng = np.random.default_rng(seed)
+    rows = GENERATORS[name](num_samples, seed)[0][:, -1, :]
+    start = time.perf_counter()
+    targets = predict_outputs(name, rows, rng=rng)
+    log(f"{name}: {num_samples} LSTM teacher predictions in {time.perf_counter() - start:.1f} s")
+
+    scaler = fit_scaler(rows[:, None, :], targets)
+    x = torch.from_numpy(scale(rows, scaler["x_min"], scaler["x_max"]))
+    y = torch.from_numpy(scale(targets, scaler["y_min"], scaler["y_max"]))
+    split = int(0.8 * num_samples)
+    torch.manual_seed(seed)
+    model = nn.Sequential(
+        nn.Linear(rows.shape[1], MLP_HIDDEN), nn.ReLU(),
+        nn.Linear(MLP_HIDDEN, MLP_HIDDEN), nn.ReLU(),
+        nn.Linear(MLP_HIDDEN, len(PLACEMENTS[name][3])),
+    )
+    run_epochs(model, TensorBatches(x[:split], y[:split], batch_size, shuffle=True),
+               TensorBatches(x[split:], y[split:], 4096), epochs, lr, early_stop=30, log=log)
+
+    layers = [m for m in model if isinstance(m, nn.Linear)]
+    arrays = {key: np.asarray(value, dtype=np.float32) for key, value in scaler.items()}
+    for i, layer in enumerate(layers):
+        arrays[f"w{i}"] = layer.weight.detach().numpy().T.copy()
+        arrays[f"b{i}"] = layer.bias.detach().numpy().copy()
+    np.savez(surrogate_path(name), **arrays)
+    _surrogates.pop(name, None)
+    weights_hash.cache_clear()
+    log(f"Saved {surrogate_path(name)}")
+
+
+# =====================================================================
+#                          ERROR REPORT
+# =====================================================================
+
+def error_report(names=None, num_rows=20000, seed=7):
+    """{name: {"outputs": {field: (MAE, MAE / LSTM std, max abs error)}, "us_per_row": ...}}.
+
+    Both engines score the same rows and the same synthetic sequences, and the errors are
+    taken on the served "predictions" values; the timings cover the prediction arrays only,
+    not the JSON payloads.
+    """
+    from .common import run_batch
+    from .registry import build_registry
+    from .training import GENERATORS
+
+    registry = build_registry()
+    report = {}
+    for name in names or MLP_MODELS + FORMULA_MODELS:
+        entry = registry.get(name)
+        rows = GENERATORS[name](num_rows, seed)[0][:, -1, :]
+        sequences = entry.build_sequences(rows, rng=np.random.default_rng(seed))
+        out_dim = len(entry.scaler["y_min"])
+
+        start = time.perf_counter()
+        lstm = run_batch(entry.model, sequences, entry.scaler, len(entry.inputs), out_dim)
+        lstm_s = time.perf_counter() - start
+        start = time.perf_counter()
+        fast = fast_outputs(name, rows, sequences)
+        fast_s = time.perf_counter() - start
+
+        served = {engine: np.array([list(entry.format_result(pred, row)["predictions"].values())
+                                    for pred, row in zip(preds, rows)])
+                  for engine, preds in (("lstm", lstm), ("fast", fast))}
+        fields = list(entry.format_result(lstm[0], rows[0])["predictions"])
+        error = np.abs(served["fast"] - served["lstm"])
+        report[name] = {
+            "engine": engine_label(name),
+            "outputs": {
+                field: (float(error[:, i].mean()), float(error[:, i].mean() / (served["lstm"][:, i].std() + 1e-12)),
+                        float(error[:, i].max()))
+                for i, field in enumerate(fields)
+            },
+            "us_per_row": {"lstm": lstm_s / num_rows * 1e6, "fast": fast_s / num_rows * 1e6},
+        }
+    return report
+
+
+def format_report(report):
+    lines = []
+    for name, r in report.items():
+        lstm_us, fast_us = r["us_per_row"]["lstm"], r["us_per_row"]["fast"]
+        lines.append(f"{name} ({r['engine']}): LSTM {lstm_us:.2f} us/row, fast {fast_us:.3f} us/row "
+                     f"({lstm_us / fast_us:.0f}x)")
+        for field, (mae, rel, worst) in r["outputs"].items():
+            lines.append(f"    {field:<28} MAE {mae:>10.4f}  MAE/std {rel:>6.3f}  max {worst:>10.4f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fast engine: distill the AQI LSTMs and report errors")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("distill")
+    p.add_argument("models", nargs="+", choices=list(MLP_MODELS) + ["all"])
+    p.add_argument("--samples", type=int, default=50000)
+    p.add_argument("--epochs", type=int, default=200)
+    p.add_argument("--seed", type=int, default=0)
+    p = sub.add_parser("report")
+    p.add_argument("--models", nargs="+", choices=MLP_MODELS + FORMULA_MODELS, default=None)
+    p.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    if args.command == "distill":
+        names = MLP_MODELS if "all" in args.models else args.models
+        for name in names:
+            distill(name, args.samples, args.epochs, seed=args.seed)
+    else:
+        print(format_report(error_report(args.models, args.rows)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
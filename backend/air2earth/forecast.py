@@ -0,0 +1,193 @@
+"""
+Air2Earth - multi-step forecasts
+POST /v1/forecast/<model> returns each row's predicted trajectory over the next
+``horizon`` hourly steps instead of a single vector:
+
+    {"rows": [...], "horizon": 48}                   synthetic history and drivers
+    {"sequences": [...], "future": [...]}            observed history, forecast drivers
+
+Step t is scored on its own sliding 24-step window, the 24 hours ending at t: step 0 is
+the ordinary prediction on the history, and later windows slide into the horizon's input
+drivers. The models were only trained on 24-step sequences, so carrying the LSTM state
+further would drift out of distribution. The drivers are the caller's "future" readings
+((H, F) shared by every row or (N, H, F)) or, without them, the model's own synthetic
+continuation of each row (diurnal sun, storm surges, ...) or, for observed histories, the
+last reading held constant. The windows of all rows and steps are scored together as one
+(N * steps, 24, F) batch.
+
+With "stream" (see rest.stream_format) the horizon is computed in blocks of "chunk" steps
+and each block is sent as an NDJSON line or server-sent event as soon as it is ready.
+"""
+
+import time
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from .common import SEQ_LEN, run_batch
+from .rest import (
+    RequestError,
+    compact_json,
+    load_npy,
+    parse_body,
+    parse_sequences,
+    read_json,
+    stream_chunk,
+    stream_format,
+    stream_response,
+)
+from .runtime import eager_model
+from .sweep import numeric_fields
+
+MAX_HORIZON = 24 * 30
+MAX_FORECAST_POINTS = 200_000
+DEFAULT_CHUNK = 24
+FORWARD_BATCH = 16384      # windows per forward pass, bounding the LSTM's activations
+
+
+def forecast_inputs(entry, rows, horizon, sequences=None, future=None, rng=None):
+    """Raw (N, SEQ_LEN + horizon, F) inputs: the history followed by the horizon's drivers."""
+    if sequences is not None:
+        history = np.asarray(sequences, dtype=np.float64)
+        if history.ndim == 2:
+            history = history[None]
+    elif future is None:
+        return entry.build_sequences(rows, rng=rng, seq_len=SEQ_LEN + horizon).astype(np.float64)
+    else:
+        history = entry.build_sequences(rows, rng=rng).astype(np.float64)
+
+    n = len(history)
+    if future is None:
+        drivers = np.repeat(history[:, -1:, :], horizon, axis=1)
+    else:
+        drivers = np.asarray(future, dtype=np.float64)
+        if drivers.ndim == 2:
+            drivers = np.broadcast_to(drivers, (n,) + drivers.shape)
+        if len(drivers) != n:
+            raise ValueError(f"future has {len(drivers)} sequences for {n} rows")
+        if drivers.shape[1] != horizon:
+            raise ValueError(f"future has {drivers.shape[1]} steps, horizon is {horizon}")
+    return np.concatenate([history, drivers], axis=1)
+
+
+def rollout(entry, raw, chunk_size=None):
+    """Yield (first step, denormalized (N, steps, out) predictions) blocks over the horizon.
+
+    Step t is predicted from the window raw[:, t:t + SEQ_LEN]; without ``chunk_size`` the
+    whole horizon is one block.
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(raw, SEQ_LEN, axis=1).transpose(0, 1, 3, 2)
+    n, total = windows.shape[:2]
+    output_dim = eager_model(entry.model).fc[-1].out_features
+    chunk_size = chunk_size or total
+    for step in range(0, total, chunk_size):
+        block = windows[:, step:step + chunk_size].reshape(-1, SEQ_LEN, raw.shape[2]).astype(np.float32)
+        preds = np.concatenate([
+            run_batch(entry.model, block[i:i + FORWARD_BATCH], entry.scaler, len(entry.inputs), output_dim)
+            for i in range(0, len(block), FORWARD_BATCH)
+        ])
+        yield step, preds.reshape(n, -1, output_dim)
+
+
+def trajectories(entry, preds, raw, first_step):
+    """Per-row {field: [values]} of the numeric payload fields for one block."""
+    results = []
+    for n in range(len(preds)):
+        payloads = [entry.format_result(preds[n, t], tuple(raw[n, SEQ_LEN - 1 + first_step + t]))
+                    for t in range(preds.shape[1])]
+        fields = numeric_fields(payloads[0])
+        results.append({field: [p[section][field] for p in payloads] for section, field in fields})
+    return results
+
+
+def forecast_blocks(entry, rows, horizon, sequences=None, future=None, rng=None, chunk_size=None):
+    """Yield (first step, [per-row trajectories]) blocks; see ``forecast``."""
+    raw = forecast_inputs(entry, rows, horizon, sequences, future, rng)
+    for step, preds in rollout(entry, raw, chunk_size):
+        yield step, trajectories(entry, preds, raw, step)
+
+
+def forecast(entry, rows, horizon, sequences=None, future=None, rng=None):
+    """Trajectories over steps 0..horizon for ``rows`` (or observed ``sequences``).
+
+    Returns one {field: [horizon + 1 values]} dict per row.
+    """
+    _, results = next(forecast_blocks(entry, rows, horizon, sequences, future, rng))
+    return results
+
+
+# =====================================================================
+#                            ROUTES
+# =====================================================================
+
+def forecast_events(entry, rows, horizon, sequences=None, future=None, rng=None, chunk=DEFAULT_CHUNK):
+    """start / one chunk per ``chunk`` steps / end events for a streamed forecast."""
+    start = time.perf_counter()
+    yield "start", {"model": entry.name, "horizon": horizon, "chunk": chunk}
+    for step, results in forecast_blocks(entry, rows, horizon, sequences, future, rng, chunk):
+        steps = len(next(iter(results[0].values())))
+        yield "chunk", {"steps": [step, step + steps - 1], "results": results}
+    yield "end", {"seconds": round(time.perf_counter() - start, 3)}
+
+
+def parse_forecast(body, entry, npy=None):
+    """(rows, sequences, future, horizon, batched, seed, chunk) from a request body."""
+    if npy is not None:
+        body = {"sequences": npy}
+    if isinstance(body, dict) and "sequences" in body:
+        rows = None
+        sequences, batched = parse_sequences(body["sequences"], entry.inputs)
+    else:
+        sequences = None
+        rows, batched = parse_body(body, entry.inputs)
+    options = body if isinstance(body, dict) else {}
+
+    future = None
+    if options.get("future") is not None:
+        future, _ = parse_sequences(options["future"], entry.inputs, seq_len=None, label="future")
+    try:
+        horizon = int(options.get("horizon", DEFAULT_CHUNK if future is None else future.shape[-2]))
+        seed = None if options.get("seed") is None else int(options["seed"])
+    except (TypeError, ValueError):
+        raise RequestError("horizon and seed must be integers") from None
+    if not 1 <= horizon <= MAX_HORIZON:
+        raise RequestError(f"horizon must be between 1 and {MAX_HORIZON}")
+    n = len(sequences if rows is None else rows) if batched else 1
+    if future is not None and future.ndim == 3 and len(future) != n:
+        raise RequestError(f"future has {len(future)} sequences for {n} rows")
+    if future is not None and future.shape[-2] != horizon:
+        raise RequestError(f"future has {future.shape[-2]} steps, horizon is {horizon}")
+    if n * (horizon + 1) > MAX_FORECAST_POINTS:
+        raise RequestError(f"{n} rows x {horizon + 1} steps exceeds {MAX_FORECAST_POINTS} forecast points")
+    return rows, sequences, future, horizon, batched, seed, stream_chunk(options, DEFAULT_CHUNK)
+
+
+def register_forecast_routes(api, registry):
+    """Add POST /v1/forecast/<model> for every model in ``registry``."""
+
+    async def run_forecast(request: Request):
+        name = request.path_params["name"]
+        if name not in registry:
+            return compact_json({"error": f"Unknown model '{name}'"}, 404)
+        entry = registry.get(name)
+        try:
+            if request.headers.get("content-type", "").startswith("application/x-npy"):
+                body, npy = {}, load_npy(await request.body())
+            else:
+                body, npy = await read_json(request), None
+            rows, sequences, future, horizon, batched, seed, chunk = parse_forecast(body, entry, npy)
+            fmt = stream_format(request, body)
+        except RequestError as e:
+            return compact_json({"error": str(e)}, 400)
+        rng = np.random.default_rng(seed)
+        if fmt is not None:
+            return stream_response(request, fmt, forecast_events(entry, rows, horizon, sequences, future, rng, chunk))
+
+        start = time.perf_counter()
+        results = await run_in_threadpool(forecast, entry, rows, horizon, sequences, future, rng)
+        meta = {"model": name, "horizon": horizon, "seconds": round(time.perf_counter() - start, 3)}
+        return compact_json({**meta, "results": results} if batched else {**meta, "trajectory": results[0]})
+
+    api.add_route("/v1/forecast/{name}", run_forecast, methods=["POST"])
+    return api
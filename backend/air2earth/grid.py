@@ -0,0 +1,206 @@
+"""
+Air2Earth - geospatial grid sweep
+POST /v1/grid/<placement> scores a tree, garden or purifier placement over every cell of
+a bounding-box grid and returns one float32 raster per output field, ready to drape over
+the Cesium AQI map.
+
+Per-cell inputs come from "fields" (a constant, or a flat list of width*height values) or
+are inverse-distance interpolated from a "stations" layer of {"lon", "lat", <inputs>}.
+Rasters are row-major from the north-west corner. "engine": "fast" or "lut" scores the
+cells with the distilled MLPs or lookup tables instead of the LSTMs (see fast.py, lut.py).
+"""
+
+import base64
+import math
+import time
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .rest import RequestError, compact_json, parse_engine, read_json
+
+MAX_GRID_CELLS = 1_000_000
+ENCODINGS = ("base64", "array", "binary")
+
+
+def grid_shape(body, bbox):
+    """(width, height) from "width"/"height" or a "cell_size" in degrees."""
+    west, south, east, north = bbox
+    try:
+        if "cell_size" in body:
+            cell = float(body["cell_size"])
+            if not math.isfinite(cell) or cell <= 0:
+                raise RequestError("cell_size must be a positive finite number")
+            width = int(np.ceil((east - west) / cell))
+            height = int(np.ceil((north - south) / cell))
+        else:
+            width, height = int(body["width"]), int(body["height"])
+    except RequestError:
+        raise
+    except KeyError:
+        raise RequestError("Give either width and height or cell_size") from None
+    except (TypeError, ValueError, OverflowError):
+        raise RequestError("width, height and cell_size must be numeric") from None
+    if width < 1 or height < 1:
+        raise RequestError("The grid needs at least one cell")
+    if width * height > MAX_GRID_CELLS:
+        raise RequestError(f"{width}x{height} grid exceeds {MAX_GRID_CELLS} cells")
+    return width, height
+
+
+def cell_centers(bbox, width, height):
+    """Flat (lon, lat) arrays of cell centers, row-major from the north-west corner."""
+    west, south, east, north = bbox
+    lons = west + (np.arange(width) + 0.5) * (east - west) / width
+    lats = north - (np.arange(height) + 0.5) * (north - south) / height
+    lon, lat = np.meshgrid(lons, lats)
+    return lon.ravel(), lat.ravel()
+
+
+def idw(station_lon, station_lat, values, lon, lat, power=2.0, chunk=65536):
+    """Inverse-distance-weighted interpolation of station ``values`` at (lon, lat)."""
+    scale = np.cos(np.radians(np.mean(station_lat)))
+    out = np.empty(len(lon))
+    for start in range(0, len(lon), chunk):
+        dx = (lon[start:start + chunk, None] - station_lon[None, :]) * scale
+        dy = lat[start:start + chunk, None] - station_lat[None, :]
+        weights = 1.0 / np.maximum(dx * dx + dy * dy, 1e-12) ** (power / 2)
+        out[start:start + chunk] = weights @ values / weights.sum(axis=1)
+    return out
+
+
+def cell_inputs(body, inputs, lon, lat):
+    """(cells, F) input matrix from "fields" overrides and the "stations" layer."""
+    fields = body.get("fields") or {}
+    stations = body.get("stations") or []
+    if not isinstance(fields, dict) or not isinstance(stations, list):
+        raise RequestError("'fields' must be an object and 'stations' a list")
+    try:
+        station_lon = np.array([float(s["lon"]) for s in stations])
+        station_lat = np.array([float(s["lat"]) for s in stations])
+    except (KeyError, TypeError, ValueError):
+        raise RequestError("Each station needs numeric 'lon' and 'lat'") from None
+
+    columns = []
+    for name in inputs:
+        if name in fields:
+            try:
+                column = np.broadcast_to(np.asarray(fields[name], dtype=np.float64), lon.shape)
+            except (TypeError, ValueError):
+                raise RequestError(f"Field '{name}' must be a number or a list of {lon.size} numbers") from None
+        elif stations and all(name in s for s in stations):
+            try:
+                values = np.array([float(s[name]) for s in stations])
+            except (TypeError, ValueError):
+                raise RequestError(f"Station values for '{name}' must be numeric") from None
+            column = idw(station_lon, station_lat, values, lon, lat)
+        else:
+            raise RequestError(f"No field or station value for input '{name}'")
+        columns.append(column)
+    rows = np.stack(columns, axis=1)
+    if not np.isfinite(rows).all():
+        raise RequestError("Inputs contain NaN or infinite values")
+    return rows
+
+
+def sweep_grid(placement, body):
+    """Evaluate ``placement`` over the requested grid; returns (meta, {field: float32 raster})."""
+    from . import aqi
+
+    if placement not in aqi.PLACEMENTS:
+        raise RequestError(f"Unknown placement '{placement}'")
+    _, inputs, _, outputs = aqi.PLACEMENTS[placement]
+    try:
+        bbox = [float(v) for v in body["bbox"]]
+    except (KeyError, TypeError, ValueError):
+        raise RequestError("'bbox' must be [west, south, east, north]") from None
+    if not all(math.isfinite(v) for v in bbox):
+        raise RequestError("'bbox' values must be finite")
+    if len(bbox) != 4 or bbox[0] >= bbox[2] or bbox[1] >= bbox[3]:
+        raise RequestError("'bbox' must be [west, south, east, north] with west < east and south < north")
+    width, height = grid_shape(body, bbox)
+    names = [name for name, _, _, _ in outputs]
+    selected = body.get("outputs") or names
+    if not isinstance(selected, list) or not all(isinstance(name, str) for name in selected):
+        raise RequestError("'outputs' must be a list of output names")
+    unknown = [name for name in selected if name not in names]
+    if unknown:
+        raise RequestError(f"Unknown output(s): {', '.join(unknown)}. Available: {', '.join(names)}")
+
+    try:
+        seed = int(body.get("seed", 0))
+    except (TypeError, ValueError):
+        raise RequestError("seed must be an integer") from None
+    engine = parse_engine(body, placement)
+
+    start = time.perf_counter()
+    lon, lat = cell_centers(bbox, width, height)
+    rows = cell_inputs(body, inputs, lon, lat)
+    rng = np.random.default_rng(seed)
+    preds = aqi.predict_outputs(placement, rows, rng=rng, engine=engine)
+    rasters = {name: preds[:, names.index(name)].reshape(height, width) for name in selected}
+    meta = {
+        "placement": placement,
+        "engine": engine,
+        "bbox": bbox,
+        "width": width,
+        "height": height,
+        "order": "row-major, north-west origin",
+        "dtype": "float32",
+        "stats": {
+            name: {
+                "min": round(float(r.min()), 4),
+                "max": round(float(r.max()), 4),
+                "mean": round(float(r.mean()), 4),
+            }
+            for name, r in rasters.items()
+        },
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    return meta, rasters
+
+
+def encode_rasters(meta, rasters, encoding):
+    """JSON (base64 float32 or nested lists) or raw float32 bytes stacked field by field."""
+    if encoding == "binary":
+        payload = b"".join(np.ascontiguousarray(r, dtype="<f4").tobytes() for r in rasters.values())
+        headers = {
+            "X-Raster-Width": str(meta["width"]),
+            "X-Raster-Height": str(meta["height"]),
+            "X-Raster-Fields": ",".join(rasters),
+            "X-Raster-Bbox": ",".join(str(v) for v in meta["bbox"]),
+        }
+        return Response(payload, media_type="application/octet-stream", headers=headers)
+    if encoding == "base64":
+        data = {name: base64.b64encode(np.ascontiguousarray(r, dtype="<f4").tobytes()).decode("ascii")
+                for name, r in rasters.items()}
+    else:
+        data = {name: np.round(r, 4).tolist() for name, r in rasters.items()}
+    return compact_json({**meta, "encoding": encoding, "rasters": data})
+
+
+def register_grid_routes(api):
+    """Add POST /v1/grid/<placement>."""
+
+    from .aqi import PLACEMENTS
+
+    async def grid(request: Request):
+        placement = request.path_params["placement"]
+        if placement not in PLACEMENTS:
+            return compact_json({"error": f"Unknown placement '{placement}'"}, 404)
+        try:
+            body = await read_json(request)
+            if not isinstance(body, dict):
+                raise RequestError("Body must be an object")
+            encoding = body.get("encoding", "base64")
+            if encoding not in ENCODINGS:
+                raise RequestError(f"encoding must be one of: {', '.join(ENCODINGS)}")
+            meta, rasters = await run_in_threadpool(sweep_grid, placement, body)
+        except RequestError as e:
+            return compact_json({"error": str(e)}, e.status_code)
+        return encode_rasters(meta, rasters, encoding)
+
+    api.add_route("/v1/grid/{placement}", grid, methods=["POST"])
+    return api
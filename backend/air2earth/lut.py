@@ -0,0 +1,261 @@
+"""
+Air2Earth - interpolation lookup tables
+An offline builder scores a model on a dense regular grid over its input box (the scaler's
+x_min / x_max per input) and stores the predictions as a float32 .npy array of shape
+(*points, outputs) next to the weights. At serving time the table is memory-mapped and
+queries are answered by multilinear interpolation between the 2^F surrounding grid points,
+vectorized over the batch. Inputs outside the box are clamped to its faces.
+
+Every table is verified against the live LSTM on random rows in the box. If any output's
+mean absolute error exceeds ``budget`` times that output's spread, the grid is refined
+until it fits or reaches ``max_cells``. An output already within 10% of the LSTM's own
+noise floor (the error of a second LSTM pass with fresh sequence noise) also passes,
+since no grid can get closer to a single noisy LSTM pass than that.
+
+    cd backend
+    python -m air2earth.lut build purifier solar water --budget 0.02
+    python -m air2earth.lut verify purifier
+
+Select it per request with "engine": "lut" on /v1/<model> or /v1/grid/<placement>.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from .cache import weights_hash
+
+DEFAULT_POINTS = {"tree": 12, "garden": 12, "purifier": 24, "water": 10, "solar": 10}
+DEFAULT_BUDGET = 0.02      # max MAE / std of every output against the LSTM
+DEFAULT_MAX_CELLS = 4_000_000
+REFINE_FACTOR = 1.4        # per-axis growth when a table misses its budget
+NOISE_MARGIN = 1.1         # an output within 10% of the LSTM noise floor meets any budget
+BUILD_CHUNK = 65536
+
+_tables = {}
+_lock = threading.Lock()
+
+
+def table_paths(name):
+    """(array .npy, metadata .json) next to the model's weights."""
+    from .training import model_spec
+
+    model_dir = model_spec(name)[3]
+    return os.path.join(model_dir, f"{name}_lut.npy"), os.path.join(model_dir, f"{name}_lut.json")
+
+
+def available(name):
+    return all(os.path.exists(path) for path in table_paths(name))
+
+
+# =====================================================================
+#                          INTERPOLATION
+# =====================================================================
+
+class LookupTable:
+    """A memory-mapped (*points, O) prediction grid over the box [lo, hi]."""
+
+    def __init__(self, values, lo, hi, meta=None):
+        self.values = values
+        self.lo = np.asarray(lo, dtype=np.float64)
+        self.hi = np.asarray(hi, dtype=np.float64)
+        self.meta = meta or {}
+        self.points = np.array(values.shape[:-1])
+        self.flat = values.reshape(-1, values.shape[-1])
+        # Flat offset of each axis step and of each of the 2^F cell corners
+        self.strides = np.cumprod(np.r_[self.points[1:], 1][::-1])[::-1]
+        self.corners = np.array(list(itertools.product((0, 1), repeat=len(self.points))))
+        self.corner_offsets = self.corners @ self.strides
+
+    @classmethod
+    def load(cls, name):
+        array_path, meta_path = table_paths(name)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return cls(np.load(array_path, mmap_mode="r"), meta["lo"], meta["hi"], meta)
+
+    def __call__(self, rows, chunk_size=4096):
+        """Interpolated (N, O) predictions for (N, F) rows."""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(self.points))
+        out = np.empty((len(rows), self.flat.shape[1]), dtype=np.float32)
+        for start in range(0, len(rows), chunk_size):
+            out[start:start + chunk_size] = self.interpolate(rows[start:start + chunk_size])
+        return out
+
+    def interpolate(self, rows):
+        u = (np.clip(rows, self.lo, self.hi) - self.lo) / (self.hi - self.lo) * (self.points - 1)
+        i0 = np.minimum(u.astype(np.int64), self.points - 2)
+        frac = (u - i0)[:, None, :]
+        # (N, 2^F) corner weights: product over inputs of frac or 1 - frac
+        weights = np.where(self.corners, frac, 1 - frac).prod(axis=2)
+        values = self.flat[(i0 @ self.strides)[:, None] + self.corner_offsets]
+        return np.einsum("nc,nco->no", weights, values)
+
+
+def load_table(name):
+    """The memory-mapped table for ``name``, opened once per process."""
+    if name not in _tables:
+        with _lock:
+            if name not in _tables:
+                if not available(name):
+                    raise FileNotFoundError(f"No lookup table for '{name}'; run python -m air2earth.lut build {name}")
+                _tables[name] = LookupTable.load(name)
+    return _tables[name]
+
+
+def lut_outputs(name, rows):
+    return load_table(name)(rows)
+
+
+# =====================================================================
+#                             BUILDER
+# =====================================================================
+
+def lstm_outputs(entry, rows, rng):
+    from .common import run_batch
+
+    sequences = entry.build_sequences(rows, rng=rng)
+    return run_batch(entry.model, sequences, entry.scaler, len(entry.inputs), len(entry.scaler["y_min"]))
+
+
+def evaluate_grid(entry, points, path, seed=0, log=print):
+    """Score ``entry`` at every grid point into a new .npy memmap at ``path``."""
+    lo, hi = np.array(entry.scaler["x_min"]), np.array(entry.scaler["x_max"])
+    axes = [np.linspace(a, b, n) for a, b, n in zip(lo, hi, points)]
+    values = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32,
+                                       shape=tuple(points) + (len(entry.scaler["y_min"]),))
+    flat = values.reshape(-1, values.shape[-1])
+    start = time.perf_counter()
+    for offset in range(0, len(flat), BUILD_CHUNK):
+        index = np.unravel_index(np.arange(offset, min(offset + BUILD_CHUNK, len(flat))), tuple(points))
+        rows = np.stack([axis[i] for axis, i in zip(axes, index)], axis=1)
+        flat[offset:offset + len(rows)] = lstm_outputs(entry, rows, np.random.default_rng([seed, offset]))
+    values.flush()
+    log(f"{entry.name}: scored {len(flat):,} grid points {tuple(points)} in {time.perf_counter() - start:.1f} s")
+    return LookupTable(values, lo, hi)
+
+
+def verify(entry, table, num_rows=5000, seed=7):
+    """{field: (MAE, MAE / LSTM std, max abs error)} against the LSTM on random rows.
+
+    Also returns the same statistics for a second LSTM pass with fresh sequence noise,
+    the floor no table can beat.
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.uniform(table.lo, table.hi, (num_rows, len(table.lo)))
+    lstm = lstm_outputs(entry, rows, np.random.default_rng([seed, 1]))
+    again = lstm_outputs(entry, rows, np.random.default_rng([seed, 2]))
+    fields = list(entry.format_result(lstm[0], rows[0])["predictions"])
+    std = lstm.std(axis=0) + 1e-12
+
+    def stats(pred):
+        error = np.abs(pred - lstm)
+        return {field: (float(error[:, i].mean()), float(error[:, i].mean() / std[i]), float(error[:, i].max()))
+                for i, field in enumerate(fields)}
+
+    return stats(table(rows)), stats(again)
+
+
+def over_budget(errors, noise_floor, budget):
+    """Outputs whose MAE / std exceeds both ``budget`` and the margin over the noise floor."""
+    return [field for field, (_, rel, _) in errors.items()
+            if rel > max(budget, NOISE_MARGIN * noise_floor[field][1])]
+
+
+def build(name, points=None, budget=DEFAULT_BUDGET, max_cells=DEFAULT_MAX_CELLS, seed=0, log=print):
+    """Build, verify and save the table for ``name``, refining the grid to meet ``budget``.
+
+    Returns the saved metadata; ``within_budget`` is False if ``max_cells`` stopped the
+    refinement first (the finest table is saved anyway).
+    """
+    from .registry import build_registry
+
+    entry = build_registry().get(name)
+    array_path, meta_path = table_paths(name)
+    tmp_path = array_path + ".tmp.npy"
+    n = points or DEFAULT_POINTS[name]
+    shape = [n] * len(entry.inputs) if isinstance(n, int) else list(n)
+    while True:
+        table = evaluate_grid(entry, shape, tmp_path, seed, log)
+        errors, noise_floor = verify(entry, table)
+        failing = over_budget(errors, noise_floor, budget)
+        log(f"{name}: worst MAE/std {max(rel for _, rel, _ in errors.values()):.4f} (budget {budget}), "
+            f"over budget: {', '.join(failing) or 'none'}")
+        refined = [max(k + 1, int(round(k * REFINE_FACTOR))) for k in shape]
+        if not failing or np.prod(refined) > max_cells:
+            break
+        del table
+        shape = refined
+
+    meta = {
+        "model": name,
+        "inputs": list(entry.inputs),
+        "lo": table.lo.tolist(),
+        "hi": table.hi.tolist(),
+        "points": shape,
+        "budget": budget,
+        "within_budget": not failing,
+        "errors": errors,
+        "noise_floor": noise_floor,
+    }
+    del table
+    os.replace(tmp_path, array_path)
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    _tables.pop(name, None)
+    weights_hash.cache_clear()
+    log(f"Saved {array_path} ({os.path.getsize(array_path) / 1e6:.1f} MB)")
+    return meta
+
+
+def format_errors(errors, noise_floor):
+    lines = []
+    for field, (mae, rel, worst) in errors.items():
+        lines.append(f"    {field:<28} MAE {mae:>10.4f}  MAE/std {rel:>6.3f}  max {worst:>10.4f}"
+                     f"  (LSTM noise MAE/std {noise_floor[field][1]:.3f})")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Interpolation lookup tables for the Air2Earth models")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("models", nargs="+", choices=list(DEFAULT_POINTS))
+    p.add_argument("--points", type=int, default=None, help="Initial grid points per input")
+    p.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="Max MAE / std of any output")
+    p.add_argument("--max-cells", type=int, default=DEFAULT_MAX_CELLS)
+    p = sub.add_parser("verify")
+    p.add_argument("models", nargs="+", choices=list(DEFAULT_POINTS))
+    p.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        for name in args.models:
+            meta = build(name, args.points, args.budget, args.max_cells)
+            print(format_errors(meta["errors"], meta["noise_floor"]))
+        return 0
+
+    from .registry import build_registry
+
+    registry = build_registry()
+    failed = 0
+    for name in args.models:
+        table = load_table(name)
+        start = time.perf_counter()
+        errors, noise_floor = verify(registry.get(name), table, args.rows)
+        failing = over_budget(errors, noise_floor, table.meta["budget"])
+        failed += bool(failing)
+        print(f"{name}: grid {tuple(table.meta['points'])}, budget {table.meta['budget']}, "
+              f"over budget: {', '.join(failing) or 'none'} ({time.perf_counter() - start:.1f} s)")
+        print(format_errors(errors, noise_floor))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+Air2Earth - shared-trunk AQI model
+One LSTM over the union of the tree, garden and purifier inputs, with a small output head
+per placement, so comparing all three options for a location costs one forward pass
+instead of three. POST /v1/compare serves it:
+
+    {"current_aqi": 168, "current_pm25": 88, "temperature": 31, "humidity": 62,
+     "wind_speed": 4, "area_m2": 12, "room_size_sqft": 300, "ventilation_rate": 2}
+
+returns {"engine": "multihead", "tree": {...}, "garden": {...}, "purifier": {...}}, each in
+the single model's payload format. "engine": "single" runs the three single models
+instead; "rows" batches as in /v1/<model>.
+
+Training data comes from the three notebooks' generators, vectorized and drawn jointly so
+that every sample carries all three targets:
+
+    cd backend
+    python -m air2earth.multihead train --samples 5000 --epochs 100
+    python -m air2earth.multihead evaluate
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import torch
+import torch.nn as nn
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from . import aqi
+from .common import SEQ_LEN, LazyModel, run_batch
+from .rest import RequestError, compact_json, parse_body, read_json
+from .training import TREE_TYPES, fit, save_model
+
+COMPARE_INPUTS = (
+    "current_aqi", "current_pm25", "temperature", "humidity", "wind_speed",
+    "area_m2", "room_size_sqft", "ventilation_rate",
+)
+COMPARE_NOISE_SCALES = [0.03, 0.03, 0.02, 0.02, 0.05, 0.0, 0.0, 0.02]
+# (placement, its inputs, its output spec, payload formatter), in head order
+HEADS = (
+    ("tree", aqi.TREE_INPUTS, aqi.TREE_OUTPUTS, aqi.format_tree_result),
+    ("garden", aqi.GARDEN_INPUTS, aqi.GARDEN_OUTPUTS, aqi.format_garden_result),
+    ("purifier", aqi.PURIFIER_INPUTS, aqi.PURIFIER_OUTPUTS, aqi.format_purifier_result),
+)
+HEAD_DIMS = tuple(len(outputs) for _, _, outputs, _ in HEADS)
+SINGLE_PREDICTORS = {
+    "tree": aqi.predict_tree_impact_batch,
+    "garden": aqi.predict_garden_impact_batch,
+    "purifier": aqi.predict_purifier_impact_batch,
+}
+ENGINES = ("multihead", "single")
+MAX_COMPARE_ROWS = 100_000
+
+
+class MultiHeadAQILSTM(nn.Module):
+    """Shared LSTM trunk with tree, garden and purifier output heads."""
+    def __init__(self, input_dim=8, hidden_dim=64, num_layers=2, head_dims=HEAD_DIMS):
+        super().__init__()
+        self.hidden_dim = hidden_dim
+        self.num_layers = num_layers
+        self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers, batch_first=True, dropout=0.2)
+        self.heads = nn.ModuleList([
+            nn.Sequential(nn.Linear(hidden_dim, 32), nn.ReLU(), nn.Linear(32, dim))
+            for dim in head_dims
+        ])
+
+    def forward(self, x):
+        out, _ = self.lstm(x)
+        last = out[:, -1, :]
+        return torch.cat([head(last) for head in self.heads], dim=1)
+
+
+MULTIHEAD = LazyModel(MultiHeadAQILSTM, "aqi_multihead.pth", "aqi_multihead_scaler.json", aqi.MODEL_DIR)
+
+
+# =====================================================================
+#                        SYNTHETIC DATA
+# =====================================================================
+
+def generate_aqi_data(num_samples, seed=42):
+    """(X (N, 24, 8), y (N, 12)) with the tree, garden and purifier notebook targets.
+
+    Sequences follow the notebooks' per-step noise; the targets are their calculations.ts
+    formulas evaluated on the same sample, concatenated in head order.
+    """
+    rng = np.random.default_rng(seed)
+    n, t = num_samples, np.arange(SEQ_LEN)
+    base_aqi, base_pm25 = rng.uniform(50, 400, n), rng.uniform(20, 200, n)
+    base_temp, base_humidity = rng.uniform(15, 45, n), rng.uniform(30, 90, n)
+    base_wind, area = rng.uniform(0, 15, n), rng.uniform(2, 50, n)
+    room, ventilation = rng.uniform(100, 800, n), rng.uniform(0.5, 8.0, n)
+
+    def drift(scale):
+        return t * rng.normal(0, scale, (n, SEQ_LEN))
+
+    X = np.stack([
+        base_aqi[:, None] + rng.normal(0, 10, (n, SEQ_LEN)) + drift(0.5),
+        base_pm25[:, None] + rng.normal(0, 5, (n, SEQ_LEN)) + drift(0.2),
+        base_temp[:, None] + rng.normal(0, 2, (n, SEQ_LEN)) + np.sin(t * np.pi / 12) * 3,
+        base_humidity[:, None] + rng.normal(0, 3, (n, SEQ_LEN)),
+        np.maximum(0, base_wind[:, None] + rng.normal(0, 1, (n, SEQ_LEN))),
+        np.repeat(area[:, None], SEQ_LEN, axis=1),
+        np.repeat(room[:, None], SEQ_LEN, axis=1),
+        np.maximum(0.1, ventilation[:, None] + rng.normal(0, 0.2, (n, SEQ_LEN))),
+    ], axis=2)
+    _, pm25, temp, humidity, wind = X[:, -1, :5].T
+    pm25 = np.maximum(pm25, 1.0)
+
+    # Tree
+    species = TREE_TYPES[rng.integers(0, len(TREE_TYPES), n)]
+    tree_pm25 = (0.3 + rng.random(n) * 0.9) * species[:, 0]
+    tree_aqi = np.minimum(np.round(1 + tree_pm25 / pm25 * 100 * 2), 5)
+    modifier = (1.0 + (temp - 25) * 0.01) * (1.0 + (humidity - 60) * 0.005) * (1.0 + wind * 0.02)
+    tree = [tree_pm25 * modifier, tree_pm25 * 1.5 * modifier, tree_aqi, species[:, 1]]
+
+    # Vertical garden
+    garden_pm25 = (0.2 + rng.random(n) * 0.3) * area
+    garden_aqi = np.minimum(np.round(2 + garden_pm25 / pm25 * 100 * 3), 15)
+    modifier = (1.0 + (temp - 25) * 0.008) * (1.0 + (humidity - 60) * 0.004)
+    garden = [
+        garden_pm25 * modifier,
+        garden_pm25 * 1.3 * modifier,
+        garden_aqi,
+        (1 + rng.random(n)) * (1.0 + area * 0.01),
+        (3 + rng.random(n) * 2) * (1.0 + area * 0.005),
+    ]
+
+    # Air purifier
+    coverage = 300 + rng.random(n) * 300
+    cadr = 250 + rng.random(n) * 200
+    reduction = 60 + rng.random(n) * 30
+    room_factor = np.clip(500 / np.maximum(room, 100), 0.5, 1.5)
+    aqi_factor = np.clip(1.2 - (base_aqi / 500) * 0.4, 0.6, 1.2)
+    vent_factor = np.clip(1.1 - ventilation * 0.03, 0.7, 1.1)
+    purifier = [np.clip(reduction * room_factor * aqi_factor * vent_factor, 30, 99),
+                cadr * room_factor, coverage * room_factor]
+
+    y = np.stack(tree + garden + purifier, axis=1)
+    return X.astype(np.float32), y.astype(np.float32)
+
+
+# =====================================================================
+#                           TRAINING
+# =====================================================================
+
+def train(num_samples=5000, epochs=100, batch_size=32, lr=0.001, seed=42, model_dir=None, log=print):
+    """Train MultiHeadAQILSTM like the notebooks do and save the .pth + scaler json."""
+    torch.manual_seed(seed)
+    X, y = generate_aqi_data(num_samples, seed)
+    model = MultiHeadAQILSTM()
+    scaler, _ = fit(model, X, y, epochs, batch_size, lr, log=log)
+    save_model(model, scaler, model_dir or aqi.MODEL_DIR, "aqi_multihead.pth", "aqi_multihead_scaler.json", log)
+    return model, scaler
+
+
+def evaluate(num_samples=2000, seed=7):
+    """{placement: {output: (single MAE, multihead MAE, target std)}} on fresh synthetic data."""
+    X, y = generate_aqi_data(num_samples, seed)
+    model, scaler = MULTIHEAD.load()
+    multi = run_batch(model, X, scaler, len(COMPARE_INPUTS), sum(HEAD_DIMS))
+    report, offset = {}, 0
+    for placement, inputs, outputs, _ in HEADS:
+        columns = [COMPARE_INPUTS.index(name) for name in inputs]
+        single_model, single_scaler = aqi.LAZY_MODELS[placement].load()
+        single = run_batch(single_model, X[:, :, columns], single_scaler, len(inputs), len(outputs))
+        target = y[:, offset:offset + len(outputs)]
+        head = multi[:, offset:offset + len(outputs)]
+        report[placement] = {
+            name: (float(np.abs(single[:, i] - target[:, i]).mean()),
+                   float(np.abs(head[:, i] - target[:, i]).mean()),
+                   float(target[:, i].std()))
+            for i, (name, _, _, _) in enumerate(outputs)
+        }
+        offset += len(outputs)
+    return report
+
+
+# =====================================================================
+#                          PREDICTION
+# =====================================================================
+
+def compare_batch(rows, rng=None, engine="multihead"):
+    """Score the three placements for N rows ordered like COMPARE_INPUTS.
+
+    Returns one {"tree", "garden", "purifier"} dict of payloads per row.
+    """
+    rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(COMPARE_INPUTS))
+    if not len(rows):
+        return []
+    sub_rows = {
+        placement: [tuple(row) for row in rows[:, [COMPARE_INPUTS.index(name) for name in inputs]]]
+        for placement, inputs, _, _ in HEADS
+    }
+    if engine == "single":
+        payloads = {
+            placement: SINGLE_PREDICTORS[placement](sub_rows[placement], rng=rng)
+            for placement, _, _, _ in HEADS
+        }
+    else:
+        model, scaler = MULTIHEAD.load()
+        raw_seqs = aqi.build_sequences(rows, rng=rng, noise_scales=COMPARE_NOISE_SCALES)
+        preds = run_batch(model, raw_seqs, scaler, len(COMPARE_INPUTS), sum(HEAD_DIMS))
+        payloads, offset = {}, 0
+        for placement, _, outputs, format_result in HEADS:
+            head = preds[:, offset:offset + len(outputs)]
+            payloads[placement] = [format_result(p, row) for p, row in zip(head, sub_rows[placement])]
+            offset += len(outputs)
+    return [{placement: payloads[placement][i] for placement, _, _, _ in HEADS} for i in range(len(rows))]
+
+
+def register_compare_routes(api):
+    """Add POST /v1/compare."""
+
+    async def compare(request: Request):
+        try:
+            body = await read_json(request)
+            rows, batched = parse_body(body, COMPARE_INPUTS)
+            options = body if isinstance(body, dict) else {}
+            engine = options.get("engine", "multihead")
+            if engine not in ENGINES:
+                raise RequestError(f"engine must be one of: {', '.join(ENGINES)}")
+            if len(rows) > MAX_COMPARE_ROWS:
+                raise RequestError(f"At most {MAX_COMPARE_ROWS} rows per request")
+            try:
+                rng = None if options.get("seed") is None else np.random.default_rng(int(options["seed"]))
+            except (TypeError, ValueError):
+                raise RequestError("seed must be an integer") from None
+        except RequestError as e:
+            return compact_json({"error": str(e)}, 400)
+        results = await run_in_threadpool(compare_batch, rows, rng, engine)
+        if batched:
+            return compact_json({"engine": engine, "results": results})
+        return compact_json({"engine": engine, **results[0]})
+
+    api.add_route("/v1/compare", compare, methods=["POST"])
+    return api
+
+
+# =====================================================================
+#                              CLI
+# =====================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train or evaluate the shared-trunk AQI model")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train_cmd = sub.add_parser("train", help="Train on jointly generated synthetic data")
+    train_cmd.add_argument("--samples", type=int, default=5000)
+    train_cmd.add_argument("--epochs", type=int, default=100)
+    train_cmd.add_argument("--batch-size", type=int, default=32)
+    train_cmd.add_argument("--lr", type=float, default=0.001)
+    train_cmd.add_argument("--seed", type=int, default=42)
+    train_cmd.add_argument("--model-dir", default=None, help=f"Output directory (default: {aqi.MODEL_DIR})")
+    eval_cmd = sub.add_parser("evaluate", help="MAE of the single models vs the multi-head model")
+    eval_cmd.add_argument("--samples", type=int, default=2000)
+    eval_cmd.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        train(args.samples, args.epochs, args.batch_size, args.lr, args.seed, args.model_dir)
+        return
+
+    print(f"{'placement':<10}{'output':<28}{'single MAE':>12}{'multi MAE':>12}{'target std':>12}")
+    for placement, fields in evaluate(args.samples, args.seed).items():
+        for name, (single, multi, std) in fields.items():
+            print(f"{placement:<10}{name:<28}{single:>12.4f}{multi:>12.4f}{std:>12.4f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
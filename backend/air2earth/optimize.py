@@ -0,0 +1,214 @@
+"""
+Air2Earth - placement optimizer
+POST /v1/optimize picks at most one tree, vertical garden or air purifier per candidate
+site so that the total predicted improvement is maximal under a cost or count budget:
+
+    {"sites": [{"id": "s1", "current_aqi": 168, "current_pm25": 88, "area_m2": 12}, ...],
+     "conditions": {"temperature": 31, "humidity": 62, "wind_speed": 4, ...},
+     "costs": {"tree": 1, "garden": 6, "purifier": 3}, "budget": 20,
+     "objective": "aqi_improvement_points" | "pm25_reduction"}
+
+Every (site, placement) candidate is scored by its LSTM in one batch per placement
+through the prediction cache. Sites are treated as independent, so the search is a
+multiple-choice knapsack: exact dynamic programming for integer costs (up to
+sites x budget = 2e7 cells), greedy by value per cost otherwise.
+"""
+
+import math
+import time
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from .rest import RequestError, compact_json, read_json
+
+OBJECTIVES = ("aqi_improvement_points", "pm25_reduction")
+DEFAULT_COSTS = {"tree": 1.0, "garden": 1.0, "purifier": 1.0}
+MAX_SITES = 10_000
+MAX_DP_CELLS = 20_000_000
+
+
+def objective_value(placement, result, row, objective):
+    """Objective contribution of one scored candidate.
+
+    Purifiers report an indoor % PM2.5 reduction, converted to µg/m³ with the site's
+    current PM2.5; they have no AQI-points output and contribute 0 to that objective.
+    """
+    predictions = result["predictions"]
+    if objective == "pm25_reduction":
+        if placement == "purifier":
+            return predictions["pm25_reduction_percent"] / 100.0 * row["current_pm25"]
+        return predictions["pm25_reduction_ugm3"]
+    return predictions.get("aqi_improvement_points", 0.0)
+
+
+def build_candidates(registry, sites, conditions, costs):
+    """Return [(site index, placement, input row dict)] for every allowed placement per site."""
+    if not isinstance(conditions, dict):
+        raise RequestError("'conditions' must be an object")
+    candidates = []
+    for i, site in enumerate(sites):
+        if not isinstance(site, dict):
+            raise RequestError("Each site must be an object")
+        row = {**conditions, **site}
+        allowed = site.get("allowed")
+        if allowed is not None and (not isinstance(allowed, list)
+                                    or any(not isinstance(p, str) or p not in DEFAULT_COSTS for p in allowed)):
+            raise RequestError(f"Site {site.get('id', i)}: 'allowed' must be a list of placements "
+                               f"({', '.join(DEFAULT_COSTS)})")
+        for placement in costs:
+            inputs = registry.get(placement).inputs
+            available = all(name in row for name in inputs)
+            if allowed is None and not available:
+                continue
+            if allowed is not None and placement not in allowed:
+                continue
+            if not available:
+                missing = [name for name in inputs if name not in row]
+                raise RequestError(f"Site {site.get('id', i)} is missing {placement} input(s): {', '.join(missing)}")
+            try:
+                candidates.append((i, placement, {name: float(row[name]) for name in inputs}))
+            except (TypeError, ValueError):
+                raise RequestError(f"Site {site.get('id', i)} has non-numeric inputs") from None
+    return candidates
+
+
+def score_candidates(registry, candidates, objective):
+    """Batch-score the candidates per placement; returns (values, results) aligned with them."""
+    values = np.zeros(len(candidates))
+    results = [None] * len(candidates)
+    for placement in {c[1] for c in candidates}:
+        entry = registry.get(placement)
+        idx = [k for k, c in enumerate(candidates) if c[1] == placement]
+        rows = [tuple(candidates[k][2][name] for name in entry.inputs) for k in idx]
+        for k, result in zip(idx, entry.predict_batch(rows)):
+            results[k] = result
+            values[k] = objective_value(placement, result, candidates[k][2], objective)
+    return values, results
+
+
+def solve_exact(site_ids, costs, values, n_sites, budget):
+    """Multiple-choice knapsack DP over integer costs; returns chosen candidate indices."""
+    best = np.zeros(budget + 1)
+    choice = np.full((n_sites, budget + 1), -1, dtype=np.int32)
+    by_site = [[] for _ in range(n_sites)]
+    for k, site in enumerate(site_ids):
+        by_site[site].append(k)
+    for site, options in enumerate(by_site):
+        current = best.copy()
+        for k in options:
+            cost = int(costs[k])
+            if cost > budget or values[k] <= 0:
+                continue
+            taken = np.full(budget + 1, -np.inf)
+            taken[cost:] = best[:budget + 1 - cost] + values[k]
+            better = taken > current
+            current[better] = taken[better]
+            choice[site, better] = k
+        best = current
+
+    chosen, remaining = [], budget
+    for site in range(n_sites - 1, -1, -1):
+        k = choice[site, remaining]
+        if k >= 0:
+            chosen.append(int(k))
+            remaining -= int(costs[k])
+    return chosen[::-1]
+
+
+def solve_greedy(site_ids, costs, values, budget):
+    """Take candidates by value per cost while the budget allows, one per site."""
+    order = np.argsort(-values / np.maximum(costs, 1e-12), kind="stable")
+    used, chosen, spent = set(), [], 0.0
+    for k in order:
+        if values[k] <= 0 or site_ids[k] in used or spent + costs[k] > budget:
+            continue
+        used.add(site_ids[k])
+        chosen.append(int(k))
+        spent += costs[k]
+    return sorted(chosen)
+
+
+def optimize(registry, spec):
+    """Run one optimization request; returns the JSON-serializable response."""
+    sites = spec.get("sites")
+    if not isinstance(sites, list) or not sites:
+        raise RequestError("'sites' must be a non-empty list")
+    if len(sites) > MAX_SITES:
+        raise RequestError(f"At most {MAX_SITES} sites per request")
+    objective = spec.get("objective", "aqi_improvement_points")
+    if objective not in OBJECTIVES:
+        raise RequestError(f"objective must be one of: {', '.join(OBJECTIVES)}")
+    if ("budget" in spec) == ("count" in spec):
+        raise RequestError("Give exactly one of 'budget' (with 'costs') or 'count'")
+    conditions = spec.get("conditions") or {}
+    try:
+        costs = {name: float(cost) for name, cost in (spec.get("costs") or DEFAULT_COSTS).items()}
+        if "count" in spec:
+            costs = {name: 1.0 for name in costs}
+            budget = float(int(spec["count"]))
+        else:
+            budget = float(spec["budget"])
+    except (TypeError, ValueError, AttributeError, OverflowError):
+        raise RequestError("costs, budget and count must be numeric") from None
+    if not all(math.isfinite(v) for v in [budget, *costs.values()]):
+        raise RequestError("costs, budget and count must be finite")
+    unknown = [name for name in costs if name not in DEFAULT_COSTS]
+    if unknown:
+        raise RequestError(f"Unknown placement(s) in costs: {', '.join(unknown)}")
+    if budget < 0 or any(cost <= 0 for cost in costs.values()):
+        raise RequestError("budget must be >= 0 and costs > 0")
+
+    start = time.perf_counter()
+    candidates = build_candidates(registry, sites, conditions, costs)
+    if not candidates:
+        raise RequestError("No site has the inputs needed for any placement")
+    values, results = score_candidates(registry, candidates, objective)
+    site_ids = np.array([c[0] for c in candidates])
+    cand_costs = np.array([costs[c[1]] for c in candidates])
+
+    integral = (all(cost.is_integer() for cost in costs.values())
+                and len(sites) * (int(budget) + 1) <= MAX_DP_CELLS)
+    if integral:
+        chosen = solve_exact(site_ids, cand_costs, values, len(sites), int(budget))
+    else:
+        chosen = solve_greedy(site_ids, cand_costs, values, budget)
+
+    selected = []
+    for k in chosen:
+        site, placement, _ = candidates[k]
+        selected.append({
+            "site": sites[site].get("id", site),
+            "placement": placement,
+            "value": round(float(values[k]), 4),
+            "cost": float(cand_costs[k]),
+            "predictions": results[k]["predictions"],
+        })
+    return {
+        "objective": objective,
+        "total": round(float(values[chosen].sum()), 4),
+        "cost_used": float(cand_costs[chosen].sum()),
+        "budget": budget,
+        "solver": "exact" if integral else "greedy",
+        "candidates_evaluated": len(candidates),
+        "selected": selected,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def register_optimize_routes(api, registry):
+    """Add POST /v1/optimize."""
+
+    async def run_optimize(request: Request):
+        try:
+            spec = await read_json(request)
+            if not isinstance(spec, dict):
+                raise RequestError("Body must be an object")
+            result = await run_in_threadpool(optimize, registry, spec)
+        except RequestError as e:
+            return compact_json({"error": str(e)}, 400)
+        return compact_json(result)
+
+    api.add_route("/v1/optimize", run_optimize, methods=["POST"])
+    return api
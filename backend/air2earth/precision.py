@@ -0,0 +1,144 @@
+"""
+Air2Earth - reduced-precision serving
+Precision modes applied by load_model_and_scaler at load time:
+    fp32   the trained weights as-is (default)
+    bf16   weights and activations in bfloat16, outputs cast back to float32
+    int8   torch dynamic quantization of the LSTM and Linear layers (int8 weights,
+           activations quantized on the fly)
+
+Selected with AIR2EARTH_PRECISION=fp32|bf16|int8. Responses keep the same schema; run
+``python -m air2earth.precision`` for an accuracy/latency report against fp32.
+"""
+
+import argparse
+import copy
+import io
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+PRECISIONS = ("fp32", "bf16", "int8")
+
+
+class BFloat16Model(nn.Module):
+    """Runs a float32-trained model in bfloat16 behind a float32 interface."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = copy.deepcopy(model).to(torch.bfloat16)
+
+    @property
+    def lstm(self):
+        return self.model.lstm
+
+    @property
+    def fc(self):
+        return self.model.fc
+
+    def forward(self, x):
+        return self.model(x.to(torch.bfloat16)).float()
+
+
+def apply_precision(model, precision=None):
+    """Return ``model`` converted to ``precision`` (default: AIR2EARTH_PRECISION or fp32)."""
+    precision = precision or os.environ.get("AIR2EARTH_PRECISION", "fp32")
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}'. Choose from: {', '.join(PRECISIONS)}")
+    if precision == "fp32":
+        return model
+
+    if precision == "bf16":
+        converted = BFloat16Model(model)
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # torch.ao.quantization deprecation notices
+            converted = torch.ao.quantization.quantize_dynamic(model, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+    converted.eval()
+    converted.precision = precision
+    return converted
+
+
+def precision_name(model):
+    return getattr(model, "precision", "fp32")
+
+
+def state_dict_bytes(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return len(buffer.getvalue())
+
+
+# =====================================================================
+#                        ACCURACY REPORT
+# =====================================================================
+
+def held_out_batch(entry, n, seed):
+    """Random base rows within the scaler's input bounds, expanded into noisy sequences."""
+    rng = np.random.default_rng(seed)
+    dim = len(entry.inputs)
+    x_min = np.array(entry.scaler.get("x_min", [0] * dim))
+    x_max = np.array(entry.scaler.get("x_max", [1] * dim))
+    rows = x_min + rng.random((n, dim)) * (x_max - x_min)
+    return entry.build_sequences(rows, rng=rng)
+
+
+def report(registry, precisions, n=2048, seed=1234, latency_batch=256, repeat=20):
+    """Compare each precision's denormalized outputs with fp32 on a held-out synthetic set."""
+    from .common import run_batch
+    from .runtime import eager_model
+
+    rows = []
+    for entry in registry:
+        base = eager_model(entry.model)
+        output_dim = base.fc[-1].out_features
+        raw = held_out_batch(entry, n, seed)
+        reference = run_batch(base, raw, entry.scaler, len(entry.inputs), output_dim)
+        scale = np.abs(reference).mean(axis=0) + 1e-8
+        x = torch.rand(latency_batch, raw.shape[1], raw.shape[2])
+
+        for precision in precisions:
+            model = apply_precision(base, precision)
+            pred = run_batch(model, raw, entry.scaler, len(entry.inputs), output_dim)
+            err = np.abs(pred - reference)
+            with torch.no_grad():
+                model(x)
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    model(x)
+            rows.append({
+                "model": entry.name,
+                "precision": precision,
+                "mae": float(err.mean()),
+                "max_abs_err": float(err.max()),
+                "rel_mae_pct": float((err.mean(axis=0) / scale).max() * 100),
+                "latency_ms": (time.perf_counter() - start) / repeat * 1e3,
+                "size_kb": state_dict_bytes(model) / 1024,
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accuracy report for reduced-precision serving")
+    parser.add_argument("--precisions", nargs="+", choices=PRECISIONS, default=list(PRECISIONS))
+    parser.add_argument("--samples", type=int, default=2048, help="Held-out synthetic rows per model")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    os.environ["AIR2EARTH_PRECISION"] = "fp32"
+    from .registry import build_registry
+
+    results = report(build_registry(), args.precisions, n=args.samples, seed=args.seed)
+    print(f"{'model':<10}{'precision':<11}{'MAE':>12}{'max err':>12}{'worst rel %':>13}"
+          f"{'ms/256':>10}{'size KB':>10}")
+    for r in results:
+        print(f"{r['model']:<10}{r['precision']:<11}{r['mae']:>12.4f}{r['max_abs_err']:>12.4f}"
+              f"{r['rel_mae_pct']:>13.3f}{r['latency_ms']:>10.3f}{r['size_kb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Air2Earth - model registry
+Hosts TreeLSTM, GardenLSTM, PurifierLSTM, WaterLSTM and SolarLSTM in one process so a
+single server can expose every predictor.
+"""
+
+import os
+from functools import partial
+
+from .common import LazyModel
+from .precision import precision_name
+from .runtime import eager_model, runtime_name
+
+
+class ModelEntry:
+    """A hosted model together with its scaler and predictor entry points.
+
+    ``model`` may be a ``LazyModel`` (with ``scaler=None``); it is then loaded the first time
+    ``model`` or ``scaler`` is read, so registering it keeps the lazy start.
+    """
+
+    def __init__(self, name, domain, model, scaler, inputs, predict, predict_batch, model_path=None,
+                 build_sequences=None, format_result=None):
+        self.name = name
+        self.domain = domain
+        self._model = model
+        self._scaler = scaler
+        self.inputs = tuple(inputs)
+        self.predict = predict
+        self.predict_batch = predict_batch
+        self.model_path = model_path
+        self.build_sequences = build_sequences
+        self.format_result = format_result
+
+    @property
+    def loaded(self):
+        return not isinstance(self._model, LazyModel) or self._model.loaded
+
+    @property
+    def model(self):
+        if isinstance(self._model, LazyModel):
+            return self._model.load()[0]
+        return self._model
+
+    @property
+    def scaler(self):
+        if isinstance(self._model, LazyModel):
+            return self._model.load()[1]
+        return self._scaler
+
+    def describe(self):
+        """Return a JSON-serializable summary of the entry; unloaded lazy models stay unloaded."""
+        if not self.loaded:
+            return {
+                "name": self.name,
+                "domain": self.domain,
+                "model_class": self._model.model_class.__name__,
+                "loaded": False,
+                "inputs": list(self.inputs),
+            }
+        return {
+            "name": self.name,
+            "domain": self.domain,
+            "model_class": type(eager_model(self.model)).__name__,
+            "loaded": True,
+            "runtime": runtime_name(self.model),
+            "precision": precision_name(eager_model(self.model)),
+            "inputs": list(self.inputs),
+            "parameters": sum(p.numel() for p in eager_model(self.model).parameters()),
+        }
+
+
+class ModelRegistry:
+    """Name -> ModelEntry mapping shared by the unified server."""
+
+    def __init__(self):
+        self._entries = {}
+
+    def register(self, entry):
+        if entry.name in self._entries:
+            raise ValueError(f"Model '{entry.name}' is already registered")
+        self._entries[entry.name] = entry
+        return entry
+
+    def get(self, name):
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"Unknown model '{name}'. Available: {', '.join(self.names())}") from None
+
+    def names(self):
+        return list(self._entries)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self._entries.values())
+
+    def describe(self):
+        return [entry.describe() for entry in self]
+
+
+MODEL_NAMES = ("tree", "garden", "purifier", "water", "solar")
+
+
+def build_entry(name):
+    """Import only ``name``'s domain module and return its ModelEntry."""
+    if name in ("tree", "garden", "purifier"):
+        from . import aqi
+    if name == "tree":
+        return ModelEntry(
+            "tree", "aqi", aqi.TREE, None, aqi.TREE_INPUTS,
+            aqi.predict_tree_impact, aqi.predict_tree_impact_batch,
+            os.path.join(aqi.MODEL_DIR, "tree_lstm.pth"),
+            partial(aqi.build_sequences, noise_scales=aqi.TREE_NOISE_SCALES),
+            aqi.format_tree_result,
+        )
+    if name == "garden":
+        return ModelEntry(
+            "garden", "aqi", aqi.GARDEN, None, aqi.GARDEN_INPUTS,
+            aqi.predict_garden_impact, aqi.predict_garden_impact_batch,
+            os.path.join(aqi.MODEL_DIR, "garden_lstm.pth"),
+            partial(aqi.build_sequences, noise_scales=aqi.GARDEN_NOISE_SCALES),
+            aqi.format_garden_result,
+        )
+    if name == "purifier":
+        return ModelEntry(
+            "purifier", "aqi", aqi.PURIFIER, None, aqi.PURIFIER_INPUTS,
+            aqi.predict_purifier_impact, aqi.predict_purifier_impact_batch,
+            os.path.join(aqi.MODEL_DIR, "purifier_lstm.pth"),
+            partial(aqi.build_sequences, noise_scales=aqi.PURIFIER_NOISE_SCALES),
+            aqi.format_purifier_result,
+        )
+    if name == "water":
+        from . import water
+
+        return ModelEntry(
+            "water", "water", water.water_model, water.water_scaler, water.WATER_INPUTS,
+            water.predict_water_harvesting, water.predict_water_harvesting_batch,
+            os.path.join(water.MODEL_DIR, "water_lstm.pth"),
+            water.build_sequences,
+            water.format_water_result,
+        )
+    if name == "solar":
+        from . import solar
+
+        return ModelEntry(
+            "solar", "solar", solar.solar_model, solar.solar_scaler, solar.SOLAR_INPUTS,
+            solar.predict_solar_potential, solar.predict_solar_potential_batch,
+            os.path.join(solar.MODEL_DIR, "solar_lstm.pth"),
+            partial(solar.build_sequences, noise_scales=solar.SOLAR_NOISE_SCALES),
+            solar.format_solar_result,
+        )
+    raise KeyError(f"Unknown model '{name}'. Available: {', '.join(MODEL_NAMES)}")
+
+
+def build_registry():
+    """Register all five models (the AQI ones stay lazy until first use)."""
+    registry = ModelRegistry()
+    for name in MODEL_NAMES:
+        registry.register(build_entry(name))
+    return registry
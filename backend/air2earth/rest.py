@@ -0,0 +1,311 @@
+"""
+Air2Earth - plain JSON REST endpoints
+POST /v1/<model> calls a registry predictor directly, bypassing Gradio's queue and
+websocket protocol. Bodies may be a single object, a list of objects, or
+{"rows": [...]}; rows are either objects keyed by input name or positional lists.
+Object bodies may also carry predictor options: "samples", "quantiles", "mc_dropout",
+and "engine": "fast" / "lut" for the LSTM-free engines (see fast.py and lut.py).
+
+Observed time series replace the synthetic input sequences: send "sequences" as nested
+lists, {"dtype": "float32", "shape": [N, 24, F], "data": <base64>} or
+{"npy": <base64 .npy>}, or POST a raw .npy file with Content-Type application/x-npy.
+Readings are raw (unscaled) values in input order; (24, F) gives a single result,
+(N, 24, F) a "results" list.
+
+Responses can be compact JSON, MessagePack or Arrow IPC, optionally projected to a few
+fields or laid out as columns; see encoding.py. Long batches can be streamed: with
+"stream": true / "ndjson" / "sse" (or an Accept header of application/x-ndjson or
+text/event-stream) the rows are scored in blocks of "chunk" rows and every block is
+sent as soon as it is ready; see ``stream_response``.
+"""
+
+import base64
+import inspect
+import io
+import json
+import math
+import time
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from .common import MAX_SAMPLES, SEQ_LEN, observed_sequences
+from .fast import BUILD_COMMANDS, ENGINES, engine_available
+
+
+class RequestError(ValueError):
+    """A malformed request body (reported as HTTP 400)."""
+
+    status_code = 400
+
+
+class EngineUnavailable(RequestError):
+    """An engine whose offline artifact has not been built for the model (HTTP 503)."""
+
+    status_code = 503
+
+
+def compact_json(payload, status_code=200):
+    """Serialize without indentation or spaces after separators."""
+    return Response(
+        json.dumps(payload, separators=(",", ":")),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+def parse_row(item, inputs):
+    """Turn one object or positional list into a tuple of floats ordered like ``inputs``."""
+    if isinstance(item, dict):
+        missing = [name for name in inputs if name not in item]
+        if missing:
+            raise RequestError(f"Missing input(s): {', '.join(missing)}")
+        values = [item[name] for name in inputs]
+    elif isinstance(item, (list, tuple)):
+        if len(item) != len(inputs):
+            raise RequestError(f"Expected {len(inputs)} values ({', '.join(inputs)}), got {len(item)}")
+        values = item
+    else:
+        raise RequestError("Each row must be an object or a list")
+    try:
+        row = tuple(float(v) for v in values)
+    except (TypeError, ValueError):
+        raise RequestError("Inputs must be numeric") from None
+    if not all(math.isfinite(v) for v in row):
+        raise RequestError("Inputs contain NaN or infinite values")
+    return row
+
+
+def parse_options(body, name=None):
+    """Extract Monte Carlo and engine predictor options from an object body."""
+    if not isinstance(body, dict):
+        return {}
+    options = {}
+    try:
+        if "samples" in body:
+            options["samples"] = int(body["samples"])
+        if "quantiles" in body:
+            options["quantiles"] = [float(q) for q in body["quantiles"]]
+        if "mc_dropout" in body:
+            options["mc_dropout"] = bool(body["mc_dropout"])
+    except (TypeError, ValueError):
+        raise RequestError("Invalid samples/quantiles/mc_dropout option") from None
+    if not 1 <= options.get("samples", 1) <= MAX_SAMPLES:
+        raise RequestError(f"samples must be between 1 and {MAX_SAMPLES}")
+    if any(not 0.0 <= q <= 1.0 for q in options.get("quantiles", [])):
+        raise RequestError("quantiles must be between 0 and 1")
+    engine = parse_engine(body, name)
+    if engine != "lstm":
+        if options.get("mc_dropout"):
+            raise RequestError("mc_dropout needs engine 'lstm'")
+        options["engine"] = engine
+    return options
+
+
+def parse_engine(body, name=None):
+    """'lstm' (default), 'fast' or 'lut' from the body's "engine" option.
+
+    With ``name``, an engine whose offline artifact is missing for that model is a 503.
+    """
+    engine = body.get("engine", "lstm")
+    if engine not in ENGINES:
+        raise RequestError(f"engine must be one of: {', '.join(ENGINES)}")
+    if name is not None and not engine_available(name, engine):
+        raise EngineUnavailable(f"Engine '{engine}' is not built for '{name}'; run "
+                                f"{BUILD_COMMANDS[engine].format(name=name)}")
+    return engine
+
+
+def parse_body(body, inputs):
+    """Return (rows, batched) for a single or batched request body."""
+    if isinstance(body, dict) and "rows" in body:
+        items, batched = body["rows"], True
+    elif isinstance(body, list):
+        items, batched = body, True
+    else:
+        items, batched = [body], False
+    if not isinstance(items, list):
+        raise RequestError("'rows' must be a list")
+    return [parse_row(item, inputs) for item in items], batched
+
+
+def load_npy(data):
+    try:
+        return np.load(io.BytesIO(data), allow_pickle=False)
+    except (OSError, ValueError):
+        raise RequestError("Body is not a valid .npy array") from None
+
+
+def parse_sequences(payload, inputs, seq_len=SEQ_LEN, label="sequences"):
+    """Decode and validate an observed-sequence payload; returns (array, batched)."""
+    if isinstance(payload, dict) and "npy" in payload:
+        try:
+            array = load_npy(base64.b64decode(payload["npy"], validate=True))
+        except (TypeError, ValueError):
+            raise RequestError("'npy' must be a base64 .npy file") from None
+    elif isinstance(payload, dict):
+        try:
+            raw = base64.b64decode(payload["data"], validate=True)
+            array = np.frombuffer(raw, dtype=np.dtype(payload.get("dtype", "float32")).newbyteorder("<"))
+            array = array.reshape([int(n) for n in payload["shape"]])
+        except (KeyError, TypeError, ValueError):
+            raise RequestError(f"Binary {label} need base64 'data', 'shape' and a 'dtype' (default float32)") from None
+    else:
+        array = payload
+    try:
+        observed_sequences(array, len(inputs), seq_len, label)
+    except ValueError as e:
+        raise RequestError(str(e)) from None
+    return np.asarray(array, dtype=np.float64), np.ndim(array) == 3
+
+
+# =====================================================================
+#                       STREAMED RESPONSES
+# =====================================================================
+
+STREAM_FORMATS = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+DEFAULT_STREAM_CHUNK = 1024
+
+
+def stream_format(request, body):
+    """'ndjson', 'sse' or None from the body's "stream" option or the Accept header."""
+    accept = request.headers.get("accept", "")
+    option = body.get("stream") if isinstance(body, dict) else None
+    if option is True:
+        return "sse" if "text/event-stream" in accept else "ndjson"
+    if option in STREAM_FORMATS:
+        return option
+    if option not in (None, False):
+        raise RequestError('stream must be true, false, "ndjson" or "sse"')
+    if option is None and "text/event-stream" in accept:
+        return "sse"
+    if option is None and "application/x-ndjson" in accept:
+        return "ndjson"
+    return None
+
+
+def stream_chunk(body, default=DEFAULT_STREAM_CHUNK):
+    """The positive "chunk" size of a streamed request."""
+    try:
+        chunk = int(body.get("chunk", default) if isinstance(body, dict) else default)
+    except (TypeError, ValueError):
+        raise RequestError("chunk must be an integer") from None
+    if chunk < 1:
+        raise RequestError("chunk must be positive")
+    return chunk
+
+
+def encode_event(fmt, index, event, data):
+    """One NDJSON line ({"event": ..., **data}) or one server-sent event."""
+    if fmt == "sse":
+        return f"id: {index}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+    return json.dumps({"event": event, **data}, separators=(",", ":")) + "\n"
+
+
+async def iterate_events(request, fmt, events):
+    """Pull (event, data) pairs from the ``events`` generator one at a time in a worker thread.
+
+    The next pair is only computed once the previous one has been handed to the server,
+    so a slow client throttles the job instead of piling up output, and nothing more is
+    computed once the client has gone. A failure mid-stream becomes an "error" event.
+    """
+    done = object()
+    index = 0
+    try:
+        while not await request.is_disconnected():
+            try:
+                item = await run_in_threadpool(next, events, done)
+            except Exception as e:
+                print(f"Stream failed: {e}")
+                yield encode_event(fmt, index, "error", {"error": str(e)})
+                return
+            if item is done:
+                return
+            yield encode_event(fmt, index, *item)
+            index += 1
+    finally:
+        if inspect.getgeneratorstate(events) != inspect.GEN_RUNNING:
+            events.close()
+
+
+def stream_response(request, fmt, events):
+    """Stream a generator of (event, data) pairs as NDJSON or server-sent events."""
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(iterate_events(request, fmt, events), media_type=STREAM_FORMATS[fmt],
+                             headers=headers)
+
+
+def predict_events(entry, rows, sequences=None, chunk=DEFAULT_STREAM_CHUNK, **options):
+    """start / one chunk per ``chunk`` rows / end events for a streamed batch prediction."""
+    if sequences is not None and sequences.ndim == 2:
+        sequences = sequences[None]
+    n = len(rows) if sequences is None else len(sequences)
+    start = time.perf_counter()
+    yield "start", {"model": entry.name, "rows": n, "chunk": chunk}
+    for offset in range(0, n, chunk):
+        if sequences is None:
+            results = entry.predict_batch(rows[offset:offset + chunk], **options)
+        else:
+            results = entry.predict_batch(None, sequences=sequences[offset:offset + chunk], **options)
+        yield "chunk", {"offset": offset, "results": results}
+    yield "end", {"rows": n, "seconds": round(time.perf_counter() - start, 3)}
+
+
+async def read_json(request):
+    try:
+        return json.loads(await request.body())
+    except ValueError:
+        raise RequestError("Body is not valid JSON") from None
+
+
+def register_rest_routes(api, registry, batchers=None):
+    """Add POST /v1/<model> for every model in ``registry``.
+
+    When ``batchers`` (name -> MicroBatcher) is given, requests are coalesced with other
+    in-flight requests for the same model instead of running their own forward pass.
+    """
+
+    from .encoding import encode_results, negotiate, parse_projection, project_events
+
+    async def predict(request: Request):
+        name = request.path_params["name"]
+        if name not in registry:
+            return compact_json({"error": f"Unknown model '{name}'"}, 404)
+        entry = registry.get(name)
+        try:
+            if request.headers.get("content-type", "").startswith("application/x-npy"):
+                body = {"sequences": load_npy(await request.body())}
+            else:
+                body = await read_json(request)
+            if isinstance(body, dict) and "sequences" in body:
+                rows = None
+                sequences, batched = parse_sequences(body["sequences"], entry.inputs)
+            else:
+                sequences = None
+                rows, batched = parse_body(body, entry.inputs)
+            options = parse_options(body, name)
+            fmt = stream_format(request, body)
+            chunk = stream_chunk(body)
+            fields, layout = parse_projection(request, body)
+            encoding = negotiate(request)
+        except RequestError as e:
+            return compact_json({"error": str(e)}, e.status_code)
+
+        if fmt is not None:
+            events = predict_events(entry, rows, sequences, chunk, **options)
+            return stream_response(request, fmt, project_events(events, fields) if fields else events)
+        if sequences is not None:
+            results = await run_in_threadpool(entry.predict_batch, rows, sequences=sequences, **options)
+        elif batchers is not None and rows and not options:
+            results = await batchers[name].submit(rows)
+        else:
+            results = await run_in_threadpool(entry.predict_batch, rows, **options)
+        try:
+            return encode_results(results, batched, encoding, fields, layout)
+        except RequestError as e:
+            return compact_json({"error": str(e)}, e.status_code)
+
+    api.add_route("/v1/{name}", predict, methods=["POST"])
+    return api
@@ -0,0 +1,91 @@
+"""
+Air2Earth - inference runtimes
+Pluggable CPU backends for the LSTMs. ``eager`` runs the nn.Module as-is; ``torchscript``
+and ``onnx`` serve the frozen artifacts written next to each .pth by ``python -m
+air2earth.export``. Every runtime is a callable taking and returning a float32 tensor, so
+it can stand in for the eager model anywhere.
+
+Selected with AIR2EARTH_RUNTIME=eager|torchscript|onnx (default eager).
+"""
+
+import os
+import warnings
+
+import numpy as np
+import torch
+
+RUNTIMES = ("eager", "torchscript", "onnx")
+
+
+def artifact_paths(model_path):
+    """TorchScript and ONNX artifact paths for a .pth weights file."""
+    base = os.path.splitext(model_path)[0]
+    return {"torchscript": base + ".pt", "onnx": base + ".onnx"}
+
+
+class TorchScriptRuntime:
+    """Frozen TorchScript module loaded with torch.jit."""
+
+    name = "torchscript"
+
+    def __init__(self, path, eager):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            self.module = torch.jit.load(path, map_location="cpu")
+        self.eager = eager
+
+    def __call__(self, x):
+        return self.module(x)
+
+
+class OnnxRuntime:
+    """ONNX graph served by onnxruntime on the CPU execution provider."""
+
+    name = "onnx"
+
+    def __init__(self, path, eager):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        threads = torch.get_num_threads()
+        options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.eager = eager
+
+    def __call__(self, x):
+        x = np.ascontiguousarray(x.detach().cpu().numpy(), dtype=np.float32)
+        return torch.from_numpy(self.session.run(None, {self.input_name: x})[0])
+
+
+def runtime_name(model):
+    return getattr(model, "name", "eager")
+
+
+def eager_model(model):
+    """The underlying nn.Module of a runtime (or the model itself)."""
+    return getattr(model, "eager", model)
+
+
+def load_runtime(model, model_path, runtime=None):
+    """Wrap an eager model in the requested runtime, falling back to eager if unavailable."""
+    runtime = runtime or os.environ.get("AIR2EARTH_RUNTIME", "eager")
+    if runtime not in RUNTIMES:
+        raise ValueError(f"Unknown runtime '{runtime}'. Choose from: {', '.join(RUNTIMES)}")
+    if runtime == "eager":
+        return model
+
+    if getattr(model, "precision", "fp32") != "fp32":
+        print(f"WARNING: {model.precision} precision only applies to the eager runtime. Using eager model.")
+        return model
+    path = artifact_paths(model_path)[runtime]
+    if not os.path.exists(path):
+        print(f"WARNING: {path} not found (run `python -m air2earth.export`). Using eager model.")
+        return model
+    try:
+        wrapped = TorchScriptRuntime(path, model) if runtime == "torchscript" else OnnxRuntime(path, model)
+    except ImportError as e:
+        print(f"WARNING: {runtime} runtime unavailable ({e}). Using eager model.")
+        return model
+    print(f"Loaded {runtime} runtime: {os.path.basename(path)}")
+    return wrapped
@@ -0,0 +1,171 @@
+"""
+Air2Earth - unified inference server
+Hosts all five LSTM models in one process behind a single HTTP surface: plain JSON
+POST /v1/<model> endpoints (see rest.py) plus registry introspection. The per-domain
+Gradio UIs from aqi-model/, water-model/ and solar-model/ are mounted under /ui/<domain>
+unless --no-ui is given.
+
+Usage:
+    cd backend
+    python -m air2earth.server --port 7860
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import os
+
+from fastapi import FastAPI
+
+from .batching import build_batchers
+from .cache import PredictionCache, configure_cache, get_cache
+from .common import BACKEND_DIR
+from .forecast import register_forecast_routes
+from .grid import register_grid_routes
+from .multihead import register_compare_routes
+from .optimize import register_optimize_routes
+from .precision import PRECISIONS
+from .registry import build_registry
+from .rest import register_rest_routes
+from .runtime import RUNTIMES
+from .streaming import configure_store, get_store, register_stream_routes
+from .sweep import register_sweep_routes
+
+UI_SERVICES = {
+    "aqi": "aqi-model",
+    "water": "water-model",
+    "solar": "solar-model",
+}
+
+
+def load_service_ui(domain):
+    """Import a service's app.py and return its gr.Blocks UI."""
+    path = os.path.join(BACKEND_DIR, UI_SERVICES[domain], "app.py")
+    spec = importlib.util.spec_from_file_location(f"{domain}_ui", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def create_app(registry=None, mount_ui=True, batching=True, max_batch_size=64, max_wait_ms=5.0,
+               state_path=None):
+    """Build the FastAPI application around a model registry.
+
+    With ``state_path``, streaming states are restored from that .npz at startup (if it
+    exists) and snapshotted back to it at shutdown.
+    """
+    if registry is None:
+        registry = build_registry()
+
+    if state_path and os.path.exists(state_path):
+        print(f"Restored {get_store().restore(state_path)} streaming states from {state_path}")
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        if state_path:
+            print(f"Saved {get_store().snapshot(state_path)} streaming states to {state_path}")
+
+    api = FastAPI(title="Air2Earth Inference Server", lifespan=lifespan)
+    api.state.registry = registry
+    api.state.batchers = build_batchers(registry, max_batch_size, max_wait_ms) if batching else None
+
+    @api.get("/health")
+    def health():
+        return {"status": "ok", "models": registry.names()}
+
+    @api.get("/models")
+    def models():
+        return registry.describe()
+
+    @api.get("/metrics/batching")
+    def batching_metrics():
+        if api.state.batchers is None:
+            return {}
+        return {name: batcher.stats() for name, batcher in api.state.batchers.items()}
+
+    @api.get("/metrics/cache")
+    def cache_metrics():
+        return get_cache().stats()
+
+    @api.get("/metrics/stream")
+    def stream_metrics():
+        return get_store().stats()
+
+
+    # Fixed /v1/... paths go before the catch-all POST /v1/{name}
+    register_optimize_routes(api, registry)
+    register_compare_routes(api)
+    register_grid_routes(api)
+    register_sweep_routes(api, registry)
+    register_stream_routes(api, registry)
+    register_forecast_routes(api, registry)
+    register_rest_routes(api, registry, api.state.batchers)
+
+    if mount_ui:
+        import gradio as gr
+
+        for domain in UI_SERVICES:
+            api = gr.mount_gradio_app(api, load_service_ui(domain), path=f"/ui/{domain}")
+            print(f"Mounted Gradio UI: /ui/{domain}")
+
+    return api
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Air2Earth unified inference server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=7860)
+    parser.add_argument("--no-ui", action="store_true", help="Do not mount the Gradio UIs")
+    parser.add_argument("--no-batching", action="store_true", help="Run every request as its own forward pass")
+    parser.add_argument("--max-batch-size", type=int, default=64, help="Rows per coalesced forward pass")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Longest a request waits for a batch")
+    parser.add_argument("--runtime", choices=RUNTIMES, default=None,
+                        help="Inference backend (default: AIR2EARTH_RUNTIME or eager)")
+    parser.add_argument("--precision", choices=PRECISIONS, default=None,
+                        help="Weight precision (default: AIR2EARTH_PRECISION or fp32)")
+    parser.add_argument("--cache-size", type=int, default=None,
+                        help="Max cached predictions, 0 disables (default: AIR2EARTH_CACHE_SIZE or 4096)")
+    parser.add_argument("--cache-ttl", type=float, default=None,
+                        help="Seconds before a cached prediction expires (default: AIR2EARTH_CACHE_TTL or never)")
+    parser.add_argument("--cache-decimals", type=int, default=None,
+                        help="Input rounding precision for cache keys (default: AIR2EARTH_CACHE_DECIMALS or 3)")
+    parser.add_argument("--cache-path", default=None,
+                        help="sqlite file to persist the cache across restarts (default: AIR2EARTH_CACHE_PATH)")
+    parser.add_argument("--cache-seed", type=int, default=None,
+                        help="Base seed of the cached noise (default: AIR2EARTH_CACHE_SEED or 0)")
+    parser.add_argument("--stream-size", type=int, default=10000, help="Max stations kept by the streaming store")
+    parser.add_argument("--stream-ttl", type=float, default=None, help="Seconds before an idle station state expires")
+    parser.add_argument("--stream-state", default=None, help=".npz file to restore/snapshot streaming states")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    if args.runtime:
+        os.environ["AIR2EARTH_RUNTIME"] = args.runtime
+    if args.precision:
+        os.environ["AIR2EARTH_PRECISION"] = args.precision
+    settings = PredictionCache.env_settings()
+    overrides = {
+        "maxsize": args.cache_size,
+        "ttl": args.cache_ttl,
+        "decimals": args.cache_decimals,
+        "path": args.cache_path,
+        "seed": args.cache_seed,
+    }
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    configure_cache(**settings)
+    configure_store(maxsize=args.stream_size, ttl=args.stream_ttl)
+
+    api = create_app(
+        mount_ui=not args.no_ui,
+        batching=not args.no_batching,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        state_path=args.stream_state,
+    )
+    uvicorn.run(api, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Air2Earth - Solar Potential Prediction using LSTM
+Model definition and predictor for solar energy yield, system size, and savings.
+"""
+
+import json
+import os
+
+import numpy as np
+import torch.nn as nn
+
+from .cache import cached
+from .common import (
+    DEFAULT_QUANTILES,
+    SEQ_LEN,
+    expand_samples,
+    load_model_and_scaler,
+    observed_sequences,
+    run_batch,
+    service_model_dir,
+    standard_normal,
+    summarize_samples,
+)
+from .fast import check_engine, fast_outputs, label_results
+
+# =====================================================================
+#                        MODEL DEFINITION
+# =====================================================================
+
+class SolarLSTM(nn.Module):
+    """LSTM model for predicting solar energy potential."""
+    def __init__(self, input_dim=6, hidden_dim=64, output_dim=5, num_layers=2):
+        super().__init__()
+        self.hidden_dim = hidden_dim
+        self.num_layers = num_layers
+        self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers, batch_first=True, dropout=0.2)
+        self.fc = nn.Sequential(
+            nn.Linear(hidden_dim, 32),
+            nn.ReLU(),
+            nn.Linear(32, output_dim)
+        )
+
+    def forward(self, x):
+        out, _ = self.lstm(x)
+        return self.fc(out[:, -1, :])
+
+
+# =====================================================================
+#                     LOAD MODEL & SCALER
+# =====================================================================
+
+MODEL_DIR = service_model_dir("solar-model", "SOLAR_MODEL_DIR")
+
+SOLAR_INPUTS = ("peak_sun_hours", "shadow_coverage", "temperature", "cloud_cover", "roof_area", "tariff")
+
+solar_model, solar_scaler = load_model_and_scaler(
+    SolarLSTM, "solar_lstm.pth", "solar_scaler.json", MODEL_DIR
+)
+
+
+# =====================================================================
+#                      PREDICTION FUNCTIONS
+# =====================================================================
+
+def build_sequences(base_rows, rng=None, seq_len=SEQ_LEN, noise_scales=None):
+    """Build a (N, seq_len, F) batch of input sequences with diurnal variation.
+
+    Noise comes from ``rng`` (see ``common.standard_normal``): a seeded generator makes the
+    whole batch reproducible, a list of per-row generators makes each row reproducible.
+    """
+    base = np.asarray(base_rows, dtype=np.float64)
+    n, f = base.shape
+    if noise_scales is None:
+        noise_scales = [0.02] * f
+    scales = np.asarray(noise_scales, dtype=np.float64)
+    t = np.arange(seq_len)
+    hour_factor = np.maximum(0, np.sin((t - 6) * np.pi / 12))  # 0 at 6am/6pm, 1 at noon
+    z = standard_normal(rng, (n, seq_len, f))
+
+    seq = base[:, None, :] * (1.0 + z * scales)
+    sun = base[:, None, 0]  # sun_hours — diurnal
+    seq[:, :, 0] = sun * (0.8 + 0.4 * hour_factor) + z[:, :, 0] * scales[0] * sun
+    # temperature — diurnal
+    seq[:, :, 2] = base[:, None, 2] + 2 * z[:, :, 2] + np.sin(t * np.pi / 12) * 5
+    # cloud cover — slight variation
+    seq[:, :, 3] = np.clip(base[:, None, 3] + 0.05 * z[:, :, 3], 0, 1)
+    return seq.astype(np.float32)
+
+
+def build_sequence(base_values, seq_len=SEQ_LEN, noise_scales=None, rng=None):
+    """Build a time-series input sequence with diurnal variation."""
+    return build_sequences([base_values], rng=rng, seq_len=seq_len, noise_scales=noise_scales)[0]
+
+
+SOLAR_NOISE_SCALES = [0.03, 0.01, 0.0, 0.0, 0.0, 0.0]
+
+
+def format_solar_result(pred, row):
+    """Build the solar JSON payload for one denormalized prediction row."""
+    peak_sun_hours, shadow_coverage, temperature, cloud_cover, roof_area, tariff = row
+    return {
+        "type": "solar",
+        "predictions": {
+            "system_size_kw": round(float(max(pred[0], 0)), 2),
+            "energy_month_kwh": round(float(max(pred[1], 0)), 2),
+            "savings_month_inr": round(float(max(pred[2], 0)), 2),
+            "effective_sun_hours": round(float(np.clip(pred[3], 0, 10)), 2),
+            "usable_roof_area_m2": round(float(max(pred[4], 0)), 2),
+        },
+        "derived": {
+            "energy_year_kwh": round(float(max(pred[1], 0)) * 12, 2),
+            "savings_year_inr": round(float(max(pred[2], 0)) * 12, 2),
+        },
+        "input_conditions": {
+            "peak_sun_hours": float(peak_sun_hours),
+            "shadow_coverage": float(shadow_coverage),
+            "temperature_c": float(temperature),
+            "cloud_cover": float(cloud_cover),
+            "roof_area_m2": float(roof_area),
+            "tariff_inr_per_kwh": float(tariff),
+        },
+        "constants": {
+            "usability_factor": 0.7,
+            "performance_ratio": 0.8,
+            "sqm_per_kw": 10.0,
+        },
+        "model": "LSTM",
+        "sequence_length": SEQ_LEN,
+    }
+
+
+@cached("solar", os.path.join(MODEL_DIR, "solar_lstm.pth"))
+def predict_solar_potential_batch(
+    rows, rng=None, samples=1, quantiles=DEFAULT_QUANTILES, mc_dropout=False, sequences=None, engine="lstm"
+):
+    """Predict solar potential for N rows of
+    (peak_sun_hours, shadow_coverage, temperature, cloud_cover, roof_area, tariff)
+    in one forward pass.
+
+    Pass a seeded ``numpy.random.Generator`` as ``rng`` for reproducible noise. With
+    ``samples=K`` each row is scored K times in the same pass and collapsed to the mean
+    plus std/quantiles under ``uncertainty``; ``mc_dropout`` keeps LSTM dropout active.
+    ``sequences`` ((N, 24, F) observed readings) replaces the synthetic sequences; the rows
+    are then each sequence's last reading. ``engine`` "fast" or "lut" skips the LSTM (see fast.py).
+    Returns a list of result dicts with the same shape as predict_solar_potential.
+    """
+    check_engine(engine)
+    if sequences is not None:
+        rows, sequences = observed_sequences(sequences, 6)
+    rows = [tuple(row) for row in rows]
+    if not rows:
+        return []
+    sample_rows, rng = expand_samples(rows, rng, samples)
+    raw_seqs = None  # the lookup table reads the rows only
+    if sequences is not None:
+        raw_seqs = np.repeat(sequences, samples, axis=0)
+    elif engine != "lut":
+        raw_seqs = build_sequences(sample_rows, rng=rng, noise_scales=SOLAR_NOISE_SCALES)
+    if engine != "lstm":
+        preds = fast_outputs("solar", sample_rows, raw_seqs, engine)
+    else:
+        preds = run_batch(solar_model, raw_seqs, solar_scaler, 6, 5, mc_dropout=mc_dropout)
+    results = [format_solar_result(pred, row) for pred, row in zip(preds, sample_rows)]
+    if engine != "lstm":
+        label_results(results, engine)
+    return summarize_samples(results, samples, quantiles)
+
+
+def predict_solar_potential(
+    peak_sun_hours, shadow_coverage, temperature, cloud_cover, roof_area, tariff,
+    samples=1, mc_dropout=False, sequence=None, as_dict=False
+):
+    """Predict solar energy potential using LSTM.
+
+    Returns a pretty-printed JSON string, or the payload dict itself with ``as_dict``.
+    """
+    try:
+        result = predict_solar_potential_batch(
+            [(peak_sun_hours, shadow_coverage, temperature, cloud_cover, roof_area, tariff)],
+            samples=samples,
+            mc_dropout=mc_dropout,
+            sequences=None if sequence is None else [sequence],
+        )[0]
+        return result if as_dict else json.dumps(result, indent=2)
+
+    except Exception as e:
+        error = {"error": str(e)}
+        return error if as_dict else json.dumps(error, indent=2)
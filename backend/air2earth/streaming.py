@@ -0,0 +1,225 @@
+"""
+Air2Earth - stateful streaming inference
+Keeps each station's last 24 hourly observations, so a new reading only has to be sent
+once. Every update is scored on the station's own 24-step window, exactly the sequence
+length the models were trained on, instead of carrying the LSTM (h, c) state forward
+past it (which drifts out of distribution after 24 steps).
+
+A station's first observation fills the window, from an optional "history" of up to 24
+past rows or, without one, from the observation repeated (the constant-input regime the
+models were trained on); a short history is padded with its earliest row. Every later
+observation shifts the window by one row. Responses carry "steps" (rows observed so far)
+and "window_full" (whether all 24 rows of the window are real observations). Windows live
+in a bounded LRU/TTL store that can be snapshotted to an .npz file and restored.
+
+    POST   /v1/stream/<model>            {"station": "s1", "observation": {...}, "history": [...]}
+                                         or {"updates": [{"station", "observation"}, ...]}
+    DELETE /v1/stream/<model>/<station>  drop a station's window
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from .common import SEQ_LEN, run_batch
+from .rest import RequestError, compact_json, parse_row, read_json
+from .runtime import eager_model
+
+
+class StateStore:
+    """Thread-safe LRU/TTL store of per-(model, station) observation windows."""
+
+    def __init__(self, maxsize=10000, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self.expirations = 0
+        self._states = OrderedDict()
+        self.lock = threading.RLock()
+
+    def get(self, model, station):
+        """Return (window, steps) or None; window is the (SEQ_LEN, F) array of raw rows."""
+        with self.lock:
+            key = (model, station)
+            entry = self._states.get(key)
+            if entry is None:
+                return None
+            if self.ttl is not None and time.time() - entry[2] > self.ttl:
+                del self._states[key]
+                self.expirations += 1
+                return None
+            self._states.move_to_end(key)
+            return entry[:2]
+
+    def put(self, model, station, window, steps, updated=None):
+        with self.lock:
+            self._states[(model, station)] = (window, steps, updated or time.time())
+            self._states.move_to_end((model, station))
+            while len(self._states) > self.maxsize:
+                self._states.popitem(last=False)
+                self.evictions += 1
+
+    def push(self, model, station, rows, reset=False):
+        """Append raw ``rows`` to a station's window; returns the new (window, steps).
+
+        A new (or ``reset``) station's window starts as its first row repeated. Only this
+        read-modify-write holds the lock, so updates of one station apply in order while
+        the forward passes run concurrently.
+        """
+        rows = np.asarray(rows, dtype=np.float64)
+        with self.lock:
+            state = None if reset else self.get(model, station)
+            window, steps = state if state is not None else (np.repeat(rows[:1], SEQ_LEN, axis=0), 0)
+            window = np.concatenate([window, rows])[-SEQ_LEN:]
+            self.put(model, station, window, steps + len(rows))
+            return window, steps + len(rows)
+
+    def drop(self, model, station):
+        with self.lock:
+            return self._states.pop((model, station), None) is not None
+
+    def __len__(self):
+        return len(self._states)
+
+    def stats(self):
+        with self.lock:
+            models = {}
+            for model, _ in self._states:
+                models[model] = models.get(model, 0) + 1
+            return {
+                "size": len(self._states),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stations": models,
+            }
+
+    def snapshot(self, path):
+        """Write every window to an .npz file (atomically replaced)."""
+        with self.lock:
+            items = list(self._states.items())
+        arrays = {}
+        for model in sorted({model for (model, _), _ in items}):
+            group = [(station, entry) for (m, station), entry in items if m == model]
+            arrays[f"{model}.stations"] = np.array([str(station) for station, _ in group])
+            arrays[f"{model}.window"] = np.stack([entry[0] for _, entry in group])
+            arrays[f"{model}.steps"] = np.array([entry[1] for _, entry in group], dtype=np.int64)
+            arrays[f"{model}.updated"] = np.array([entry[2] for _, entry in group])
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, path)
+        return len(items)
+
+    def restore(self, path):
+        """Load windows written by ``snapshot``; returns the number restored."""
+        restored = 0
+        with np.load(path) as data:
+            models = {name.rsplit(".", 1)[0] for name in data.files}
+            for model in models:
+                if f"{model}.window" not in data.files:
+                    print(f"WARNING: {path} holds {model} (h, c) states from an older version. Skipping them.")
+                    continue
+                for station, window, steps, updated in zip(
+                    data[f"{model}.stations"], data[f"{model}.window"], data[f"{model}.steps"],
+                    data[f"{model}.updated"],
+                ):
+                    self.put(model, str(station), window, int(steps), float(updated))
+                    restored += 1
+        return restored
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        maxsize = int(os.environ.get("AIR2EARTH_STREAM_SIZE", 10000))
+        ttl = os.environ.get("AIR2EARTH_STREAM_TTL")
+        _store = StateStore(maxsize, float(ttl) if ttl else None)
+    return _store
+
+
+def configure_store(**kwargs):
+    global _store
+    _store = StateStore(**kwargs)
+    return _store
+
+
+# =====================================================================
+#                           SCORING
+# =====================================================================
+
+def advance(entry, updates, store=None):
+    """Apply [(station, observation row, history rows or None)] and return result payloads.
+
+    Each update is pushed into its station's window in order (a station repeated within
+    ``updates`` advances once per occurrence); all resulting windows are then scored in one
+    batched forward pass, outside the store lock.
+    """
+    if store is None:
+        store = get_store()
+    windows, steps = [], []
+    for station, row, history in updates:
+        window, n = store.push(entry.name, station, list(history or []) + [row], reset=history is not None)
+        windows.append(window)
+        steps.append(n)
+
+    output_dim = eager_model(entry.model).fc[-1].out_features
+    preds = run_batch(entry.model, np.stack(windows).astype(np.float32), entry.scaler, len(entry.inputs), output_dim)
+    return [
+        {"station": station, "steps": n, "window_full": n >= SEQ_LEN, **entry.format_result(pred, row)}
+        for (station, row, _), n, pred in zip(updates, steps, preds)
+    ]
+
+
+# =====================================================================
+#                            ROUTES
+# =====================================================================
+
+def parse_update(item, inputs):
+    """(station, observation, history) from one update object."""
+    if not isinstance(item, dict) or "station" not in item or "observation" not in item:
+        raise RequestError("Each update needs 'station' and 'observation'")
+    history = item.get("history")
+    if history is not None:
+        if not isinstance(history, list) or not 1 <= len(history) <= SEQ_LEN:
+            raise RequestError(f"'history' must be a list of 1 to {SEQ_LEN} rows")
+        history = [parse_row(row, inputs) for row in history]
+    return str(item["station"]), parse_row(item["observation"], inputs), history
+
+
+def register_stream_routes(api, registry):
+    """Add POST /v1/stream/<model> and DELETE /v1/stream/<model>/<station>."""
+
+    async def stream_update(request: Request):
+        name = request.path_params["name"]
+        if name not in registry:
+            return compact_json({"error": f"Unknown model '{name}'"}, 404)
+        entry = registry.get(name)
+        try:
+            body = await read_json(request)
+            batched = isinstance(body, dict) and "updates" in body
+            items = body["updates"] if batched else [body]
+            if not isinstance(items, list):
+                raise RequestError("'updates' must be a list")
+            updates = [parse_update(item, entry.inputs) for item in items]
+        except RequestError as e:
+            return compact_json({"error": str(e)}, 400)
+        results = await run_in_threadpool(advance, entry, updates)
+        return compact_json({"results": results} if batched else results[0])
+
+    async def stream_reset(request: Request):
+        name, station = request.path_params["name"], request.path_params["station"]
+        dropped = get_store().drop(name, station)
+        return compact_json({"station": station, "dropped": dropped}, 200 if dropped else 404)
+
+    api.add_route("/v1/stream/{name}", stream_update, methods=["POST"])
+    api.add_route("/v1/stream/{name}/{station}", stream_reset, methods=["DELETE"])
+    return api
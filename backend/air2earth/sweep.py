@@ -0,0 +1,246 @@
+"""
+Air2Earth - scenario sweeps and sensitivity analysis
+POST /v1/sweep/<model> evaluates a design over a model's inputs in batched forward passes
+and returns tidy column arrays plus per-input sensitivity indices. A design is either
+
+    {"ranges": {"roof_angle": [0, 45], "roof_area": [20, 800]}, "points": 10,
+     "design": "grid" | "lhs", "fixed": {<every other input>}}
+
+(``levels`` may list explicit values per input instead of a range) or explicit "rows".
+Repeated points are scored once per sweep. Sweeps bypass the serving prediction cache, so
+a large design does not evict the entries interactive requests rely on; noise is seeded
+from "seed" instead.
+
+With "stream" (see rest.stream_format) the design is scored in blocks of "chunk" points
+and each block's outputs are sent as soon as they are ready; the sensitivity indices
+follow in the final event.
+"""
+
+import itertools
+import time
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from .rest import RequestError, compact_json, parse_row, read_json, stream_chunk, stream_format, stream_response
+
+MAX_SWEEP_POINTS = 100_000
+DESIGNS = ("grid", "lhs")
+
+
+def latin_hypercube(n, d, rng):
+    """n stratified points in [0, 1)^d, one per row/column stratum."""
+    strata = np.stack([rng.permutation(n) for _ in range(d)], axis=1)
+    return (strata + rng.random((n, d))) / n
+
+
+def build_design(spec, inputs):
+    """Return (design matrix (N, F) ordered like ``inputs``, names of the varied inputs)."""
+    if "rows" in spec:
+        if not isinstance(spec["rows"], list) or not spec["rows"]:
+            raise RequestError("'rows' must be a non-empty list")
+        design = np.array([parse_row(item, inputs) for item in spec["rows"]])
+        if len(design) > MAX_SWEEP_POINTS:
+            raise RequestError(f"Design has {len(design)} points; the limit is {MAX_SWEEP_POINTS}")
+        varied = [name for i, name in enumerate(inputs) if np.ptp(design[:, i]) > 0]
+        return design, varied
+
+    ranges = spec.get("ranges") or {}
+    levels = spec.get("levels") or {}
+    fixed = spec.get("fixed") or {}
+    if not all(isinstance(v, dict) for v in (ranges, levels, fixed)):
+        raise RequestError("'ranges', 'levels' and 'fixed' must be objects")
+    varied = [name for name in inputs if name in ranges or name in levels]
+    unknown = [name for name in list(ranges) + list(levels) + list(fixed) if name not in inputs]
+    if unknown:
+        raise RequestError(f"Unknown input(s): {', '.join(unknown)}. Inputs: {', '.join(inputs)}")
+    if not varied:
+        raise RequestError("Give 'ranges' or 'levels' for at least one input, or explicit 'rows'")
+    missing = [name for name in inputs if name not in varied and name not in fixed]
+    if missing:
+        raise RequestError(f"Missing fixed value(s) for: {', '.join(missing)}")
+
+    kind = spec.get("design", "grid")
+    if kind not in DESIGNS:
+        raise RequestError(f"design must be one of: {', '.join(DESIGNS)}")
+    try:
+        points = int(spec.get("points", 10 if kind == "grid" else 256))
+        bounds = {name: [float(v) for v in ranges[name]] for name in varied if name in ranges}
+        values = {name: [float(v) for v in levels[name]] for name in varied if name in levels}
+        constants = {name: float(fixed[name]) for name in inputs if name not in varied}
+    except (TypeError, ValueError):
+        raise RequestError("points, ranges, levels and fixed values must be numeric") from None
+    if points < 1:
+        raise RequestError("points must be positive")
+    if any(len(b) != 2 for b in bounds.values()):
+        raise RequestError("Each range must be [low, high]")
+
+    if kind == "grid":
+        for name, (low, high) in bounds.items():
+            values.setdefault(name, list(np.linspace(low, high, points)))
+        size = int(np.prod([len(values[name]) for name in varied]))
+        if size > MAX_SWEEP_POINTS:
+            raise RequestError(f"Grid has {size} points; the limit is {MAX_SWEEP_POINTS}")
+        columns = dict(zip(varied, np.array(list(itertools.product(*(values[n] for n in varied)))).T))
+    else:
+        if values:
+            raise RequestError("'levels' only applies to grid designs")
+        if points > MAX_SWEEP_POINTS:
+            raise RequestError(f"Design has {points} points; the limit is {MAX_SWEEP_POINTS}")
+        unit = latin_hypercube(points, len(varied), np.random.default_rng(parse_seed(spec)))
+        columns = {name: low + unit[:, i] * (high - low) for i, (name, (low, high)) in enumerate(bounds.items())}
+
+    n = len(next(iter(columns.values())))
+    design = np.stack([columns[name] if name in columns else np.full(n, constants[name]) for name in inputs], axis=1)
+    return design, varied
+
+
+def numeric_fields(result):
+    """(section, field) pairs of the numeric prediction/derived values in a payload."""
+    return [
+        (section, field)
+        for section in ("predictions", "derived")
+        for field, value in result.get(section, {}).items()
+        if isinstance(value, (int, float))
+    ]
+
+
+def parse_seed(spec):
+    try:
+        return int(spec.get("seed", 0))
+    except (TypeError, ValueError):
+        raise RequestError("seed must be an integer") from None
+
+
+def evaluate(entry, design, rng=None, memo=None, chunk_size=4096):
+    """Score the rows of ``design`` not yet in ``memo``; returns ({field: (N,) array}, newly scored count).
+
+    ``memo`` maps a design point to its {field: value} outputs and is shared by the blocks of one
+    sweep, so a point is scored once per sweep. The serving cache is bypassed.
+    """
+    memo = {} if memo is None else memo
+    predict = getattr(entry.predict_batch, "uncached", entry.predict_batch)
+    unique, inverse = np.unique(design, axis=0, return_inverse=True)
+    keys = [tuple(row) for row in unique]
+    todo = [key for key in keys if key not in memo]
+    for start in range(0, len(todo), chunk_size):
+        batch = todo[start:start + chunk_size]
+        for key, r in zip(batch, predict(batch, rng=rng)):
+            memo[key] = {field: r[section][field] for section, field in numeric_fields(r)}
+    fields = list(memo[keys[0]])
+    table = np.array([[memo[key][field] for field in fields] for key in keys], dtype=np.float64)
+    outputs = {field: table[:, i][inverse.ravel()] for i, field in enumerate(fields)}
+    return outputs, len(todo)
+
+
+def first_order_index(x, y, max_bins=50):
+    """Correlation ratio Var(E[y|x]) / Var(y), with x binned into quantiles if continuous."""
+    var = y.var()
+    if var == 0:
+        return 0.0
+    levels = np.unique(x)
+    if len(levels) <= max_bins:
+        groups = np.searchsorted(levels, x)
+    else:
+        bins = min(max_bins, max(2, int(np.sqrt(len(x)))))
+        edges = np.quantile(x, np.linspace(0, 1, bins + 1)[1:-1])
+        groups = np.searchsorted(edges, x, side="right")
+    counts = np.bincount(groups)
+    means = np.bincount(groups, weights=y)[counts > 0] / counts[counts > 0]
+    return float(np.sum(counts[counts > 0] * (means - y.mean()) ** 2) / len(y) / var)
+
+
+def standardized_coefficients(x, y):
+    """Standardized regression coefficients of y on the columns of x."""
+    x_std = x.std(axis=0)
+    if y.std() == 0:
+        return np.zeros(x.shape[1])
+    keep = x_std > 0
+    coef = np.zeros(x.shape[1])
+    if keep.any():
+        xs = (x[:, keep] - x[:, keep].mean(axis=0)) / x_std[keep]
+        coef[keep] = np.linalg.lstsq(xs, (y - y.mean()) / y.std(), rcond=None)[0]
+    return coef
+
+
+def sensitivity(design, inputs, varied, outputs):
+    """{field: {input: {"first_order", "src"}}} for every varied input."""
+    columns = [inputs.index(name) for name in varied]
+    x = design[:, columns]
+    indices = {}
+    for field, y in outputs.items():
+        src = standardized_coefficients(x, y)
+        indices[field] = {
+            name: {"first_order": round(first_order_index(x[:, i], y), 4), "src": round(float(src[i]), 4)}
+            for i, name in enumerate(varied)
+        }
+    return indices
+
+
+def sweep(entry, spec):
+    """Run a sweep spec against a registry entry; returns the JSON-serializable response."""
+    inputs = list(entry.inputs)
+    design, varied = build_design(spec, inputs)
+    outputs, unique = evaluate(entry, design, np.random.default_rng(parse_seed(spec)))
+    return {
+        "model": entry.name,
+        "points": len(design),
+        "unique_points": unique,
+        "varied": varied,
+        "inputs": {name: np.round(design[:, i], 6).tolist() for i, name in enumerate(inputs)},
+        "outputs": {field: np.round(y, 4).tolist() for field, y in outputs.items()},
+        "sensitivity": sensitivity(design, inputs, varied, outputs),
+    }
+
+
+def sweep_events(entry, design, varied, chunk, seed=0):
+    """start / one chunk per ``chunk`` design points / end events for a streamed sweep."""
+    start = time.perf_counter()
+    inputs = list(entry.inputs)
+    yield "start", {
+        "model": entry.name,
+        "points": len(design),
+        "varied": varied,
+        "chunk": chunk,
+        "inputs": {name: np.round(design[:, i], 6).tolist() for i, name in enumerate(inputs)},
+    }
+    rng, memo = np.random.default_rng(seed), {}
+    blocks, unique = [], 0
+    for offset in range(0, len(design), chunk):
+        outputs, count = evaluate(entry, design[offset:offset + chunk], rng, memo)
+        blocks.append(outputs)
+        unique += count
+        yield "chunk", {"offset": offset, "outputs": {field: np.round(y, 4).tolist() for field, y in outputs.items()}}
+    outputs = {field: np.concatenate([block[field] for block in blocks]) for field in blocks[0]}
+    yield "end", {
+        "unique_points": unique,
+        "sensitivity": sensitivity(design, inputs, varied, outputs),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def register_sweep_routes(api, registry):
+    """Add POST /v1/sweep/<model> for every model in ``registry``."""
+
+    async def run_sweep(request: Request):
+        name = request.path_params["name"]
+        if name not in registry:
+            return compact_json({"error": f"Unknown model '{name}'"}, 404)
+        try:
+            spec = await read_json(request)
+            if not isinstance(spec, dict):
+                raise RequestError("Body must be an object")
+            fmt = stream_format(request, spec)
+            if fmt is not None:
+                entry = registry.get(name)
+                design, varied = build_design(spec, list(entry.inputs))
+                events = sweep_events(entry, design, varied, stream_chunk(spec), parse_seed(spec))
+                return stream_response(request, fmt, events)
+            result = await run_in_threadpool(sweep, registry.get(name), spec)
+        except RequestError as e:
+            return compact_json({"error": str(e)}, 400)
+        return compact_json(result)
+
+    api.add_route("/v1/sweep/{name}", run_sweep, methods=["POST"])
+    return api
@@ -0,0 +1,391 @@
+"""
+Air2Earth - headless training
+The synthetic-data generators of the five training notebooks, vectorized with NumPy so a
+whole (N, 24, F) dataset is drawn in a few array operations instead of nested Python
+loops, plus the notebooks' training loop and a CLI. The outputs are the .pth state dict
+and *_scaler.json that ``load_model_and_scaler`` reads.
+
+Usage:
+    cd backend
+    python -m air2earth.training tree --samples 50000 --epochs 100
+    python -m air2earth.training all --model-dir /tmp/models
+    python -m air2earth.training water --samples 2000000 --cache --workers 2
+
+The generators keep the notebooks' distributions and calculations.ts target formulas, but
+draw from ``numpy.random.default_rng(seed)`` in bulk, so the samples are not the same
+draws as the notebooks' ``np.random.seed(42)`` loops.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from .common import SEQ_LEN
+
+# =====================================================================
+#                        SYNTHETIC DATA
+# =====================================================================
+
+# Tree species (mirroring the frontend constants): (pm25_factor, co2 kg/year)
+TREE_TYPES = np.array([[0.8, 22], [1.0, 25], [1.2, 30], [0.6, 18], [0.5, 15]])
+
+# Water constants from calculations.ts
+BASE_RAINFALL_RATE = 5     # mm/hour for moderate rain
+RAIN_HOURS_PER_DAY = 6     # assumed rain hours per rainy day
+
+# Solar constants from calculations.ts
+USABILITY_FACTOR = 0.7     # 70% of roof usable
+SQM_PER_KW = 10.0          # 1 kW needs ~10 m²
+PERFORMANCE_RATIO = 0.8    # 80% system efficiency
+
+STEPS = np.arange(SEQ_LEN)
+
+
+def _noise(rng, n, scale):
+    return rng.normal(0, scale, (n, SEQ_LEN))
+
+
+def _drift(rng, n, scale):
+    """The notebooks' ``t * np.random.normal(0, scale)`` trend term."""
+    return STEPS * rng.normal(0, scale, (n, SEQ_LEN))
+
+
+def _constant(values):
+    return np.repeat(values[:, None], SEQ_LEN, axis=1)
+
+
+def _dataset(columns, targets):
+    return np.stack(columns, axis=2).astype(np.float32), np.stack(targets, axis=1).astype(np.float32)
+
+
+def generate_tree_data(num_samples, seed=42):
+    """(X (N, 24, 5), y (N, 4)) like tree_lstm_train.ipynb."""
+    rng = np.random.default_rng(seed)
+    n = num_samples
+    base_aqi, base_pm25 = rng.uniform(50, 400, n), rng.uniform(20, 200, n)
+    base_temp, base_humidity, base_wind = rng.uniform(15, 45, n), rng.uniform(30, 90, n), rng.uniform(0, 15, n)
+    columns = [
+        base_aqi[:, None] + _noise(rng, n, 10) + _drift(rng, n, 0.5),
+        base_pm25[:, None] + _noise(rng, n, 5) + _drift(rng, n, 0.2),
+        base_temp[:, None] + _noise(rng, n, 2) + np.sin(STEPS * np.pi / 12) * 3,
+        base_humidity[:, None] + _noise(rng, n, 3),
+        np.maximum(0, base_wind[:, None] + _noise(rng, n, 1)),
+    ]
+    pm25, temp, humidity, wind = (np.maximum(columns[1][:, -1], 1.0), columns[2][:, -1],
+                                  columns[3][:, -1], columns[4][:, -1])
+
+    species = TREE_TYPES[rng.integers(0, len(TREE_TYPES), n)]
+    pm25_reduction = (0.3 + rng.random(n) * 0.9) * species[:, 0]
+    aqi_improvement = np.minimum(np.round(1 + pm25_reduction / pm25 * 100 * 2), 5)
+    modifier = (1.0 + (temp - 25) * 0.01) * (1.0 + (humidity - 60) * 0.005) * (1.0 + wind * 0.02)
+    return _dataset(columns, [pm25_reduction * modifier, pm25_reduction * 1.5 * modifier,
+                              aqi_improvement, species[:, 1]])
+
+
+def generate_garden_data(num_samples, seed=42):
+    """(X (N, 24, 5), y (N, 5)) like garden_lstm_train.ipynb."""
+    rng = np.random.default_rng(seed)
+    n = num_samples
+    base_aqi, base_pm25, area = rng.uniform(50, 400, n), rng.uniform(20, 200, n), rng.uniform(2, 50, n)
+    base_temp, base_humidity = rng.uniform(15, 45, n), rng.uniform(30, 90, n)
+    columns = [
+        base_aqi[:, None] + _noise(rng, n, 10) + _drift(rng, n, 0.5),
+        base_pm25[:, None] + _noise(rng, n, 5) + _drift(rng, n, 0.2),
+        _constant(area),
+        base_temp[:, None] + _noise(rng, n, 2) + np.sin(STEPS * np.pi / 12) * 3,
+        base_humidity[:, None] + _noise(rng, n, 3),
+    ]
+    pm25, temp, humidity = np.maximum(columns[1][:, -1], 1), columns[3][:, -1], columns[4][:, -1]
+
+    pm25_reduction = (0.2 + rng.random(n) * 0.3) * area
+    aqi_improvement = np.minimum(np.round(2 + pm25_reduction / pm25 * 100 * 3), 15)
+    temp_reduction = 1 + rng.random(n)
+    noise_reduction = 3 + rng.random(n) * 2
+    modifier = (1.0 + (temp - 25) * 0.008) * (1.0 + (humidity - 60) * 0.004)
+    return _dataset(columns, [
+        pm25_reduction * modifier,
+        pm25_reduction * 1.3 * modifier,
+        aqi_improvement,
+        temp_reduction * (1.0 + area * 0.01),
+        noise_reduction * (1.0 + area * 0.005),
+    ])
+
+
+def generate_purifier_data(num_samples, seed=42):
+    """(X (N, 24, 4), y (N, 3)) like purifier_lstm_train.ipynb."""
+    rng = np.random.default_rng(seed)
+    n = num_samples
+    base_aqi, base_pm25 = rng.uniform(50, 400, n), rng.uniform(20, 200, n)
+    room, ventilation = rng.uniform(100, 800, n), rng.uniform(0.5, 8.0, n)
+    columns = [
+        base_aqi[:, None] + _noise(rng, n, 8) + _drift(rng, n, 0.3),
+        base_pm25[:, None] + _noise(rng, n, 4) + _drift(rng, n, 0.15),
+        _constant(room),
+        np.maximum(0.1, ventilation[:, None] + _noise(rng, n, 0.2)),
+    ]
+
+    coverage = 300 + rng.random(n) * 300
+    cadr = 250 + rng.random(n) * 200
+    reduction = 60 + rng.random(n) * 30
+    room_factor = np.clip(500 / np.maximum(room, 100), 0.5, 1.5)
+    aqi_factor = np.clip(1.2 - (base_aqi / 500) * 0.4, 0.6, 1.2)
+    vent_factor = np.clip(1.1 - ventilation * 0.03, 0.7, 1.1)
+    return _dataset(columns, [np.clip(reduction * room_factor * aqi_factor * vent_factor, 30, 99),
+                              cadr * room_factor, coverage * room_factor])
+
+
+def water_targets(X):
+    """calculations.ts water targets (N, 4) of (N, 24, 6) sequences, from their averages."""
+    intensity, angle, size, speed, roof_area, roof_angle = X.astype(np.float64).mean(axis=1).T
+
+    # calculateAdvancedWaterCollection() efficiency
+    efficiency = np.clip(
+        (1 - np.abs(angle) * 0.2) * (0.8 + size * 0.1) * (1 - np.abs(speed - 50) / 100 * 0.15)
+        * (1 - roof_angle / 100),
+        0.3, 0.95,
+    )
+    # calculateWaterHarvestingPotential()
+    potential = np.clip(60 + np.log(roof_area + 1) * 1.5 + np.maximum(0, 20 - roof_angle / 1.5)
+                        - np.abs(angle) * 5, 40, 95)
+    liters_per_hour = roof_area * BASE_RAINFALL_RATE * intensity * efficiency
+    return np.stack([efficiency * 100, liters_per_hour, liters_per_hour * RAIN_HOURS_PER_DAY, potential],
+                    axis=1).astype(np.float32)
+
+
+def generate_water_data(num_samples, seed=42):
+    """(X (N, 24, 6), y (N, 4)) like water_lstm_train.ipynb."""
+    rng = np.random.default_rng(seed)
+    n = num_samples
+    base_intensity, base_angle = rng.uniform(0.1, 2.0, n), rng.uniform(-1.5, 1.5, n)
+    base_size, base_speed = rng.uniform(0.1, 2.0, n), rng.uniform(10, 100, n)
+    roof_area, roof_angle = rng.uniform(50, 600, n), rng.uniform(0, 40, n)
+    storm_factor = 1.0 + 0.3 * np.sin(STEPS * np.pi / 6)
+    columns = [
+        np.clip(base_intensity[:, None] * storm_factor + _noise(rng, n, 0.1), 0.05, 3.0),
+        np.clip(base_angle[:, None] + _noise(rng, n, 0.15) + 0.1 * np.sin(STEPS * np.pi / 8), -2.0, 2.0),
+        np.clip(base_size[:, None] + _noise(rng, n, 0.08), 0.05, 3.0),
+        np.clip(base_speed[:, None] + _noise(rng, n, 3) + 5 * np.sin(STEPS * np.pi / 10), 5, 120),
+        _constant(roof_area),
+        _constant(roof_angle),
+    ]
+    X = np.stack(columns, axis=2).astype(np.float32)
+    return X, water_targets(X)
+
+
+def solar_targets(X):
+    """calculateSolarPotential() targets (N, 5) of (N, 24, 6) sequences.
+
+    Uses the final shadow, roof area and tariff and the average sun, temperature and cloud.
+    """
+    X = X.astype(np.float64)
+    sun, _, temp, cloud = X[:, :, :4].mean(axis=1).T
+    _, final_shadow, _, _, roof_area, tariff = X[:, -1, :].T
+
+    effective_peak_sun = sun * (1.0 - cloud * 0.5)
+    usable_roof_area = roof_area * USABILITY_FACTOR * (1 - final_shadow)
+    system_size_kw = usable_roof_area / SQM_PER_KW
+    temp_coeff = np.clip(1.0 - np.maximum(0, temp - 25) * 0.004, 0.8, 1.0)
+    energy_year_kwh = system_size_kw * 365 * effective_peak_sun * PERFORMANCE_RATIO * temp_coeff
+    return np.stack([
+        system_size_kw,
+        energy_year_kwh / 12,
+        energy_year_kwh * tariff / 12,
+        effective_peak_sun * (1 - final_shadow),
+        usable_roof_area,
+    ], axis=1).astype(np.float32)
+
+
+def generate_solar_data(num_samples, seed=42):
+    """(X (N, 24, 6), y (N, 5)) like solar_lstm_train.ipynb."""
+    rng = np.random.default_rng(seed)
+    n = num_samples
+    base_sun, base_shadow = rng.uniform(3.0, 7.0, n), rng.uniform(0.05, 0.55, n)
+    base_temp, base_cloud = rng.uniform(20, 45, n), rng.uniform(0.0, 0.7, n)
+    roof_area, tariff = rng.uniform(50, 600, n), rng.uniform(5.0, 12.0, n)
+    hour_factor = np.clip(np.sin((STEPS - 6) * np.pi / 12), 0, 1)
+    columns = [
+        np.clip(base_sun[:, None] * (0.8 + 0.4 * hour_factor) + _noise(rng, n, 0.2), 1.0, 8.0),
+        np.clip(base_shadow[:, None] + _noise(rng, n, 0.03), 0.0, 0.8),
+        base_temp[:, None] + _noise(rng, n, 2) + np.sin(STEPS * np.pi / 12) * 5,
+        np.clip(base_cloud[:, None] + _noise(rng, n, 0.05) * (1 - hour_factor * 0.3), 0.0, 1.0),
+        _constant(roof_area),
+        _constant(tariff),
+    ]
+    X = np.stack(columns, axis=2).astype(np.float32)
+    return X, solar_targets(X)
+
+
+GENERATORS = {
+    "tree": generate_tree_data,
+    "garden": generate_garden_data,
+    "purifier": generate_purifier_data,
+    "water": generate_water_data,
+    "solar": generate_solar_data,
+}
+
+
+# =====================================================================
+#                           TRAINING
+# =====================================================================
+
+def model_spec(name):
+    """(model class, model file, scaler file, default model dir) for a registry name."""
+    from . import aqi, solar, water
+
+    specs = {
+        "tree": (aqi.TreeLSTM, "tree_lstm.pth", "tree_scaler.json", aqi.MODEL_DIR),
+        "garden": (aqi.GardenLSTM, "garden_lstm.pth", "garden_scaler.json", aqi.MODEL_DIR),
+        "purifier": (aqi.PurifierLSTM, "purifier_lstm.pth", "purifier_scaler.json", aqi.MODEL_DIR),
+        "water": (water.WaterLSTM, "water_lstm.pth", "water_scaler.json", water.MODEL_DIR),
+        "solar": (solar.SolarLSTM, "solar_lstm.pth", "solar_scaler.json", solar.MODEL_DIR),
+    }
+    return specs[name]
+
+
+def fit_scaler(X, y):
+    """The notebooks' min-max scaler over every time step (inputs) and sample (targets)."""
+    x_flat = X.reshape(-1, X.shape[2])
+    return {
+        "x_min": x_flat.min(axis=0).tolist(),
+        "x_max": x_flat.max(axis=0).tolist(),
+        "y_min": y.min(axis=0).tolist(),
+        "y_max": y.max(axis=0).tolist(),
+    }
+
+
+def scale(values, low, high):
+    """Min-max scale ``values`` to float32 with the notebooks' epsilon."""
+    low, high = np.asarray(low, dtype=np.float32), np.asarray(high, dtype=np.float32)
+    return ((values - low) / (high - low + 1e-8)).astype(np.float32)
+
+
+class TensorBatches:
+    """Re-iterable (x, y) batches over in-memory tensors, reshuffled every epoch with ``shuffle``."""
+
+    def __init__(self, X, y, batch_size=32, shuffle=False):
+        self.X, self.y, self.batch_size, self.shuffle = X, y, batch_size, shuffle
+
+    def __iter__(self):
+        order = torch.randperm(len(self.X)) if self.shuffle else torch.arange(len(self.X))
+        for i in range(0, len(self.X), self.batch_size):
+            idx = order[i:i + self.batch_size]
+            yield self.X[idx], self.y[idx]
+
+
+def run_epochs(model, train_batches, val_batches, epochs=100, lr=0.001, early_stop=None, log=print):
+    """The notebooks' loop over re-iterable (x, y) batches; returns per-epoch validation losses.
+
+    Adam's learning rate halves when the validation loss plateaus for 10 epochs. With
+    ``early_stop``, training ends once the loss has not improved for that many epochs,
+    i.e. after the plateau scheduler has already cut the rate without effect.
+    """
+    criterion = nn.MSELoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(optimizer, patience=10, factor=0.5)
+    val_losses = []
+    start = time.perf_counter()
+    for epoch in range(epochs):
+        model.train()
+        for xb, yb in train_batches:
+            loss = criterion(model(xb), yb)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+        model.eval()
+        total, count = 0.0, 0
+        with torch.no_grad():
+            for xb, yb in val_batches:
+                total += criterion(model(xb), yb).item() * len(xb)
+                count += len(xb)
+        val = total / count
+        val_losses.append(val)
+        scheduler.step(val)
+        if (epoch + 1) % 10 == 0:
+            log(f"Epoch {epoch + 1:3d}/{epochs}  Val: {val:.6f}  ({time.perf_counter() - start:.0f} s)")
+        if early_stop and epoch - int(np.argmin(val_losses)) >= early_stop:
+            log(f"Early stop at epoch {epoch + 1}: best Val {min(val_losses):.6f}")
+            break
+    return val_losses
+
+
+def fit(model, X, y, epochs=100, batch_size=32, lr=0.001, val_fraction=0.2, early_stop=None, log=print):
+    """Train ``model`` on in-memory arrays; returns (scaler, per-epoch validation losses).
+
+    Inputs and targets are min-max scaled and the last ``val_fraction`` is held out, as in
+    the notebooks.
+    """
+    scaler = fit_scaler(X, y)
+    X_norm = torch.from_numpy(scale(X, scaler["x_min"], scaler["x_max"]))
+    y_norm = torch.from_numpy(scale(y, scaler["y_min"], scaler["y_max"]))
+    split = int((1 - val_fraction) * len(X))
+    train_batches = TensorBatches(X_norm[:split], y_norm[:split], batch_size, shuffle=True)
+    val_batches = TensorBatches(X_norm[split:], y_norm[split:], max(batch_size, 4096))
+    return scaler, run_epochs(model, train_batches, val_batches, epochs, lr, early_stop, log)
+
+
+def save_model(model, scaler, model_dir, model_file, scaler_file, log=print):
+    """Write the state dict and scaler json in the layout ``load_model_and_scaler`` reads."""
+    os.makedirs(model_dir, exist_ok=True)
+    torch.save(model.state_dict(), os.path.join(model_dir, model_file))
+    with open(os.path.join(model_dir, scaler_file), "w") as f:
+        json.dump(scaler, f, indent=2)
+    log(f"Saved {os.path.join(model_dir, model_file)} and {scaler_file}")
+
+
+def train(name, num_samples=5000, epochs=100, batch_size=32, lr=0.001, seed=42, model_dir=None,
+          cache=False, cache_dir=None, shard_size=None, workers=0, log=print):
+    """Generate data for ``name``, train its LSTM and save it; returns (model, scaler, val losses).
+
+    With ``cache`` the data is read from memory-mapped shards (see datasets.py), generated
+    only the first time this config is seen.
+    """
+    model_class, model_file, scaler_file, default_dir = model_spec(name)
+    torch.manual_seed(seed)
+    model = model_class()
+    if cache or cache_dir:
+        from .datasets import DEFAULT_SHARD_SIZE, build_shards, fit_cached
+
+        path = build_shards(name, num_samples, seed, shard_size or DEFAULT_SHARD_SIZE, cache_dir, log)
+        scaler, val_losses = fit_cached(model, path, epochs, batch_size, lr, workers=workers, log=log)
+    else:
+        start = time.perf_counter()
+        X, y = GENERATORS[name](num_samples, seed)
+        log(f"{name}: generated X {X.shape}, y {y.shape} in {time.perf_counter() - start:.2f} s")
+        scaler, val_losses = fit(model, X, y, epochs, batch_size, lr, log=log)
+    save_model(model, scaler, model_dir or default_dir, model_file, scaler_file, log)
+    return model, scaler, val_losses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the Air2Earth LSTMs on synthetic data")
+    parser.add_argument("model", choices=list(GENERATORS) + ["all"])
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--lr", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--model-dir", default=None, help="Output directory (default: the service's models/)")
+    parser.add_argument("--cache", action="store_true", help="Train from memory-mapped dataset shards")
+    parser.add_argument("--cache-dir", default=None, help="Shard cache (default: AIR2EARTH_DATA_CACHE)")
+    parser.add_argument("--shard-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader workers with --cache")
+    args = parser.parse_args(argv)
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    names = list(GENERATORS) if args.model == "all" else [args.model]
+    for name in names:
+        train(name, args.samples, args.epochs, args.batch_size, args.lr, args.seed, args.model_dir,
+              args.cache, args.cache_dir, args.shard_size, args.workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Air2Earth - hyperparameter sweeps
+Trains a grid of HIDDEN_DIM / NUM_LAYERS / BATCH_SIZE / learning-rate configurations of
+one model concurrently on a process pool, each trial limited to a share of the CPU
+threads and stopped early once its validation loss stops improving under the notebooks'
+ReduceLROnPlateau schedule. Every trial reads the same memory-mapped dataset shards (see
+datasets.py). The trained models are then timed one at a time and reported against their
+validation MSE, with the Pareto-optimal configurations marked.
+
+Usage:
+    cd backend
+    python -m air2earth.tuning water --hidden-dims 16 32 64 --num-layers 1 2 --jobs 4
+    python -m air2earth.tuning tree --samples 20000 --epochs 60 --report tree_sweep.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import torch
+
+from .common import SEQ_LEN
+from .datasets import DEFAULT_SHARD_SIZE, build_shards, fit_cached
+from .training import GENERATORS, model_spec
+
+DEFAULT_EARLY_STOP = 25    # epochs without improvement: the plateau scheduler has halved the rate twice
+
+
+def trial_grid(hidden_dims, num_layers, batch_sizes, lrs):
+    """Every combination as a list of config dicts."""
+    return [
+        {"hidden_dim": h, "num_layers": n, "batch_size": b, "lr": lr}
+        for h, n, b, lr in itertools.product(hidden_dims, num_layers, batch_sizes, lrs)
+    ]
+
+
+def build_model(name, config):
+    with warnings.catch_warnings():
+        # nn.LSTM warns that dropout is unused with a single layer
+        warnings.simplefilter("ignore", UserWarning)
+        return model_spec(name)[0](hidden_dim=config["hidden_dim"], num_layers=config["num_layers"])
+
+
+# =====================================================================
+#                           WORKERS
+# =====================================================================
+
+def init_worker(threads):
+    """Cap each trial's intra-op threads so concurrent trials do not oversubscribe the cores."""
+    torch.set_num_threads(threads)
+
+
+def run_trial(name, path, config, epochs, early_stop, seed):
+    """Train one configuration; returns (result dict, state dict)."""
+    torch.manual_seed(seed)
+    model = build_model(name, config)
+    start = time.perf_counter()
+    _, val_losses = fit_cached(model, path, epochs, config["batch_size"], config["lr"], early_stop=early_stop,
+                               log=lambda *args: None)
+    result = {
+        **config,
+        "val_mse": min(val_losses),
+        "epochs": len(val_losses),
+        "train_s": round(time.perf_counter() - start, 2),
+        "params": sum(p.numel() for p in model.parameters()),
+    }
+    return result, model.state_dict()
+
+
+# =====================================================================
+#                             REPORT
+# =====================================================================
+
+def latency_ms(model, input_dim, batch_size=1, repeat=100, warmup=10):
+    """Median forward-pass latency in milliseconds."""
+    x = torch.rand(batch_size, SEQ_LEN, input_dim)
+    model.eval()
+    times = []
+    with torch.no_grad():
+        for i in range(warmup + repeat):
+            start = time.perf_counter()
+            model(x)
+            if i >= warmup:
+                times.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(times)
+
+
+def mark_pareto(results):
+    """Sort by latency and flag the trials no faster trial beats on validation MSE."""
+    results.sort(key=lambda r: (r["latency_ms"], r["val_mse"]))
+    best = float("inf")
+    for r in results:
+        r["pareto"] = r["val_mse"] < best
+        best = min(best, r["val_mse"])
+    return results
+
+
+def format_report(results):
+    lines = [f"{'hidden':>6}{'layers':>7}{'batch':>6}{'lr':>8}{'params':>9}{'epochs':>7}"
+             f"{'val MSE':>11}{'latency ms':>12}  pareto"]
+    for r in results:
+        lines.append(f"{r['hidden_dim']:>6}{r['num_layers']:>7}{r['batch_size']:>6}{r['lr']:>8g}{r['params']:>9,}"
+                     f"{r['epochs']:>7}{r['val_mse']:>11.6f}{r['latency_ms']:>12.3f}  {'*' if r['pareto'] else ''}")
+    return "\n".join(lines)
+
+
+def sweep(name, grid, num_samples=5000, epochs=100, jobs=None, threads=None, early_stop=DEFAULT_EARLY_STOP,
+          seed=42, cache_dir=None, latency_batch=1, log=print):
+    """Run every config in ``grid`` for ``name``; returns the results sorted by latency."""
+    jobs = jobs or os.cpu_count() or 1
+    threads = threads or max(1, (os.cpu_count() or 1) // jobs)
+    path = build_shards(name, num_samples, seed, DEFAULT_SHARD_SIZE, cache_dir, log)
+
+    trained, start = [], time.perf_counter()
+    with ProcessPoolExecutor(jobs, initializer=init_worker, initargs=(threads,)) as pool:
+        futures = [pool.submit(run_trial, name, path, config, epochs, early_stop, seed) for config in grid]
+        for future in as_completed(futures):
+            result, state = future.result()
+            trained.append((result, state))
+            log(f"[{len(trained)}/{len(grid)}] hidden={result['hidden_dim']} layers={result['num_layers']} "
+                f"batch={result['batch_size']} lr={result['lr']:g}: val {result['val_mse']:.6f} "
+                f"after {result['epochs']} epochs ({time.perf_counter() - start:.0f} s)")
+
+    # Latency is measured serially, with the same thread budget as serving one request
+    torch.set_num_threads(threads)
+    input_dim = GENERATORS[name](1)[0].shape[2]
+    results = []
+    for result, state in trained:
+        model = build_model(name, result)
+        model.load_state_dict(state)
+        results.append({**result, "latency_ms": round(latency_ms(model, input_dim, latency_batch), 4)})
+    return mark_pareto(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep for an Air2Earth LSTM")
+    parser.add_argument("model", choices=list(GENERATORS))
+    parser.add_argument("--hidden-dims", type=int, nargs="+", default=[16, 32, 64])
+    parser.add_argument("--num-layers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32])
+    parser.add_argument("--lrs", type=float, nargs="+", default=[0.001])
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--early-stop", type=int, default=DEFAULT_EARLY_STOP,
+                        help="Stop a trial after this many epochs without improvement (0 disables)")
+    parser.add_argument("--jobs", type=int, default=None, help="Concurrent trials (default: CPU count)")
+    parser.add_argument("--threads", type=int, default=None, help="torch threads per trial")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--latency-batch", type=int, default=1)
+    parser.add_argument("--report", default=None, help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    grid = trial_grid(args.hidden_dims, args.num_layers, args.batch_sizes, args.lrs)
+    results = sweep(args.model, grid, args.samples, args.epochs, args.jobs, args.threads, args.early_stop or None,
+                    args.seed, args.cache_dir, args.latency_batch)
+    print(format_report(results))
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"model": args.model, "samples": args.samples, "latency_batch": args.latency_batch,
+                       "trials": results}, f, indent=2)
+        print(f"Saved {args.report}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
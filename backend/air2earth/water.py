@@ -0,0 +1,182 @@
+"""
+Air2Earth - Water Harvesting Prediction using LSTM
+Model definition and predictor for rainwater collection potential.
+"""
+
+import json
+import os
+
+import numpy as np
+import torch.nn as nn
+
+from .cache import cached
+from .common import (
+    DEFAULT_QUANTILES,
+    SEQ_LEN,
+    expand_samples,
+    load_model_and_scaler,
+    observed_sequences,
+    run_batch,
+    service_model_dir,
+    standard_normal,
+    summarize_samples,
+)
+from .fast import check_engine, fast_outputs, label_results
+
+# =====================================================================
+#                        MODEL DEFINITION
+# =====================================================================
+
+class WaterLSTM(nn.Module):
+    """LSTM model for predicting rainwater harvesting potential."""
+    def __init__(self, input_dim=6, hidden_dim=64, output_dim=4, num_layers=2):
+        super().__init__()
+        self.hidden_dim = hidden_dim
+        self.num_layers = num_layers
+        self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers, batch_first=True, dropout=0.2)
+        self.fc = nn.Sequential(
+            nn.Linear(hidden_dim, 32),
+            nn.ReLU(),
+            nn.Linear(32, output_dim)
+        )
+
+    def forward(self, x):
+        out, _ = self.lstm(x)
+        return self.fc(out[:, -1, :])
+
+
+# =====================================================================
+#                     LOAD MODEL & SCALER
+# =====================================================================
+
+MODEL_DIR = service_model_dir("water-model", "WATER_MODEL_DIR")
+
+WATER_INPUTS = ("rain_intensity", "rain_angle", "rain_size", "rain_speed", "roof_area", "roof_angle")
+
+water_model, water_scaler = load_model_and_scaler(
+    WaterLSTM, "water_lstm.pth", "water_scaler.json", MODEL_DIR
+)
+
+
+# =====================================================================
+#                      PREDICTION FUNCTIONS
+# =====================================================================
+
+def build_sequences(base_rows, rng=None, seq_len=SEQ_LEN):
+    """Build a (N, seq_len, F) batch of input sequences with realistic rain variation.
+
+    Noise comes from ``rng`` (see ``common.standard_normal``): a seeded generator makes the
+    whole batch reproducible, a list of per-row generators makes each row reproducible.
+    """
+    base = np.asarray(base_rows, dtype=np.float64)
+    n = base.shape[0]
+    t = np.arange(seq_len)
+    storm_factor = 1.0 + 0.3 * np.sin(t * np.pi / 6)
+    z = standard_normal(rng, (n, seq_len, 4))
+
+    seq = np.repeat(base[:, None, :], seq_len, axis=1)  # roof_area, roof_angle — constant
+    # intensity — storm surges
+    seq[:, :, 0] = np.clip(base[:, None, 0] * storm_factor + 0.1 * z[:, :, 0], 0.05, 3.0)
+    # angle — wind shifts
+    seq[:, :, 1] = np.clip(base[:, None, 1] + 0.15 * z[:, :, 1] + 0.1 * np.sin(t * np.pi / 8), -2.0, 2.0)
+    # size — slight variation
+    seq[:, :, 2] = np.clip(base[:, None, 2] + 0.08 * z[:, :, 2], 0.05, 3.0)
+    # speed — gusts
+    seq[:, :, 3] = np.clip(base[:, None, 3] + 3 * z[:, :, 3] + 5 * np.sin(t * np.pi / 10), 5, 120)
+    return seq.astype(np.float32)
+
+
+def build_sequence(base_values, seq_len=SEQ_LEN, rng=None):
+    """Build a time-series input sequence with realistic rain variation."""
+    return build_sequences([base_values], rng=rng, seq_len=seq_len)[0]
+
+
+def format_water_result(pred, row):
+    """Build the water harvesting JSON payload for one denormalized prediction row."""
+    rain_intensity, rain_angle, rain_size, rain_speed, roof_area, roof_angle = row
+    return {
+        "type": "water_harvesting",
+        "predictions": {
+            "collection_efficiency_pct": round(float(np.clip(pred[0], 30, 95)), 2),
+            "liters_per_hour": round(float(max(pred[1], 0)), 2),
+            "liters_per_day": round(float(max(pred[2], 0)), 2),
+            "harvesting_potential_pct": round(float(np.clip(pred[3], 40, 95)), 2),
+        },
+        "derived": {
+            "liters_per_month_estimate": round(float(max(pred[2], 0)) * 15, 2),
+            "liters_per_year_estimate": round(float(max(pred[2], 0)) * 15 * 12, 2),
+        },
+        "input_conditions": {
+            "rain_intensity": float(rain_intensity),
+            "rain_angle": float(rain_angle),
+            "rain_size": float(rain_size),
+            "rain_speed": float(rain_speed),
+            "roof_area_m2": float(roof_area),
+            "roof_angle_deg": float(roof_angle),
+        },
+        "constants": {
+            "base_rainfall_rate_mm_hr": 5,
+            "rain_hours_per_day": 6,
+        },
+        "model": "LSTM",
+        "sequence_length": SEQ_LEN,
+    }
+
+
+@cached("water", os.path.join(MODEL_DIR, "water_lstm.pth"))
+def predict_water_harvesting_batch(
+    rows, rng=None, samples=1, quantiles=DEFAULT_QUANTILES, mc_dropout=False, sequences=None, engine="lstm"
+):
+    """Predict water harvesting potential for N rows of
+    (rain_intensity, rain_angle, rain_size, rain_speed, roof_area, roof_angle)
+    in one forward pass.
+
+    Pass a seeded ``numpy.random.Generator`` as ``rng`` for reproducible noise. With
+    ``samples=K`` each row is scored K times in the same pass and collapsed to the mean
+    plus std/quantiles under ``uncertainty``; ``mc_dropout`` keeps LSTM dropout active.
+    ``sequences`` ((N, 24, F) observed readings) replaces the synthetic sequences; the rows
+    are then each sequence's last reading. ``engine`` "fast" or "lut" skips the LSTM (see fast.py).
+    Returns a list of result dicts with the same shape as predict_water_harvesting.
+    """
+    check_engine(engine)
+    if sequences is not None:
+        rows, sequences = observed_sequences(sequences, 6)
+    rows = [tuple(row) for row in rows]
+    if not rows:
+        return []
+    sample_rows, rng = expand_samples(rows, rng, samples)
+    raw_seqs = None  # the lookup table reads the rows only
+    if sequences is not None:
+        raw_seqs = np.repeat(sequences, samples, axis=0)
+    elif engine != "lut":
+        raw_seqs = build_sequences(sample_rows, rng=rng)
+    if engine != "lstm":
+        preds = fast_outputs("water", sample_rows, raw_seqs, engine)
+    else:
+        preds = run_batch(water_model, raw_seqs, water_scaler, 6, 4, mc_dropout=mc_dropout)
+    results = [format_water_result(pred, row) for pred, row in zip(preds, sample_rows)]
+    if engine != "lstm":
+        label_results(results, engine)
+    return summarize_samples(results, samples, quantiles)
+
+
+def predict_water_harvesting(
+    rain_intensity, rain_angle, rain_size, rain_speed, roof_area, roof_angle,
+    samples=1, mc_dropout=False, sequence=None, as_dict=False
+):
+    """Predict water harvesting potential using LSTM.
+
+    Returns a pretty-printed JSON string, or the payload dict itself with ``as_dict``.
+    """
+    try:
+        result = predict_water_harvesting_batch(
+            [(rain_intensity, rain_angle, rain_size, rain_speed, roof_area, roof_angle)],
+            samples=samples,
+            mc_dropout=mc_dropout,
+            sequences=None if sequence is None else [sequence],
+        )[0]
+        return result if as_dict else json.dumps(result, indent=2)
+
+    except Exception as e:
+        error = {"error": str(e)}
+        return error if as_dict else json.dumps(error, indent=2)
@@ -0,0 +1,122 @@
+"""
+Air2Earth - build_sequence microbenchmark
+Compares the vectorized ``build_sequences`` generators of the AQI, water and solar
+services against the original per-element Python loops they replaced.
+
+Usage:
+    python benchmarks/bench_build_sequence.py --rows 1 64 1024 --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air2earth import aqi, solar, water
+from air2earth.common import SEQ_LEN
+
+
+# =====================================================================
+#                 REFERENCE LOOP IMPLEMENTATIONS
+# =====================================================================
+
+def aqi_loop(base_values, seq_len=SEQ_LEN, noise_scales=None):
+    if noise_scales is None:
+        noise_scales = [0.02] * len(base_values)
+    seq = []
+    for t in range(seq_len):
+        step = []
+        for val, ns in zip(base_values, noise_scales):
+            step.append(val * (1.0 + np.random.normal(0, ns)))
+        seq.append(step)
+    return np.array(seq, dtype=np.float32)
+
+
+def solar_loop(base_values, seq_len=SEQ_LEN, noise_scales=None):
+    if noise_scales is None:
+        noise_scales = [0.02] * len(base_values)
+    seq = []
+    for t in range(seq_len):
+        step = []
+        hour_factor = max(0, np.sin((t - 6) * np.pi / 12))
+        for i, (val, ns) in enumerate(zip(base_values, noise_scales)):
+            if i == 0:
+                v = val * (0.8 + 0.4 * hour_factor) + np.random.normal(0, ns * val)
+            elif i == 2:
+                v = val + np.random.normal(0, 2) + np.sin(t * np.pi / 12) * 5
+            elif i == 3:
+                v = val + np.random.normal(0, 0.05)
+                v = np.clip(v, 0, 1)
+            else:
+                v = val * (1.0 + np.random.normal(0, ns))
+            step.append(v)
+        seq.append(step)
+    return np.array(seq, dtype=np.float32)
+
+
+def water_loop(base_values, seq_len=SEQ_LEN):
+    seq = []
+    for t in range(seq_len):
+        storm_factor = 1.0 + 0.3 * np.sin(t * np.pi / 6)
+        step = []
+        for i, val in enumerate(base_values):
+            if i == 0:
+                v = np.clip(val * storm_factor + np.random.normal(0, 0.1), 0.05, 3.0)
+            elif i == 1:
+                v = np.clip(val + np.random.normal(0, 0.15) + 0.1 * np.sin(t * np.pi / 8), -2.0, 2.0)
+            elif i == 2:
+                v = np.clip(val + np.random.normal(0, 0.08), 0.05, 3.0)
+            elif i == 3:
+                v = np.clip(val + np.random.normal(0, 3) + 5 * np.sin(t * np.pi / 10), 5, 120)
+            else:
+                v = val
+            step.append(v)
+        seq.append(step)
+    return np.array(seq, dtype=np.float32)
+
+
+# =====================================================================
+#                            BENCHMARK
+# =====================================================================
+
+def best_of(fn, repeat):
+    """Return the fastest wall-clock time of ``repeat`` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    cases = [
+        ("aqi/tree", [150, 75, 30, 60, 5], aqi_loop, aqi.build_sequences,
+         {"noise_scales": aqi.TREE_NOISE_SCALES}),
+        ("solar", [5.5, 0.2, 30, 0.2, 150, 8.5], solar_loop, solar.build_sequences,
+         {"noise_scales": solar.SOLAR_NOISE_SCALES}),
+        ("water", [1.0, -0.6, 0.6, 60, 200, 5], water_loop, water.build_sequences, {}),
+    ]
+
+    print(f"{'service':<10}{'rows':>8}{'loop ms':>12}{'vector ms':>12}{'speedup':>10}")
+    for name, base, loop_fn, vec_fn, kwargs in cases:
+        for n in args.rows:
+            rows = [base] * n
+            rng = np.random.default_rng(args.seed)
+            loop_t = best_of(lambda: np.stack([loop_fn(base, **kwargs) for _ in range(n)]), args.repeat)
+            vec_t = best_of(lambda: vec_fn(rows, rng=rng, **kwargs), args.repeat)
+            print(f"{name:<10}{n:>8}{loop_t * 1e3:>12.3f}{vec_t * 1e3:>12.3f}{loop_t / vec_t:>9.1f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
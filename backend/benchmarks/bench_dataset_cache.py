@@ -0,0 +1,61 @@
+"""
+Air2Earth - dataset cache benchmark
+What a hyperparameter sweep pays for data: regenerating the dataset for every trial in
+memory (as the notebooks do) against building the memory-mapped shards once and reading
+them back. Also the throughput of one training epoch's batches through the DataLoader
+for each worker count.
+
+Usage:
+    python benchmarks/bench_dataset_cache.py --model water --samples 500000 --trials 4 --workers 0 2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air2earth.datasets import ShardedDataset, build_shards, make_loader
+from air2earth.training import GENERATORS, fit_scaler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="water", choices=list(GENERATORS))
+    parser.add_argument("--samples", type=int, default=500_000)
+    parser.add_argument("--shard-size", type=int, default=100_000)
+    parser.add_argument("--trials", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2])
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    for _ in range(args.trials):
+        fit_scaler(*GENERATORS[args.model](args.samples, 42))
+    regenerate_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        path = build_shards(args.model, args.samples, 42, args.shard_size, cache_dir, log=lambda *a: None)
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(args.trials - 1):
+            ShardedDataset(build_shards(args.model, args.samples, 42, args.shard_size, cache_dir))
+        reuse_s = time.perf_counter() - start
+        print(f"{args.trials} trials x {args.samples:,} {args.model} samples")
+        print(f"  regenerate every trial: {regenerate_s:8.2f} s")
+        print(f"  cache once + reuse:     {build_s + reuse_s:8.2f} s  (build {build_s:.2f} s)")
+
+        dataset = ShardedDataset(path)
+        for workers in args.workers:
+            loader = make_loader(dataset, 0, len(dataset), args.batch_size, shuffle=True, workers=workers)
+            start = time.perf_counter()
+            rows = sum(len(xb) for xb, _ in loader)
+            seconds = time.perf_counter() - start
+            print(f"  epoch of batches, {workers} worker(s): {seconds:6.2f} s  ({rows / seconds:,.0f} samples/s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
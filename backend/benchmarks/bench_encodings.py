@@ -0,0 +1,83 @@
+"""
+Air2Earth - response encoding benchmark
+Bytes and serialization time of a batch of prediction payloads in each response encoding:
+the pretty-printed JSON the predictors return, compact JSON, a "predictions" projection,
+the columnar layout, MessagePack and Arrow IPC.
+
+Usage:
+    python benchmarks/bench_encodings.py --rows 10000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air2earth.encoding import encode_arrow, encode_msgpack, project, to_columns
+from air2earth.registry import build_registry
+
+ROW_RANGES = {
+    "tree": [(50, 400), (20, 250), (15, 42), (20, 95), (0, 25)],
+    "water": [(0.1, 2.5), (-1.5, 1.5), (0.2, 2.5), (10, 100), (20, 800), (0, 45)],
+    "solar": [(2, 7), (0, 0.8), (15, 42), (0, 1), (10, 500), (4, 12)],
+}
+
+
+def best_of(fn, repeat):
+    """Return (fastest wall-clock time in seconds, result) of ``repeat`` calls."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def encodings(results):
+    projected = [project(r, ["predictions"]) for r in results]
+    return [
+        ("json indent=2", lambda: json.dumps({"results": results}, indent=2).encode()),
+        ("json compact", lambda: json.dumps({"results": results}, separators=(",", ":")).encode()),
+        ("json predictions", lambda: json.dumps({"results": [project(r, ["predictions"]) for r in results]},
+                                                separators=(",", ":")).encode()),
+        ("json columns", lambda: json.dumps({"columns": to_columns(results)}, separators=(",", ":")).encode()),
+        ("msgpack", lambda: encode_msgpack({"results": results})),
+        ("msgpack columns", lambda: encode_msgpack({"columns": to_columns(projected)})),
+        ("arrow", lambda: encode_arrow(to_columns(results))),
+        ("arrow predictions", lambda: encode_arrow(to_columns(projected))),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--models", nargs="+", default=list(ROW_RANGES))
+    args = parser.parse_args(argv)
+
+    registry = build_registry()
+    rng = np.random.default_rng(0)
+    print(f"{'model':<8}{'encoding':<20}{'bytes':>12}{'ms':>10}{'vs indent=2':>14}")
+    for name in args.models:
+        low, high = np.array(ROW_RANGES[name]).T
+        rows = [tuple(row) for row in rng.uniform(low, high, (args.rows, len(low)))]
+        results = registry.get(name).predict_batch(rows, rng=rng)
+        baseline = None
+        for label, fn in encodings(results):
+            try:
+                seconds, payload = best_of(fn, args.repeat)
+            except ValueError as e:
+                print(f"{name:<8}{label:<20}{'skipped: ' + str(e)}")
+                continue
+            baseline = baseline or (len(payload), seconds)
+            print(f"{name:<8}{label:<20}{len(payload):>12,}{seconds * 1e3:>10.1f}"
+                  f"{len(payload) / baseline[0]:>8.2f}x B {seconds / baseline[1]:>4.2f}x t")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
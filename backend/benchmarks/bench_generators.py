@@ -0,0 +1,71 @@
+"""
+Air2Earth - synthetic-data generator benchmark
+Wall-clock time of each training notebook's per-sample generator loop against the
+vectorized generator in air2earth.training at ``--scale`` times as many samples. The
+notebook generators are executed from the .ipynb files themselves.
+
+Usage:
+    python benchmarks/bench_generators.py --samples 5000 --scale 10
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air2earth.training import GENERATORS
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NOTEBOOKS = {
+    "tree": "aqi-model/tree_lstm_train.ipynb",
+    "garden": "aqi-model/garden_lstm_train.ipynb",
+    "purifier": "aqi-model/purifier_lstm_train.ipynb",
+    "water": "water-model/water_lstm_train.ipynb",
+    "solar": "solar-model/solar_lstm_train.ipynb",
+}
+
+
+def notebook_generator(name):
+    """The notebook's generate_<name>_data, with the cells it depends on executed first."""
+    with open(os.path.join(BACKEND_DIR, NOTEBOOKS[name]), encoding="utf-8") as f:
+        cells = ["".join(c["source"]) for c in json.load(f)["cells"] if c["cell_type"] == "code"]
+    namespace = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for source in cells:
+            if f"def generate_{name}_data" in source:
+                # Stop before the cell calls the generator at notebook size
+                exec(source.split("\nX, y = ")[0], namespace)
+                return namespace[f"generate_{name}_data"]
+            if "DataLoader(" not in source and "model" not in source.lower():
+                exec(source, namespace)
+    raise RuntimeError(f"generate_{name}_data not found in {NOTEBOOKS[name]}")
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--models", nargs="+", default=list(GENERATORS))
+    args = parser.parse_args(argv)
+
+    big = args.samples * args.scale
+    print(f"{'model':<10}{'notebook ' + str(args.samples):>16}{'vectorized ' + str(big):>20}{'samples/s x':>14}")
+    for name in args.models:
+        loop_s = timed(notebook_generator(name), args.samples)
+        vec_s = timed(GENERATORS[name], big)
+        print(f"{name:<10}{loop_s:>14.2f} s{vec_s:>18.2f} s{(big / vec_s) / (args.samples / loop_s):>13.0f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Air2Earth - lookup table benchmark
+Per-row cost of the LSTM (synthetic sequences + forward pass) against multilinear
+interpolation in the memory-mapped lookup table, for random rows inside the table's box.
+Build the tables first with ``python -m air2earth.lut build purifier solar water``.
+
+Usage:
+    python benchmarks/bench_lut.py --models purifier solar water --batch-sizes 1 1000 100000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air2earth.lut import load_table, lstm_outputs
+from air2earth.registry import build_registry
+
+
+def median_s(fn, repeat):
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--models", nargs="+", default=["purifier", "solar", "water"])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    registry = build_registry()
+    print(f"{'model':<10}{'batch':>8}{'LSTM us/row':>14}{'LUT us/row':>12}{'speedup':>10}")
+    for name in args.models:
+        entry, table = registry.get(name), load_table(name)
+        for n in args.batch_sizes:
+            rows = np.random.default_rng(0).uniform(table.lo, table.hi, (n, len(table.lo)))
+            rng = np.random.default_rng(1)
+            lstm_s = median_s(lambda: lstm_outputs(entry, rows, rng), args.repeat)
+            lut_s = median_s(lambda: table(rows), args.repeat)
+            print(f"{name:<10}{n:>8}{lstm_s / n * 1e6:>14.2f}{lut_s / n * 1e6:>12.2f}{lstm_s / lut_s:>9.0f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Air2Earth - multi-head AQI benchmark
+Latency and memory of scoring the tree, garden and purifier options for a batch of
+locations: three single-model forward passes against one MultiHeadAQILSTM pass. Memory is
+the weights' state_dict size plus the bytes allocated during a forward pass.
+Train the model first with ``python -m air2earth.multihead train``.
+
+Usage:
+    python benchmarks/bench_multihead.py --batch-sizes 1 64 1024 --repeat 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import torch
+from torch.profiler import ProfilerActivity, profile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air2earth import aqi
+from air2earth.common import SEQ_LEN
+from air2earth.multihead import COMPARE_INPUTS, HEADS, MULTIHEAD
+from air2earth.precision import state_dict_bytes
+
+
+def median_ms(fn, repeat, warmup=5):
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(times)
+
+
+def allocated_mb(fn):
+    """Bytes allocated on the CPU while running ``fn`` once, in MB."""
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        fn()
+    return sum(max(e.self_cpu_memory_usage, 0) for e in prof.key_averages()) / 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    singles = [aqi.LAZY_MODELS[placement].load()[0] for placement, _, _, _ in HEADS]
+    columns = [[COMPARE_INPUTS.index(name) for name in inputs] for _, inputs, _, _ in HEADS]
+    multi = MULTIHEAD.load()[0]
+
+    single_kb = sum(state_dict_bytes(m) for m in singles) / 1024
+    multi_kb = state_dict_bytes(multi) / 1024
+    print(f"weights: 3 single models {single_kb:.1f} KB, multi-head {multi_kb:.1f} KB")
+    print(f"{'batch':>8}{'3x single ms':>14}{'multi ms':>10}{'speedup':>10}{'3x single MB':>14}{'multi MB':>10}")
+    for n in args.batch_sizes:
+        x = torch.rand(n, SEQ_LEN, len(COMPARE_INPUTS))
+        inputs = [x[:, :, cols].contiguous() for cols in columns]
+
+        def run_singles():
+            with torch.no_grad():
+                return [model(xs) for model, xs in zip(singles, inputs)]
+
+        def run_multi():
+            with torch.no_grad():
+                return multi(x)
+
+        single_ms = median_ms(run_singles, args.repeat)
+        multi_ms = median_ms(run_multi, args.repeat)
+        print(f"{n:>8}{single_ms:>14.3f}{multi_ms:>10.3f}{single_ms / multi_ms:>9.2f}x"
+              f"{allocated_mb(run_singles):>14.2f}{allocated_mb(run_multi):>10.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
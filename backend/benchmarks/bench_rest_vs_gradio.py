@@ -0,0 +1,90 @@
+"""
+Air2Earth - REST vs Gradio latency benchmark
+Starts the unified server in-process and compares request latency of POST /v1/tree
+against the same predictor called through the mounted Gradio UI (queue + gr.JSON).
+
+Usage:
+    python benchmarks/bench_rest_vs_gradio.py --requests 200
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air2earth.server import create_app
+
+TREE_ROW = {"current_aqi": 150, "current_pm25": 75, "temperature": 30, "humidity": 60, "wind_speed": 5}
+
+
+def start_server(port, mount_ui):
+    """Run uvicorn on a daemon thread and wait until it accepts connections."""
+    import uvicorn
+
+    config = uvicorn.Config(create_app(mount_ui=mount_ui), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def time_calls(fn, n, warmup=10):
+    """Return per-call latencies in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1e3)
+    return np.array(latencies)
+
+
+def report(name, latencies):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"{name:<18}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--port", type=int, default=7861)
+    parser.add_argument("--batch", type=int, default=64, help="Rows per batched REST request")
+    parser.add_argument("--no-gradio", action="store_true", help="Only benchmark the REST path")
+    args = parser.parse_args(argv)
+
+    import httpx
+
+    server = start_server(args.port, mount_ui=not args.no_gradio)
+    base_url = f"http://127.0.0.1:{args.port}"
+    http = httpx.Client(base_url=base_url)
+    values = list(TREE_ROW.values())
+
+    print(f"{'path':<18}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    report("rest single", time_calls(lambda: http.post("/v1/tree", json=TREE_ROW).raise_for_status(), args.requests))
+
+    batch = {"rows": [values] * args.batch}
+    batch_latencies = time_calls(lambda: http.post("/v1/tree", json=batch).raise_for_status(), args.requests)
+    report(f"rest batch/{args.batch}", batch_latencies)
+    report("rest per row", batch_latencies / args.batch)
+
+    if not args.no_gradio:
+        from gradio_client import Client
+
+        client = Client(f"{base_url}/ui/aqi/", verbose=False)
+        report("gradio single", time_calls(
+            lambda: client.predict(*values, api_name="/predict_tree_impact"), args.requests
+        ))
+
+    http.close()
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    sys.exit(main())
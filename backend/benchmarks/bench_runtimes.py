@@ -0,0 +1,69 @@
+"""
+Air2Earth - runtime backend benchmark
+Per-batch forward-pass latency of the eager, TorchScript and ONNX runtimes for each model.
+Run ``python -m air2earth.export`` first so the artifacts exist.
+
+Usage:
+    python benchmarks/bench_runtimes.py --batch-sizes 1 64 1024 --repeat 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air2earth.common import SEQ_LEN
+from air2earth.registry import build_registry
+from air2earth.runtime import OnnxRuntime, TorchScriptRuntime, artifact_paths, eager_model
+
+
+def median_ms(fn, repeat, warmup=5):
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1e3)
+    return float(np.median(times))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=None, help="torch/onnxruntime intra-op threads")
+    args = parser.parse_args(argv)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    registry = build_registry()
+    print(f"{'model':<10}{'backend':<13}" + "".join(f"{f'N={n} ms':>12}" for n in args.batch_sizes))
+    for entry in registry:
+        model = eager_model(entry.model)
+        paths = artifact_paths(entry.model_path)
+        runtimes = {"eager": model}
+        if os.path.exists(paths["torchscript"]):
+            runtimes["torchscript"] = TorchScriptRuntime(paths["torchscript"], model)
+        if os.path.exists(paths["onnx"]):
+            try:
+                runtimes["onnx"] = OnnxRuntime(paths["onnx"], model)
+            except ImportError:
+                pass
+
+        for name, runtime in runtimes.items():
+            cells = []
+            for n in args.batch_sizes:
+                x = torch.rand(n, SEQ_LEN, model.lstm.input_size)
+                with torch.no_grad():
+                    cells.append(median_ms(lambda: runtime(x), args.repeat))
+            print(f"{entry.name:<10}{name:<13}" + "".join(f"{c:>12.3f}" for c in cells))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Air2Earth - AQI service startup budget
+Cold-start breakdown of backend/aqi-model/app.py: each phase (numpy, torch, gradio,
+air2earth.aqi, UI build, per-model loads, first prediction) is timed in a fresh
+interpreter, lazily and with --preload, followed by the top packages from
+``python -X importtime``.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 3 --top 12
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(BACKEND_DIR, "aqi-model", "app.py")
+TREE_ROW = (150, 75, 30, 60, 5)
+
+
+def child(preload):
+    """Time each startup phase in this (fresh) interpreter and print them as JSON."""
+    phases = []
+    last = time.perf_counter()
+
+    def mark(name):
+        nonlocal last
+        now = time.perf_counter()
+        phases.append((name, (now - last) * 1e3))
+        last = now
+
+    import numpy
+    mark("import numpy")
+    import torch
+    mark("import torch")
+    import gradio
+    mark("import gradio")
+    sys.path.insert(0, BACKEND_DIR)
+    from air2earth import aqi
+    mark("import air2earth.aqi")
+    spec = importlib.util.spec_from_file_location("aqi_app", APP_PATH)
+    spec.loader.exec_module(importlib.util.module_from_spec(spec))
+    mark("build gradio UI")
+    if preload:
+        for name, lazy in aqi.LAZY_MODELS.items():
+            lazy.load()
+            mark(f"load {name} model")
+    mark("ready")
+    aqi.predict_tree_impact(*TREE_ROW)
+    mark("first tree prediction")
+    print(json.dumps(phases))
+
+
+def run_child(preload):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child"] + (["--preload"] if preload else [])
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True, cwd=BACKEND_DIR).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def import_budget(top):
+    """Self import time per top-level package for the lazy app import, from -X importtime."""
+    code = (f"import sys; sys.path.insert(0, {BACKEND_DIR!r}); import importlib.util as u; "
+            f"s = u.spec_from_file_location('aqi_app', {APP_PATH!r}); s.loader.exec_module(u.module_from_spec(s))")
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                         capture_output=True, text=True, check=True, cwd=BACKEND_DIR).stderr
+    totals = defaultdict(float)
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1e3
+    total = sum(totals.values())
+    ranked = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return total, ranked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per mode")
+    parser.add_argument("--top", type=int, default=12, help="Packages listed in the import budget")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--preload", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return child(args.preload)
+
+    for preload in (False, True):
+        runs = [run_child(preload) for _ in range(args.runs)]
+        names = [name for name, _ in runs[0]]
+        medians = [statistics.median(run[i][1] for run in runs) for i in range(len(names))]
+        ready = sum(medians[:names.index("ready") + 1])
+        print(f"\n{'--preload' if preload else 'lazy (default)'}: ready in {ready:.0f} ms, "
+              f"first prediction at {sum(medians):.0f} ms (median of {args.runs})")
+        for name, ms in zip(names, medians):
+            if name != "ready":
+                print(f"  {name:<24}{ms:>9.1f} ms")
+
+    total, ranked = import_budget(args.top)
+    print(f"\nimport budget (self time, {total:.0f} ms total)")
+    for name, ms in ranked:
+        print(f"  {name:<24}{ms:>9.1f} ms {ms / total * 100:>6.1f} %")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Exported TorchScript / ONNX runtimes must reproduce the eager LSTMs.
+Each model is exported into a temporary directory so the served artifacts are untouched.
+"""
+
+import os
+
+import pytest
+import torch
+
+from air2earth.export import FORMATS, check_parity, export_onnx, export_torchscript
+from air2earth.runtime import artifact_paths
+from air2earth.training import GENERATORS, model_spec
+
+ATOL = 1e-5
+
+
+def load_eager(name):
+    model_class, model_file, _, model_dir = model_spec(name)
+    model = model_class()
+    path = os.path.join(model_dir, model_file)
+    if os.path.exists(path):
+        model.load_state_dict(torch.load(path, map_location="cpu", weights_only=True))
+    return model.eval(), model_file
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("name", list(GENERATORS))
+def test_exported_runtime_matches_eager(tmp_path, name, fmt):
+    if fmt == "onnx":
+        pytest.importorskip("onnx")
+        pytest.importorskip("onnxruntime")
+    model, model_file = load_eager(name)
+    model_path = str(tmp_path / model_file)
+    (export_torchscript if fmt == "torchscript" else export_onnx)(model, artifact_paths(model_path)[fmt])
+
+    diffs = check_parity(model, model_path, [fmt])
+    assert diffs[fmt] <= ATOL, f"{name}/{fmt}: max |diff| {diffs[fmt]:.2e}"